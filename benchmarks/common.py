@@ -0,0 +1,27 @@
+import json
+from typing import Any, Dict, List
+from client.latency import percentiles
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summary statistics of timing samples, in milliseconds."""
+    p50, p99 = percentiles(samples, (50, 99))
+    return {
+        "mean_ms": sum(samples) / len(samples) * 1000 if samples else 0.0,
+        "p50_ms": p50 * 1000,
+        "p99_ms": p99 * 1000,
+        "max_ms": max(samples) * 1000 if samples else 0.0
+    }
+
+
+def read_json(path: str) -> Dict[str, Any]:
+    """Load results written by write_json."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_json(path: str, data: Dict[str, Any]) -> None:
+    """Write results as pretty-printed JSON."""
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
\ No newline at end of file
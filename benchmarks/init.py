@@ -0,0 +1,3 @@
+"""
+Benchmarks for the multiplayer coin collector game.
+"""
\ No newline at end of file
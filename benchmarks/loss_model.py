@@ -0,0 +1,155 @@
+"""
+Snapshot age under packet loss, WebSocket (TCP) against datagrams, as an
+analytic model.
+
+No sockets are involved: neither the server's transports nor a real network
+stack are exercised. The model assumes one state snapshot per tick, each in
+its own packet with a one-way delay plus jitter, and each packet lost with
+the given probability:
+
+- stream: as on TCP, a lost packet is retransmitted after the
+  retransmission timeout (doubling on each further loss), and nothing sent
+  after it is delivered until it is (head-of-line blocking).
+- datagram: a lost packet is gone, and one overtaken by a newer snapshot
+  is dropped on arrival.
+
+Real TCP also has fast retransmit, congestion control and Nagle, so treat
+the stream numbers as a rough picture of head-of-line blocking rather than a
+measurement.
+
+The client renders at a fixed frame rate and the model reports the age of
+the newest snapshot it has at each frame:
+
+    python -m benchmarks.loss_model --loss 0 0.01 0.05 0.1
+    python -m benchmarks.loss_model --delay 0.05 --rto 0.3 --json loss_model.json
+"""
+import argparse
+import random
+from typing import Any, Dict, List, Optional, Sequence
+from benchmarks.common import summarize, write_json
+
+
+MODES = ("stream", "datagram")
+
+
+def stream_arrivals(
+    send_times: Sequence[float],
+    delay: float,
+    jitter: float,
+    loss: float,
+    rto: float,
+    rng: random.Random
+) -> List[float]:
+    """When each packet is delivered in order over a reliable stream."""
+    arrivals = []
+    delivered = 0.0
+    for sent in send_times:
+        timeout = rto
+        while rng.random() < loss:
+            sent += timeout
+            timeout *= 2
+        # Held back until everything sent before it is through
+        delivered = max(delivered, sent + delay + rng.uniform(0, jitter))
+        arrivals.append(delivered)
+    return arrivals
+
+
+def datagram_arrivals(
+    send_times: Sequence[float],
+    delay: float,
+    jitter: float,
+    loss: float,
+    rng: random.Random
+) -> List[Optional[float]]:
+    """When each packet arrives as a datagram, or None if it is lost."""
+    return [None if rng.random() < loss else sent + delay + rng.uniform(0, jitter) for sent in send_times]
+
+
+def snapshot_ages(
+    send_times: Sequence[float],
+    arrivals: Sequence[Optional[float]],
+    frame_rate: float,
+    duration: float
+) -> List[float]:
+    """Age of the newest snapshot the client has at each frame after the first arrives."""
+    received = sorted((arrival, sent) for sent, arrival in zip(send_times, arrivals) if arrival is not None)
+    ages = []
+    newest = None
+    i = 0
+    for frame in range(int(duration * frame_rate)):
+        now = frame / frame_rate
+        while i < len(received) and received[i][0] <= now:
+            # Older snapshots arriving late don't replace newer ones
+            newest = received[i][1] if newest is None else max(newest, received[i][1])
+            i += 1
+        if newest is not None:
+            ages.append(now - newest)
+    return ages
+
+
+def run_benchmark(
+    losses: Sequence[float],
+    duration: float = 60.0,
+    tick_rate: int = 30,
+    frame_rate: int = 60,
+    delay: float = 0.03,
+    jitter: float = 0.005,
+    rto: float = 0.2,
+    seed: int = 1
+) -> Dict[str, Any]:
+    """Snapshot ages for both transports at each loss rate."""
+    send_times = [tick / tick_rate for tick in range(int(duration * tick_rate))]
+    results = []
+    for loss in losses:
+        arrivals = {
+            "stream": stream_arrivals(send_times, delay, jitter, loss, rto, random.Random(seed)),
+            "datagram": datagram_arrivals(send_times, delay, jitter, loss, random.Random(seed))
+        }
+        row: Dict[str, Any] = {"loss": loss}
+        for mode in MODES:
+            row[mode] = summarize(snapshot_ages(send_times, arrivals[mode], frame_rate, duration))
+        results.append(row)
+    
+    return {
+        "config": {
+            "duration": duration, "tick_rate": tick_rate, "frame_rate": frame_rate,
+            "delay": delay, "jitter": jitter, "rto": rto
+        },
+        "results": results
+    }
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    """Print a human-readable summary."""
+    config = results["config"]
+    print(
+        f"{config['tick_rate']} ticks/sec, {config['delay'] * 1000:.0f} ms delay, "
+        f"{config['jitter'] * 1000:.0f} ms jitter, {config['rto'] * 1000:.0f} ms RTO; snapshot age at each frame"
+    )
+    for row in results["results"]:
+        cells = "  ".join(
+            f"{mode} p50 {row[mode]['p50_ms']:6.1f} p99 {row[mode]['p99_ms']:6.1f} max {row[mode]['max_ms']:6.1f} ms"
+            for mode in MODES
+        )
+        print(f"  loss {row['loss'] * 100:4.1f}%  {cells}")
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Modelled snapshot age under packet loss, stream against datagram")
+    parser.add_argument("--loss", type=float, nargs="+", default=[0.0, 0.01, 0.02, 0.05, 0.1], help="loss rates")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of traffic to model")
+    parser.add_argument("--delay", type=float, default=0.03, help="one-way delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.005, help="extra random delay in seconds")
+    parser.add_argument("--rto", type=float, default=0.2, help="stream retransmission timeout in seconds")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    
+    results = run_benchmark(args.loss, args.duration, delay=args.delay, jitter=args.jitter, rto=args.rto)
+    print_report(results)
+    if args.json:
+        write_json(args.json, results)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,282 @@
+"""
+Microbenchmarks for the simulation, protocol and interpolation hot paths.
+
+Each case is timed at several entity counts and reported as time per call.
+Results can be saved as a JSON baseline and later compared against, failing
+(exit status 1) when a case got slower than the threshold allows:
+
+    python -m benchmarks.micro --json baseline.json
+    python -m benchmarks.micro --compare baseline.json --threshold 0.25
+    python -m benchmarks.micro --filter interpolate --sizes 100,1000
+"""
+import argparse
+import platform
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from benchmarks.common import read_json, write_json
+from client.interpolation import StateBuffer, interpolate_states
+from server.game_logic import resolve_coin_collisions, spawn_coin, update_player_positions
+from server.game_state import Coin, GameState, PlayerState
+from server.protocol import decode_message, encode_message
+
+
+DEFAULT_SIZES = (10, 100, 1000)
+
+
+@dataclass
+class Case:
+    """A benchmarked function; setup(n) returns the zero-argument call to time."""
+    name: str
+    setup: Callable[[int], Callable[[], Any]]
+    scaled: bool = True  # False if the cost doesn't depend on entity count
+
+
+def make_game_state(n: int, seed: int = 1) -> GameState:
+    """
+    A world with n moving players and n coins.
+    
+    Players stay in the left half and coins in the right half, so collision
+    checks scan every pair without ever collecting anything.
+    """
+    rng = random.Random(seed)
+    world_width = max(800.0, n * 4.0)
+    world_height = 600.0
+    game_state = GameState(world_width=world_width, world_height=world_height)
+    for i in range(n):
+        player = PlayerState(
+            id=f"player_{i}",
+            x=rng.uniform(20, world_width / 2 - 40),
+            y=rng.uniform(20, world_height - 20),
+            vx=rng.choice([-200.0, 200.0]),
+            vy=rng.choice([-200.0, 200.0])
+        )
+        game_state.players[player.id] = player
+    for i in range(n):
+        game_state.coins.append(
+            Coin(id=f"coin_{i}", x=rng.uniform(world_width / 2 + 20, world_width - 50), y=rng.uniform(50, 550))
+        )
+    return game_state
+
+
+def make_snapshots(n: int, count: int = 30, interval: float = 1.0 / 30) -> List[Tuple[float, dict]]:
+    """A sequence of state messages as a client receives them."""
+    game_state = make_game_state(n)
+    snapshots = []
+    for i in range(count):
+        update_player_positions(game_state, interval)
+        game_state.timestamp = i * interval
+        snapshots.append((game_state.timestamp, game_state.to_dict()))
+    return snapshots
+
+
+def setup_update_positions(n: int) -> Callable[[], Any]:
+    """One simulation step of player movement."""
+    game_state = make_game_state(n)
+    return lambda: update_player_positions(game_state, 1.0 / 30)
+
+
+def setup_coin_collisions(n: int) -> Callable[[], Any]:
+    """A full player-coin collision scan, swept along each player's last step."""
+    game_state = make_game_state(n)
+    starts = update_player_positions(game_state, 1.0 / 30)
+    return lambda: resolve_coin_collisions(game_state, starts)
+
+
+def setup_spawn_coin(n: int) -> Callable[[], Any]:
+    """Spawning a coin, removed again to keep the state constant."""
+    game_state = make_game_state(n)
+    
+    def spawn():
+        spawn_coin(game_state)
+        game_state.coins.pop()
+    return spawn
+
+
+def setup_to_dict(n: int) -> Callable[[], Any]:
+    """Building the state message."""
+    return make_game_state(n).to_dict
+
+
+def setup_from_dict(n: int) -> Callable[[], Any]:
+    """Parsing a state message back into a GameState."""
+    data = make_game_state(n).to_dict()
+    return lambda: GameState.from_dict(data)
+
+
+def setup_encode(n: int) -> Callable[[], Any]:
+    """Serializing a state message to JSON."""
+    message = make_game_state(n).to_dict()
+    return lambda: encode_message(message)
+
+
+def setup_decode(n: int) -> Callable[[], Any]:
+    """Parsing a JSON state message."""
+    data = encode_message(make_game_state(n).to_dict())
+    return lambda: decode_message(data)
+
+
+def setup_interpolate(n: int) -> Callable[[], Any]:
+    """Interpolating halfway between two snapshots."""
+    before, after = make_snapshots(n, count=2)
+    render_time = (before[0] + after[0]) / 2
+    return lambda: interpolate_states(before, after, render_time)
+
+
+def setup_state_buffer(n: int) -> Callable[[], Any]:
+    """A client frame's interpolation from a full buffer."""
+    state_buffer = StateBuffer(interpolation_delay=0.1)
+    for timestamp, state in make_snapshots(n):
+        state_buffer.add_snapshot(timestamp, state)
+    now = state_buffer.buffer[-1][0]
+    return lambda: state_buffer.get_interpolated_state(now=now)
+
+
+CASES = [
+    Case("update_player_positions", setup_update_positions),
+    Case("resolve_coin_collisions", setup_coin_collisions),
+    Case("spawn_coin", setup_spawn_coin, scaled=False),
+    Case("GameState.to_dict", setup_to_dict),
+    Case("GameState.from_dict", setup_from_dict),
+    Case("encode_message", setup_encode),
+    Case("decode_message", setup_decode),
+    Case("interpolate_states", setup_interpolate),
+    Case("StateBuffer.get_interpolated_state", setup_state_buffer),
+]
+
+
+def time_call(func: Callable[[], Any], repeats: int, min_time: float) -> Dict[str, float]:
+    """
+    Time a call, calibrating the loop count so each repeat runs at least
+    min_time seconds; returns the min and median time per call.
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed * 1.2)))
+    
+    per_call = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        per_call.append((time.perf_counter() - start) / loops)
+    per_call.sort()
+    return {
+        "min_us": per_call[0] * 1e6,
+        "median_us": per_call[len(per_call) // 2] * 1e6,
+        "loops": loops
+    }
+
+
+def run_suite(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    name_filter: Optional[str] = None,
+    repeats: int = 5,
+    min_time: float = 0.05
+) -> Dict[str, Any]:
+    """Run every selected case at every size."""
+    results: Dict[str, Dict[str, Any]] = {}
+    for case in CASES:
+        if name_filter and name_filter not in case.name:
+            continue
+        for n in sizes if case.scaled else (None,):
+            key = f"{case.name}[n={n}]" if n is not None else case.name
+            timing = time_call(case.setup(n or 0), repeats, min_time)
+            results[key] = dict(timing, name=case.name, n=n)
+    
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "timestamp": time.time()
+        },
+        "results": results
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float,
+    metric: str = "min_us"
+) -> List[Dict[str, Any]]:
+    """
+    Ratio of current to baseline time for each case present in both.
+    
+    A case regressed if it takes more than (1 + threshold) times as long as
+    in the baseline. Minimums are compared by default, being the least
+    sensitive to noise from other processes.
+    """
+    rows = []
+    for key, result in current["results"].items():
+        before = baseline["results"].get(key)
+        if before is None or before[metric] <= 0:
+            continue
+        ratio = result[metric] / before[metric]
+        rows.append({
+            "case": key,
+            "baseline_us": before[metric],
+            "current_us": result[metric],
+            "ratio": ratio,
+            "regressed": ratio > 1.0 + threshold
+        })
+    return rows
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    """Print a human-readable table of timings."""
+    for key, result in results["results"].items():
+        print(f"  {key:<48} {result['min_us']:12.2f} us  (median {result['median_us']:.2f} us)")
+
+
+def print_comparison(rows: List[Dict[str, Any]], threshold: float) -> None:
+    """Print the comparison table, flagging regressions."""
+    print(f"Compared against baseline (threshold +{threshold:.0%}):")
+    for row in rows:
+        flag = "REGRESSED" if row["regressed"] else ""
+        print(
+            f"  {row['case']:<48} {row['baseline_us']:12.2f} -> {row['current_us']:12.2f} us  "
+            f"x{row['ratio']:.2f} {flag}"
+        )
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Hot path microbenchmarks")
+    parser.add_argument("--sizes", default=",".join(str(n) for n in DEFAULT_SIZES),
+                        help="comma-separated entity counts")
+    parser.add_argument("--filter", help="only run cases whose name contains this")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05,
+                        help="minimum seconds per timed repeat")
+    parser.add_argument("--json", help="write results (a baseline) to this file")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown before a case counts as regressed")
+    args = parser.parse_args()
+    
+    sizes = [int(n) for n in args.sizes.split(",") if n.strip()]
+    results = run_suite(sizes, args.filter, args.repeats, args.min_time)
+    print_results(results)
+    if args.json:
+        write_json(args.json, results)
+    
+    if args.compare:
+        baseline = read_json(args.compare)
+        rows = compare(baseline, results, args.threshold)
+        print_comparison(rows, args.threshold)
+        if any(row["regressed"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
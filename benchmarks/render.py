@@ -0,0 +1,253 @@
+"""
+Headless client render benchmark.
+
+Drives StateBuffer and Renderer with synthetic snapshots through SDL's dummy
+video driver, so it runs in CI and on machines without a display:
+
+    python -m benchmarks.render --players 2000 --coins 2000 --frames 600
+    python -m benchmarks.render --world 8000x6000 --dirty --json render.json
+"""
+import argparse
+import math
+import random
+import time
+from typing import Any, Dict, List
+from benchmarks.common import summarize, write_json
+from client.interpolation import StateBuffer
+from client.renderer import Renderer
+
+
+LOCAL_PLAYER_ID = "p0"
+
+
+class SyntheticFeed:
+    """Generates server-like snapshots for a world of wandering players."""
+    
+    def __init__(
+        self,
+        players: int,
+        coins: int,
+        world_width: float,
+        world_height: float,
+        text_churn: float,
+        camera_speed: float,
+        seed: int = 1
+    ):
+        self.rng = random.Random(seed)
+        self.world_width = world_width
+        self.world_height = world_height
+        self.text_churn = text_churn
+        self.camera_speed = camera_speed
+        
+        rng = self.rng
+        self.players = [
+            {
+                "id": f"p{i}",
+                "x": rng.uniform(20, world_width - 20),
+                "y": rng.uniform(20, world_height - 20),
+                "vx": rng.choice([-200.0, 0.0, 200.0]),
+                "vy": rng.choice([-200.0, 0.0, 200.0]),
+                "score": rng.randint(0, 50),
+                "color": [rng.randint(50, 255), rng.randint(50, 255), rng.randint(50, 255)],
+                "radius": 20.0
+            }
+            for i in range(max(1, players))
+        ]
+        self.coins = [
+            {
+                "id": f"c{i}",
+                "x": rng.uniform(50, world_width - 50),
+                "y": rng.uniform(50, world_height - 50),
+                "value": rng.choice([1, 1, 1, 2, 5]),
+                "radius": 10.0
+            }
+            for i in range(coins)
+        ]
+    
+    def snapshot(self, timestamp: float, delta_time: float) -> dict:
+        """Advance the world by delta_time and return a snapshot."""
+        rng = self.rng
+        
+        for player in self.players[1:]:
+            player["x"] += player["vx"] * delta_time
+            player["y"] += player["vy"] * delta_time
+            if not 20 <= player["x"] <= self.world_width - 20:
+                player["vx"] = -player["vx"]
+            if not 20 <= player["y"] <= self.world_height - 20:
+                player["vy"] = -player["vy"]
+            if rng.random() < self.text_churn:
+                player["score"] += 1
+        
+        # The local player circles the world center, dragging the camera
+        local = self.players[0]
+        radius = min(self.world_width, self.world_height) / 3
+        angle = timestamp * self.camera_speed / max(radius, 1.0)
+        local["x"] = self.world_width / 2 + math.cos(angle) * radius
+        local["y"] = self.world_height / 2 + math.sin(angle) * radius
+        local["vx"] = -math.sin(angle) * self.camera_speed
+        local["vy"] = math.cos(angle) * self.camera_speed
+        
+        return {
+            "type": "state",
+            "timestamp": timestamp,
+            "players": [dict(p) for p in self.players],
+            "coins": self.coins
+        }
+
+
+def run_benchmark(
+    players: int = 1000,
+    coins: int = 1000,
+    frames: int = 600,
+    world_width: float = 800.0,
+    world_height: float = 600.0,
+    text_churn: float = 0.05,
+    camera_speed: float = 150.0,
+    dirty_rects: bool = False,
+    cull: bool = True,
+    frame_rate: float = 60.0,
+    snapshot_rate: float = 30.0
+) -> Dict[str, Any]:
+    """Render synthetic frames and return timing statistics."""
+    renderer = Renderer(
+        dirty_rects=dirty_rects,
+        world_width=world_width,
+        world_height=world_height,
+        headless=True,
+        profile=True
+    )
+    feed = SyntheticFeed(players, coins, world_width, world_height, text_churn, camera_speed)
+    state_buffer = StateBuffer(interpolation_delay=0.1, cell_size=128.0 if cull else 0.0)
+    
+    # Simulated clock, so results don't depend on how fast frames render
+    sim_time = 0.0
+    next_snapshot = 0.0
+    frame_interval = 1.0 / frame_rate
+    snapshot_interval = 1.0 / snapshot_rate
+    frame_times: List[float] = []
+    
+    try:
+        for _ in range(frames):
+            while next_snapshot <= sim_time:
+                state_buffer.add_snapshot(next_snapshot, feed.snapshot(next_snapshot, snapshot_interval))
+                next_snapshot += snapshot_interval
+            
+            start = time.perf_counter()
+            view = None
+            if cull:
+                focus = state_buffer.latest_position(LOCAL_PLAYER_ID)
+                if focus is not None:
+                    renderer.camera.follow(*focus)
+                view = renderer.camera.view_rect(margin=100.0)
+            state = state_buffer.get_interpolated_state(now=sim_time, view=view)
+            interpolated = time.perf_counter()
+            renderer.render(state, LOCAL_PLAYER_ID)
+            end = time.perf_counter()
+            
+            frame_times.append(end - start)
+            renderer.timings["interpolate"] = renderer.timings.get("interpolate", 0.0) + (interpolated - start)
+            sim_time += frame_interval
+        
+        timings = dict(renderer.timings)
+        draw_calls = dict(renderer.draw_calls)
+        text_hits, text_misses = renderer.texts.hits, renderer.texts.misses
+    finally:
+        renderer.close()
+    
+    total = sum(frame_times)
+    results: Dict[str, Any] = {
+        "config": {
+            "players": players,
+            "coins": coins,
+            "frames": frames,
+            "world": [world_width, world_height],
+            "text_churn": text_churn,
+            "camera_speed": camera_speed,
+            "dirty_rects": dirty_rects,
+            "cull": cull
+        },
+        "fps": frames / total if total else 0.0,
+        "frame_time": summarize(frame_times),
+        "breakdown_ms": {stage: seconds / frames * 1000 for stage, seconds in timings.items()},
+        "draw_calls": draw_call_breakdown(draw_calls, frames),
+        "text_cache": {"hits": text_hits, "misses": text_misses}
+    }
+    return results
+
+
+def draw_call_breakdown(draw_calls: Dict[str, List[float]], frames: int) -> Dict[str, Dict[str, float]]:
+    """
+    Per draw call kind: calls and milliseconds per frame, and microseconds
+    per call. Sprite and text blits are submitted together in blits batches,
+    so their cost per call is the batches' time spread over every blit.
+    """
+    blitted = draw_calls.get("sprite", [0, 0.0])[0] + draw_calls.get("text", [0, 0.0])[0]
+    blit_seconds = draw_calls.get("blits", [0, 0.0])[1]
+    breakdown = {}
+    for kind, (calls, seconds) in draw_calls.items():
+        if kind in ("sprite", "text"):
+            seconds = blit_seconds * calls / blitted if blitted else 0.0
+        breakdown[kind] = {
+            "calls": calls / frames,
+            "ms": seconds / frames * 1000,
+            "us_per_call": seconds / calls * 1e6 if calls else 0.0
+        }
+    return breakdown
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    """Print a human-readable summary."""
+    config = results["config"]
+    frame_time = results["frame_time"]
+    print(
+        f"{config['players']} players, {config['coins']} coins, "
+        f"world {config['world'][0]:.0f}x{config['world'][1]:.0f}, "
+        f"dirty_rects={config['dirty_rects']}, cull={config['cull']}"
+    )
+    print(
+        f"  {results['fps']:.1f} fps  mean {frame_time['mean_ms']:.2f} ms  "
+        f"p50 {frame_time['p50_ms']:.2f} ms  p99 {frame_time['p99_ms']:.2f} ms"
+    )
+    print("  per-frame breakdown:")
+    for stage, ms in sorted(results["breakdown_ms"].items(), key=lambda item: -item[1]):
+        print(f"    {stage:<12} {ms:8.3f} ms")
+    print("  draw calls per frame:")
+    for kind, calls in sorted(results["draw_calls"].items(), key=lambda item: -item[1]["ms"]):
+        print(f"    {kind:<12} {calls['calls']:8.1f} calls {calls['ms']:8.3f} ms {calls['us_per_call']:8.2f} us/call")
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Headless renderer benchmark")
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--coins", type=int, default=1000)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--world", default="800x600", help="world size as WIDTHxHEIGHT")
+    parser.add_argument("--text-churn", type=float, default=0.05,
+                        help="chance per player per snapshot that their score changes")
+    parser.add_argument("--camera-speed", type=float, default=150.0,
+                        help="local player speed in pixels per second")
+    parser.add_argument("--dirty", action="store_true", help="use dirty-rect rendering")
+    parser.add_argument("--no-cull", action="store_true", help="disable spatial culling")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    
+    world_width, world_height = (float(v) for v in args.world.lower().split("x"))
+    results = run_benchmark(
+        players=args.players,
+        coins=args.coins,
+        frames=args.frames,
+        world_width=world_width,
+        world_height=world_height,
+        text_churn=args.text_churn,
+        camera_speed=args.camera_speed,
+        dirty_rects=args.dirty,
+        cull=not args.no_cull
+    )
+    print_report(results)
+    if args.json:
+        write_json(args.json, results)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
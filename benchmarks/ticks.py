@@ -0,0 +1,123 @@
+"""
+Server simulation throughput in ticks per second.
+
+Runs the CPU-bound part of a server tick (movement, coin collisions and
+respawns, taking the state view and encoding the broadcast) back to back,
+with players changing direction at random, and reports how many ticks per
+second the hot modules sustain. Run it once on pure Python and once on the
+mypyc build (see server/native.py) to compare them:
+
+    python -m server.native clean
+    python -m benchmarks.ticks --players 500 --json pure.json
+    python -m server.native build
+    python -m benchmarks.ticks --players 500 --compare pure.json
+
+It also reports the tracked objects each tick allocates and the garbage
+collections that landed inside ticks. With --defer-gc, collections are run
+between ticks, in the slack a real server would sleep through:
+
+    python -m benchmarks.ticks --players 2000 --defer-gc
+"""
+import argparse
+import random
+import time
+from typing import Any, Dict
+from benchmarks.common import read_json, summarize, write_json
+from benchmarks.micro import make_game_state
+from server.gc_control import GcController
+from server.game_logic import resolve_coin_collisions, set_player_velocity, spawn_coin, update_player_positions
+from server.native import compiled_modules
+from server.protocol import create_state_message, encode_message
+
+
+MOVES = ("up", "down", "left", "right", "stop")
+
+
+def run_benchmark(
+    players: int,
+    duration: float,
+    tick_rate: int = 30,
+    seed: int = 1,
+    defer_gc: bool = False
+) -> Dict[str, Any]:
+    """Simulate ticks for duration seconds of wall time."""
+    rng = random.Random(seed)
+    game_state = make_game_state(players, seed)
+    player_list = list(game_state.players.values())
+    coin_count = len(game_state.coins)
+    delta_time = 1.0 / tick_rate
+    
+    gc_control = GcController(defer=defer_gc)
+    tick_times = []
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        gc_control.start_tick()
+        tick_start = time.perf_counter()
+        
+        # Some players press a key every tick
+        for player in rng.sample(player_list, max(1, players // 20)):
+            set_player_velocity(player, rng.choice(MOVES))
+        starts = update_player_positions(game_state, delta_time)
+        for _ in resolve_coin_collisions(game_state, starts):
+            pass
+        while len(game_state.coins) < coin_count:
+            spawn_coin(game_state)
+        game_state.timestamp += delta_time
+        encode_message(create_state_message(game_state.view(), 0, []))
+        
+        tick_times.append(time.perf_counter() - tick_start)
+        gc_control.collect_in_slack(max(0.0, delta_time - tick_times[-1]))
+    gc_control.close()
+    
+    return {
+        "config": {"players": players, "coins": coin_count, "duration": duration, "defer_gc": defer_gc},
+        "compiled": compiled_modules(),
+        "ticks": len(tick_times),
+        "ticks_per_second": len(tick_times) / sum(tick_times),
+        "tick_time": summarize(tick_times),
+        "gc": gc_control.status()
+    }
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    """Print a human-readable summary."""
+    config = results["config"]
+    compiled = [name for name, native in results["compiled"].items() if native]
+    tick_time = results["tick_time"]
+    print(f"{config['players']} players, {config['coins']} coins, compiled: {', '.join(compiled) or 'none'}")
+    print(
+        f"  {results['ticks_per_second']:.1f} ticks/sec  mean {tick_time['mean_ms']:.3f} ms  "
+        f"p50 {tick_time['p50_ms']:.3f} ms  p99 {tick_time['p99_ms']:.3f} ms  max {tick_time['max_ms']:.3f} ms"
+    )
+    gc_status = results["gc"]
+    print(
+        f"  {gc_status['tick_objects']['mean']:.0f} objects/tick  "
+        f"{gc_status['unscheduled']['collections']} collections in ticks "
+        f"({gc_status['unscheduled']['pause_ms']:.1f} ms, max {gc_status['unscheduled']['max_ms']:.3f} ms)  "
+        f"{gc_status['scheduled']['collections']} between ticks ({gc_status['scheduled']['pause_ms']:.1f} ms)"
+    )
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Server tick throughput benchmark")
+    parser.add_argument("--players", type=int, default=500, help="players (and coins) in the world")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds to run")
+    parser.add_argument("--defer-gc", action="store_true", help="collect garbage between ticks instead of in them")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="earlier results to report the speedup against")
+    args = parser.parse_args()
+    
+    results = run_benchmark(args.players, args.duration, defer_gc=args.defer_gc)
+    print_report(results)
+    if args.json:
+        write_json(args.json, results)
+    
+    if args.compare:
+        baseline = read_json(args.compare)
+        speedup = results["ticks_per_second"] / baseline["ticks_per_second"]
+        print(f"  x{speedup:.2f} ticks/sec against {args.compare} ({baseline['ticks_per_second']:.1f} ticks/sec)")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
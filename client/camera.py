@@ -0,0 +1,109 @@
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+Rect = Tuple[float, float, float, float]  # (left, top, right, bottom)
+
+
+class Camera:
+    """Viewport onto the world that follows a target and maps world to screen."""
+    
+    def __init__(
+        self,
+        view_width: int,
+        view_height: int,
+        world_width: Optional[float] = None,
+        world_height: Optional[float] = None
+    ):
+        self.view_width = view_width
+        self.view_height = view_height
+        self.world_width = float(world_width if world_width is not None else view_width)
+        self.world_height = float(world_height if world_height is not None else view_height)
+        
+        # World coordinates of the top-left corner of the view
+        self.x = 0.0
+        self.y = 0.0
+    
+    def set_world_size(self, world_width: float, world_height: float) -> None:
+        """Update the world bounds the camera is clamped to."""
+        self.world_width = float(world_width)
+        self.world_height = float(world_height)
+        self.x = _clamp_axis(self.x, self.view_width, self.world_width)
+        self.y = _clamp_axis(self.y, self.view_height, self.world_height)
+    
+    def follow(self, x: float, y: float) -> None:
+        """Center the view on a world position, clamped to the world edges."""
+        self.x = _clamp_axis(x - self.view_width / 2, self.view_width, self.world_width)
+        self.y = _clamp_axis(y - self.view_height / 2, self.view_height, self.world_height)
+    
+    def world_to_screen(self, x: float, y: float) -> Tuple[int, int]:
+        """Convert a world position to integer screen coordinates."""
+        return int(x - self.x), int(y - self.y)
+    
+    def view_rect(self, margin: float = 0.0) -> Rect:
+        """World-space rectangle covered by the view, grown by margin."""
+        return (
+            self.x - margin,
+            self.y - margin,
+            self.x + self.view_width + margin,
+            self.y + self.view_height + margin
+        )
+    
+    def is_visible(self, x: float, y: float, radius: float) -> bool:
+        """Check if a circle in world space overlaps the view."""
+        return (
+            x + radius >= self.x and x - radius <= self.x + self.view_width and
+            y + radius >= self.y and y - radius <= self.y + self.view_height
+        )
+
+
+def _clamp_axis(position: float, view_size: float, world_size: float) -> float:
+    """Clamp one camera axis; worlds smaller than the view are centered."""
+    if world_size <= view_size:
+        return (world_size - view_size) / 2
+    return max(0.0, min(world_size - view_size, position))
+
+
+class SpatialGrid:
+    """Uniform grid spatial index over points, rebuilt wholesale per snapshot."""
+    
+    def __init__(self, cell_size: float = 128.0):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[Hashable]] = {}
+    
+    def rebuild(self, points: Iterable[Tuple[Hashable, float, float]]) -> None:
+        """Replace the index contents with (key, x, y) points."""
+        cells: Dict[Tuple[int, int], List[Hashable]] = {}
+        cell_size = self.cell_size
+        for key, x, y in points:
+            cell = (int(x // cell_size), int(y // cell_size))
+            bucket = cells.get(cell)
+            if bucket is None:
+                cells[cell] = [key]
+            else:
+                bucket.append(key)
+        self.cells = cells
+    
+    def query(self, rect: Rect) -> List[Hashable]:
+        """Return keys of points in cells overlapping the rectangle."""
+        left, top, right, bottom = rect
+        cell_size = self.cell_size
+        min_cx, max_cx = int(left // cell_size), int(right // cell_size)
+        min_cy, max_cy = int(top // cell_size), int(bottom // cell_size)
+        
+        # Small worlds or huge views: walking the occupied cells is cheaper
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(self.cells):
+            return [
+                key
+                for (cx, cy), bucket in self.cells.items()
+                if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy
+                for key in bucket
+            ]
+        
+        result: List[Hashable] = []
+        cells = self.cells
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    result.extend(bucket)
+        return result
\ No newline at end of file
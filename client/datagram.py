@@ -0,0 +1,124 @@
+"""
+Client end of the datagram transport (see server/datagram.py).
+
+Until the first state datagram arrives the client says hello with its
+session token, so the server learns where to send; after that input goes
+over UDP too. Each input carries a sequence number, and the current move is
+resent every resend_interval so a lost packet only delays it briefly (and
+the server hears that the path is still alive). State datagrams older than
+the newest one received are dropped. If state stops arriving for timeout
+seconds the client falls back to the WebSocket and says hello again, just
+as the server stops sending to a session it no longer hears from.
+"""
+import asyncio
+import json
+from typing import Any, Callable, Dict, Optional
+
+
+class DatagramClient(asyncio.DatagramProtocol):
+    """A session's UDP channel to the server."""
+    
+    def __init__(
+        self,
+        token: str,
+        on_state: Callable[[Dict[str, Any]], None],
+        hello_interval: float = 0.5,
+        resend_interval: float = 0.1,
+        timeout: float = 2.0
+    ):
+        self.token = token
+        self.on_state = on_state
+        self.hello_interval = hello_interval
+        self.resend_interval = resend_interval
+        self.timeout = timeout
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        
+        self.active = False  # Set once state arrives over UDP
+        self.seq = 0
+        self.last_tick = -1
+        self.heard_at = 0.0
+        self.move: Optional[str] = "stop"
+        self.received = 0
+        self.stale = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+    
+    def connection_made(self, transport) -> None:
+        """Start saying hello."""
+        self.transport = transport
+        self._keepalive()
+    
+    def connection_lost(self, exc) -> None:
+        """Stop the keepalive timer."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self.transport = None
+    
+    def _keepalive(self) -> None:
+        """Say hello until state arrives, then keep resending the current move."""
+        if self.transport is None:
+            return
+        loop = asyncio.get_running_loop()
+        if self.active and loop.time() - self.heard_at > self.timeout:
+            self.active = False  # The path went quiet
+        if self.active:
+            self._send_input()
+        else:
+            self._send({"type": "hello", "token": self.token})
+        interval = self.resend_interval if self.active else self.hello_interval
+        self._timer = loop.call_later(interval, self._keepalive)
+    
+    def datagram_received(self, data: bytes, address) -> None:
+        """Pass on state datagrams newer than any before them."""
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return
+        if not isinstance(message, dict) or message.get("type") != "state":
+            return
+        
+        tick = message.get("tick")
+        if not isinstance(tick, int) or tick <= self.last_tick:
+            self.stale += 1  # Overtaken by a newer state
+            return
+        self.last_tick = tick
+        self.received += 1
+        self.heard_at = asyncio.get_running_loop().time()
+        self.active = True
+        self.on_state(message)
+    
+    def send_input(self, move: Optional[str], trace_id: Optional[int] = None) -> None:
+        """Send a new move, which is then resent until it changes."""
+        self.move = move
+        self._send_input(trace_id)
+    
+    def _send_input(self, trace_id: Optional[int] = None) -> None:
+        """Send the current move under the next sequence number."""
+        self.seq += 1
+        message = {"type": "input", "token": self.token, "seq": self.seq, "move": self.move}
+        if trace_id is not None:
+            message["trace"] = trace_id
+        self._send(message)
+    
+    def _send(self, message: dict) -> None:
+        """Send one datagram; losing it is fine."""
+        if self.transport is not None:
+            self.transport.sendto(json.dumps(message).encode())
+    
+    def close(self) -> None:
+        """Close the socket."""
+        if self.transport is not None:
+            self.transport.close()
+
+
+async def open_datagram_client(
+    host: str,
+    port: int,
+    token: str,
+    on_state: Callable[[Dict[str, Any]], None]
+) -> DatagramClient:
+    """Open a UDP socket to the server's datagram port."""
+    loop = asyncio.get_running_loop()
+    _, client = await loop.create_datagram_endpoint(
+        lambda: DatagramClient(token, on_state), remote_addr=(host, port)
+    )
+    return client
\ No newline at end of file
@@ -1,53 +1,233 @@
 import time
+import heapq
 from typing import List, Tuple, Optional, Dict
 from collections import deque
+from client.camera import Rect, SpatialGrid
+
+
+class SnapshotIndex:
+    """Per-snapshot lookup tables used to cull entities outside the view."""
+    
+    def __init__(self, state: dict, cell_size: float, previous: Optional['SnapshotIndex'] = None):
+        self.players: List[dict] = state.get("players", [])
+        self.coins: List[dict] = state.get("coins", [])
+        self.players_by_id = {p["id"]: p for p in self.players}
+        
+        # Grids store list positions so culled output keeps snapshot order
+        self.player_grid = SpatialGrid(cell_size)
+        self.player_grid.rebuild((i, p["x"], p["y"]) for i, p in enumerate(self.players))
+        if previous is not None and previous.coins is self.coins:
+            # Coins are unchanged since the previous snapshot (the client's
+            # world model shares one list until they change)
+            self.coin_grid = previous.coin_grid
+        else:
+            self.coin_grid = SpatialGrid(cell_size)
+            self.coin_grid.rebuild((i, c["x"], c["y"]) for i, c in enumerate(self.coins))
+        
+        # The scoreboard needs the leaders even when they are off screen
+        self.leaders = heapq.nlargest(5, self.players, key=lambda p: p["score"])
+    
+    def visible_players(self, rect: Rect) -> List[dict]:
+        """Players whose position falls in grid cells overlapping rect."""
+        return [self.players[i] for i in sorted(self.player_grid.query(rect))]
+    
+    def visible_coins(self, rect: Rect) -> List[dict]:
+        """Coins whose position falls in grid cells overlapping rect."""
+        return [self.coins[i] for i in sorted(self.coin_grid.query(rect))]
 
 
 class StateBuffer:
     """Buffer for storing game state snapshots for interpolation."""
     
-    def __init__(self, max_size: int = 30, interpolation_delay: float = 0.1):
+    def __init__(
+        self,
+        max_size: int = 30,
+        interpolation_delay: float = 0.1,
+        extrapolation_limit: float = 0.0,
+        blend_time: float = 0.1,
+        use_hermite: bool = False,
+        cell_size: float = 0.0
+    ):
         self.buffer: deque = deque(maxlen=max_size)
         self.interpolation_delay = interpolation_delay
+        
+        # Spatial index per snapshot (parallel to buffer) so a view can be
+        # culled before interpolating; 0 disables indexing.
+        self.cell_size = cell_size
+        self.indices: deque = deque(maxlen=max_size)
+        
+        # Dead reckoning: how far past the newest snapshot we may project
+        # entities (0 disables extrapolation), and how long corrections take
+        # to blend back in once real data arrives.
+        self.extrapolation_limit = extrapolation_limit
+        self.blend_time = blend_time
+        self.use_hermite = use_hermite
+        
+        self.extrapolating = False
+        self._extrapolated_from = 0.0
+        self._last_positions: Dict[str, Tuple[float, float]] = {}
+        self._corrections: Dict[str, Tuple[float, float, float]] = {}
     
     def add_snapshot(self, timestamp: float, state: dict) -> None:
         """Add a new state snapshot to the buffer."""
         self.buffer.append((timestamp, state))
+        if self.cell_size > 0:
+            previous = self.indices[-1] if self.indices else None
+            self.indices.append(SnapshotIndex(state, self.cell_size, previous))
     
-    def get_interpolated_state(self) -> Optional[dict]:
+    def latest_position(self, player_id: Optional[str]) -> Optional[Tuple[float, float]]:
+        """Position of a player in the newest snapshot, if present."""
+        if not self.buffer or player_id is None:
+            return None
+        if self.indices:
+            player = self.indices[-1].players_by_id.get(player_id)
+        else:
+            player = next(
+                (p for p in self.buffer[-1][1].get("players", []) if p["id"] == player_id), None
+            )
+        return (player["x"], player["y"]) if player else None
+    
+    def leader_id(self) -> Optional[str]:
+        """Id of the top scorer in the newest snapshot, if any."""
+        if not self.buffer:
+            return None
+        if self.indices:
+            leaders = self.indices[-1].leaders
+        else:
+            leaders = heapq.nlargest(1, self.buffer[-1][1].get("players", []), key=lambda p: p["score"])
+        return leaders[0]["id"] if leaders else None
+    
+    def get_interpolated_state(
+        self, now: Optional[float] = None, view: Optional[Rect] = None
+    ) -> Optional[dict]:
         """
         Get an interpolated state based on current time minus interpolation delay.
         Returns None if not enough snapshots are available.
+        
+        If view is given (a world-space (left, top, right, bottom) rectangle)
+        and spatial indexing is enabled, only entities near the view are
+        interpolated, and the state carries the top five players as "leaders".
         """
         if len(self.buffer) < 2:
             return None
         
+        if now is None:
+            now = time.time()
+        
         # Calculate render time (current time - interpolation delay)
-        render_time = time.time() - self.interpolation_delay
+        render_time = now - self.interpolation_delay
         
+        # Past the newest snapshot: project forward instead of freezing
+        latest_time = self.buffer[-1][0]
+        if self.extrapolation_limit > 0 and render_time > latest_time:
+            latest = self.buffer[-1]
+            if view is not None and self.indices:
+                latest = (latest[0], self._cull(None, self.indices[-1], view))
+            state = extrapolate_state(latest, render_time, self.extrapolation_limit)
+            if "leaders" in latest[1]:
+                state["leaders"] = latest[1]["leaders"]
+            if self.extrapolating and latest_time != self._extrapolated_from:
+                # A newer (but still late) snapshot changed the projection base
+                self._start_corrections(state, now)
+            self.extrapolating = True
+            self._extrapolated_from = latest_time
+            return self._apply_corrections(state, now)
+        
+        if self.extrapolating:
+            # Real data caught up with our guess; blend from what was shown
+            self.extrapolating = False
+            state = self._interpolate(render_time, view)
+            self._start_corrections(state, now)
+            return self._apply_corrections(state, now)
+        
+        return self._apply_corrections(self._interpolate(render_time, view), now)
+    
+    def _interpolate(self, render_time: float, view: Optional[Rect] = None) -> dict:
+        """Interpolate between the snapshots bracketing render_time."""
         # Find two snapshots to interpolate between
-        snapshot_before = None
-        snapshot_after = None
+        before_index = None
         
         for i in range(len(self.buffer) - 1):
-            t1, state1 = self.buffer[i]
-            t2, state2 = self.buffer[i + 1]
+            t1 = self.buffer[i][0]
+            t2 = self.buffer[i + 1][0]
             
             if t1 <= render_time <= t2:
-                snapshot_before = (t1, state1)
-                snapshot_after = (t2, state2)
+                before_index = i
                 break
         
         # If we didn't find a pair, use the two most recent
-        if snapshot_before is None or snapshot_after is None:
-            if len(self.buffer) >= 2:
-                snapshot_before = self.buffer[-2]
-                snapshot_after = self.buffer[-1]
-            else:
-                return self.buffer[-1][1] if self.buffer else None
+        if before_index is None:
+            before_index = len(self.buffer) - 2
+        
+        snapshot_before = self.buffer[before_index]
+        snapshot_after = self.buffer[before_index + 1]
+        
+        if view is not None and self.indices:
+            index_before = self.indices[before_index]
+            index_after = self.indices[before_index + 1]
+            snapshot_before = (snapshot_before[0], self._cull(index_after, index_before, view))
+            snapshot_after = (snapshot_after[0], self._cull(None, index_after, view))
         
         # Interpolate between the two snapshots
-        return interpolate_states(snapshot_before, snapshot_after, render_time)
+        state = interpolate_states(
+            snapshot_before, snapshot_after, render_time, use_hermite=self.use_hermite
+        )
+        if view is not None and self.indices:
+            state["leaders"] = snapshot_after[1]["leaders"]
+        return state
+    
+    def _cull(
+        self, match: Optional[SnapshotIndex], index: SnapshotIndex, view: Rect
+    ) -> dict:
+        """
+        Build a cut-down state holding only entities near the view.
+        
+        With match given, players are instead looked up by id for every
+        player visible in match, so both ends of an interpolation agree.
+        """
+        if match is None:
+            return {
+                "players": index.visible_players(view),
+                "coins": index.visible_coins(view),
+                "leaders": index.leaders
+            }
+        
+        # Coins are only ever taken from the later snapshot
+        by_id = index.players_by_id
+        players = [by_id[p["id"]] for p in match.visible_players(view) if p["id"] in by_id]
+        return {"players": players, "coins": [], "leaders": index.leaders}
+    
+    def _start_corrections(self, state: dict, now: float) -> None:
+        """Record the error between the last shown and the corrected positions."""
+        for player in state["players"]:
+            shown = self._last_positions.get(player["id"])
+            if shown is None:
+                continue
+            dx = shown[0] - player["x"]
+            dy = shown[1] - player["y"]
+            if dx or dy:
+                self._corrections[player["id"]] = (dx, dy, now)
+    
+    def _apply_corrections(self, state: dict, now: float) -> dict:
+        """Add decaying correction offsets and remember the shown positions."""
+        if self._corrections:
+            for i, player in enumerate(state["players"]):
+                correction = self._corrections.get(player["id"])
+                if correction is None:
+                    continue
+                dx, dy, start = correction
+                remaining = 1.0 - (now - start) / self.blend_time if self.blend_time > 0 else 0.0
+                if remaining <= 0:
+                    del self._corrections[player["id"]]
+                    continue
+                # Copy so buffered snapshots are never modified
+                corrected = dict(player)
+                corrected["x"] += dx * remaining
+                corrected["y"] += dy * remaining
+                state["players"][i] = corrected
+        
+        self._last_positions = {p["id"]: (p["x"], p["y"]) for p in state["players"]}
+        return state
 
 
 def lerp(a: float, b: float, t: float) -> float:
@@ -55,10 +235,60 @@ def lerp(a: float, b: float, t: float) -> float:
     return a + (b - a) * t
 
 
+def hermite(p0: float, v0: float, p1: float, v1: float, t: float, duration: float) -> float:
+    """
+    Cubic Hermite interpolation between two positions using their velocities.
+    
+    Args:
+        p0, v0: position and velocity at the start
+        p1, v1: position and velocity at the end
+        t: normalized time in [0, 1]
+        duration: time in seconds between the two samples
+    """
+    t2 = t * t
+    t3 = t2 * t
+    h00 = 2 * t3 - 3 * t2 + 1
+    h10 = t3 - 2 * t2 + t
+    h01 = -2 * t3 + 3 * t2
+    h11 = t3 - t2
+    return h00 * p0 + h10 * v0 * duration + h01 * p1 + h11 * v1 * duration
+
+
+def extrapolate_state(
+    snapshot: Tuple[float, dict],
+    render_time: float,
+    max_extrapolation: float
+) -> dict:
+    """
+    Project a snapshot forward using each player's last known velocity.
+    
+    The projection is capped at max_extrapolation seconds past the snapshot,
+    after which entities hold their last projected position.
+    """
+    timestamp, state = snapshot
+    dt = max(0.0, min(render_time - timestamp, max_extrapolation))
+    
+    extrapolated_state = {
+        "type": "state",
+        "timestamp": render_time,
+        "players": [],
+        "coins": list(state.get("coins", []))
+    }
+    
+    for player in state.get("players", []):
+        projected = dict(player)
+        projected["x"] = player["x"] + player.get("vx", 0.0) * dt
+        projected["y"] = player["y"] + player.get("vy", 0.0) * dt
+        extrapolated_state["players"].append(projected)
+    
+    return extrapolated_state
+
+
 def interpolate_states(
     snapshot_before: Tuple[float, dict],
     snapshot_after: Tuple[float, dict],
-    render_time: float
+    render_time: float,
+    use_hermite: bool = False
 ) -> dict:
     """
     Interpolate between two game state snapshots.
@@ -67,6 +297,7 @@ def interpolate_states(
         snapshot_before: (timestamp, state) tuple for earlier state
         snapshot_after: (timestamp, state) tuple for later state
         render_time: time to render at
+        use_hermite: use velocity-aware cubic interpolation instead of lerp
     
     Returns:
         Interpolated state dictionary
@@ -98,25 +329,30 @@ def interpolate_states(
             p1 = players1[player_id]
             p2 = players2[player_id]
             
-            interpolated_player = {
-                "id": player_id,
-                "x": lerp(p1["x"], p2["x"], alpha),
-                "y": lerp(p1["y"], p2["y"], alpha),
-                "vx": p2["vx"],
-                "vy": p2["vy"],
-                "score": p2["score"],
-                "color": p2["color"],
-                "radius": p2["radius"]
-            }
+            if use_hermite:
+                duration = t2 - t1
+                x = hermite(p1["x"], p1.get("vx", 0.0), p2["x"], p2.get("vx", 0.0), alpha, duration)
+                y = hermite(p1["y"], p1.get("vy", 0.0), p2["y"], p2.get("vy", 0.0), alpha, duration)
+            else:
+                x = lerp(p1["x"], p2["x"], alpha)
+                y = lerp(p1["y"], p2["y"], alpha)
+            
+            if x == p2["x"] and y == p2["y"]:
+                # Standing still: the latest snapshot's player will do
+                interpolated_state["players"].append(p2)
+                continue
+            
+            # Copying the latest player keeps every static field for the
+            # price of one dict copy
+            interpolated_player = dict(p2)
+            interpolated_player["x"] = x
+            interpolated_player["y"] = y
             interpolated_state["players"].append(interpolated_player)
         else:
             # New player, just use the latest state
             interpolated_state["players"].append(players2[player_id])
     
-    # Interpolate coin positions (coins don't move, so just use latest)
-    coins2 = {c["id"]: c for c in state2.get("coins", [])}
-    
-    for coin_id, coin in coins2.items():
-        interpolated_state["coins"].append(coin)
+    # Coins don't move, so share the latest snapshot's list
+    interpolated_state["coins"] = state2.get("coins", [])
     
     return interpolated_state
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""
+Input-to-photon latency tracing.
+
+When tracing, each input the client sends carries a trace id. The server
+echoes the id with the times it received the input and simulated it, in
+the first state broadcast reflecting it; the network thread stamps that
+broadcast's arrival and the render loop the first frame drawn at or past
+its timestamp. Each traced input is split into stages:
+
+    uplink    input read -> server received it
+    queue     server received -> tick that simulated it
+    snapshot  tick -> state broadcast (ticks skipped under overload)
+    downlink  state timestamp -> client received it (encoding, network)
+    render    client received -> first frame showing it (interpolation delay)
+
+uplink and downlink compare client and server clocks, like interpolation
+does; on separate machines they are only as good as clock sync, while
+their sum and the total are not affected.
+"""
+import json
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+
+STAGES = ("uplink", "queue", "snapshot", "downlink", "render", "total")
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values (pct in 0-100)."""
+    return percentiles(values, (pct,))[0]
+
+
+def percentiles(values: Sequence[float], pcts: Sequence[float]) -> List[float]:
+    """Nearest-rank percentiles of a list of values, sorting it once."""
+    if not values:
+        return [0.0 for _ in pcts]
+    ordered = sorted(values)
+    return [ordered[max(1, math.ceil(pct / 100.0 * len(ordered))) - 1] for pct in pcts]
+
+
+class LatencyTracer:
+    """Collects per-stage latency of traced inputs."""
+    
+    def __init__(self, max_samples: int = 10000, timeout: float = 5.0):
+        self.timeout = timeout  # Forget inputs whose echo never arrives
+        self.next_id = 0
+        self.inputs: Dict[int, float] = {}  # Trace id to input time
+        self.waiting: List[dict] = []  # Received, not yet drawn
+        # Only the newest max_samples are kept
+        self.records: Deque[Dict[str, float]] = deque(maxlen=max_samples)
+        
+        # Echoes handed over by the network thread; deque appends and
+        # poplefts are atomic, so no lock is needed
+        self._arrivals: deque = deque()
+    
+    def begin(self, now: Optional[float] = None) -> int:
+        """Start tracing an input; returns the id to send with it."""
+        trace_id = self.next_id
+        self.next_id += 1
+        self.inputs[trace_id] = time.time() if now is None else now
+        return trace_id
+    
+    def arrived(self, traces: List[dict], timestamp: float, now: Optional[float] = None) -> None:
+        """Hand over our echoed traces from a state message (network thread)."""
+        received = time.time() if now is None else now
+        for trace in traces:
+            self._arrivals.append(dict(trace, timestamp=timestamp, arrived=received))
+    
+    def frame(self, render_time: float, now: Optional[float] = None) -> int:
+        """
+        Note a frame drawn at render_time (in server time); completes traces
+        whose state it is at or past. Returns how many completed.
+        """
+        if now is None:
+            now = time.time()
+        while self._arrivals:
+            self.waiting.append(self._arrivals.popleft())
+        
+        completed = 0
+        still_waiting = []
+        for trace in self.waiting:
+            if trace["timestamp"] > render_time:
+                still_waiting.append(trace)
+                continue
+            input_time = self.inputs.pop(trace["trace"], None)
+            if input_time is not None:
+                self._record(input_time, trace, now)
+                completed += 1
+        self.waiting = still_waiting
+        
+        if self.inputs:
+            stale = [trace_id for trace_id, t in self.inputs.items() if now - t > self.timeout]
+            for trace_id in stale:
+                del self.inputs[trace_id]
+        return completed
+    
+    def _record(self, input_time: float, trace: dict, drawn: float) -> None:
+        """Split one completed trace into stages."""
+        self.records.append({
+            "uplink": trace["received"] - input_time,
+            "queue": trace["tick"] - trace["received"],
+            "snapshot": trace["timestamp"] - trace["tick"],
+            "downlink": trace["arrived"] - trace["timestamp"],
+            "render": drawn - trace["arrived"],
+            "total": drawn - input_time
+        })
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Percentiles of each stage, in milliseconds."""
+        summary = {}
+        for stage in STAGES:
+            p50, p90, p99 = percentiles([record[stage] for record in self.records], (50, 90, 99))
+            summary[stage] = {"p50_ms": p50 * 1000, "p90_ms": p90 * 1000, "p99_ms": p99 * 1000}
+        return summary
+    
+    def overlay_lines(self) -> List[str]:
+        """Lines for the on-screen latency overlay."""
+        lines = [f"Latency ({len(self.records)} inputs)  p50 / p99 ms"]
+        for stage, stats in self.summary().items():
+            lines.append(f"{stage}: {stats['p50_ms']:.0f} / {stats['p99_ms']:.0f}")
+        return lines
+    
+    def dump(self, path: str) -> None:
+        """Write the summary and every traced input's stages to a JSON file."""
+        data: Dict[str, Any] = {"summary": self.summary(), "traces": list(self.records)}
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
\ No newline at end of file
@@ -1,141 +1,182 @@
-import asyncio
-import websockets
+import argparse
+import time
 import pygame
-import json
-import sys
+from typing import Optional
+from client.latency import LatencyTracer
 from client.renderer import Renderer
 from client.input_handler import InputHandler
 from client.interpolation import StateBuffer
+from client.network import NetworkThread, SnapshotMailbox
+
+
+# World-space margin around the view for culling, covering movement between
+# the newest snapshot and the interpolated render time
+VIEW_MARGIN = 100.0
+
+# How long to wait for the connection and welcome message
+CONNECT_TIMEOUT = 10.0
+
+# Least time between latency overlay refreshes; summarizing the traces
+# every frame would add to the latency being measured
+OVERLAY_INTERVAL = 0.25
 
 
 class GameClient:
     """Main game client that connects to server and runs the game."""
     
-    def __init__(self, server_url: str = "ws://localhost:8765"):
+    def __init__(
+        self,
+        server_url: str = "ws://localhost:8765",
+        trace_path: Optional[str] = None,
+        name: Optional[str] = None
+    ):
         self.server_url = server_url
-        self.renderer = Renderer()
+        self.renderer = Renderer(dirty_rects=True)
         self.input_handler = InputHandler()
-        self.state_buffer = StateBuffer(max_size=30, interpolation_delay=0.1)
+        self.state_buffer = StateBuffer(
+            max_size=30,
+            interpolation_delay=0.1,
+            extrapolation_limit=0.25,
+            blend_time=0.15,
+            cell_size=128.0
+        )
+        
+        # Network receive and JSON decoding run on their own thread and
+        # event loop; decoded snapshots reach the render loop via the mailbox
+        self.mailbox = SnapshotMailbox()
+        
+        # Opt-in input-to-photon latency tracing, written to trace_path on exit
+        self.trace_path = trace_path
+        self.tracer = LatencyTracer() if trace_path else None
+        self.overlay_stale = True  # Traces completed since the overlay was drawn
+        self.overlay_refreshed = 0.0
+        self.network = NetworkThread(server_url, self.mailbox, self.tracer, name)
         
-        self.websocket = None
         self.player_id = None
         self.running = True
         self.clock = pygame.time.Clock()
     
-    async def connect(self):
+    def connect(self):
         """Connect to the game server."""
-        try:
-            self.websocket = await websockets.connect(self.server_url)
-            print(f"Connected to server at {self.server_url}")
-            
-            # Receive welcome message
-            welcome_msg = await self.websocket.recv()
-            welcome_data = json.loads(welcome_msg)
-            
-            if welcome_data.get("type") == "welcome":
-                self.player_id = welcome_data.get("player_id")
-                print(f"Assigned player ID: {self.player_id}")
+        self.network.start()
+        self.network.ready.wait(CONNECT_TIMEOUT)
         
-        except Exception as e:
-            print(f"Failed to connect to server: {e}")
+        welcome_data = self.network.welcome
+        if welcome_data is None:
             self.running = False
+            return
+        
+        self.player_id = welcome_data.get("player_id")
+        self.renderer.camera.set_world_size(
+            welcome_data.get("world_width", self.renderer.width),
+            welcome_data.get("world_height", self.renderer.height)
+        )
+        if self.player_id is None:
+            print("Spectating")
+        else:
+            print(f"Assigned player ID: {self.player_id}")
     
-    async def send_input(self, move: str):
+    def send_input(self, move: str, trace_id: Optional[int] = None):
         """Send input to server."""
-        if self.websocket:
-            try:
-                message = {
-                    "type": "input",
-                    "id": self.player_id,
-                    "move": move
-                }
-                await self.websocket.send(json.dumps(message))
-            except websockets.exceptions.ConnectionClosed:
-                print("Connection to server lost")
-                self.running = False
+        message = {
+            "type": "input",
+            "id": self.player_id,
+            "move": move
+        }
+        if trace_id is not None:
+            message["trace"] = trace_id
+        self.network.send(message)
     
-    async def receive_updates(self):
-        """Continuously receive state updates from server."""
-        try:
-            while self.running:
-                message = await self.websocket.recv()
-                data = json.loads(message)
-                
-                if data.get("type") == "state":
-                    # Add state to buffer for interpolation
-                    timestamp = data.get("timestamp")
-                    self.state_buffer.add_snapshot(timestamp, data)
+    def receive_updates(self):
+        """Move snapshots decoded by the network thread into the state buffer."""
+        for timestamp, state in self.mailbox.drain():
+            self.state_buffer.add_snapshot(timestamp, state)
         
-        except websockets.exceptions.ConnectionClosed:
-            print("Server connection closed")
-            self.running = False
-        except Exception as e:
-            print(f"Error receiving updates: {e}")
+        if self.network.closed.is_set():
             self.running = False
     
-    async def game_loop(self):
+    def game_loop(self):
         """Main game loop handling input and rendering."""
-        receive_task = asyncio.create_task(self.receive_updates())
-        
-        try:
-            while self.running:
-                # Handle Pygame events
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
+        while self.running:
+            # Handle Pygame events
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.running = False
+                    break
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
                         self.running = False
                         break
-                    elif event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_ESCAPE:
-                            self.running = False
-                            break
-                
-                # Process input
-                move = self.input_handler.process_input()
-                if move is not None:
-                    await self.send_input(move)
-                
-                # Get interpolated state and render
-                interpolated_state = self.state_buffer.get_interpolated_state()
-                self.renderer.render(interpolated_state, self.player_id)
-                
-                # Cap frame rate at 60 FPS
-                self.clock.tick(60)
-                
-                # Small async yield to allow other tasks to run
-                await asyncio.sleep(0)
-        
-        finally:
-            receive_task.cancel()
-            try:
-                await receive_task
-            except asyncio.CancelledError:
-                pass
+            
+            # Process input (spectators have no player to move)
+            move = self.input_handler.process_input()
+            if move is not None and self.player_id is not None:
+                self.send_input(move, self.tracer.begin() if self.tracer else None)
+            
+            self.receive_updates()
+            
+            # Point the camera at our latest known position (spectators
+            # follow the leader) so only entities near the view are
+            # interpolated and drawn
+            follow_id = self.player_id if self.player_id is not None else self.state_buffer.leader_id()
+            focus = self.state_buffer.latest_position(follow_id)
+            if focus is not None:
+                self.renderer.camera.follow(*focus)
+            view = self.renderer.camera.view_rect(margin=VIEW_MARGIN)
+            
+            # Get interpolated state and render
+            now = time.time()
+            interpolated_state = self.state_buffer.get_interpolated_state(now=now, view=view)
+            self.renderer.render(interpolated_state, self.player_id)
+            if self.tracer is not None and interpolated_state is not None:
+                self.trace_frame(now)
+            
+            # Cap frame rate at 60 FPS; this only paces rendering, the
+            # network thread keeps receiving while we sleep
+            self.clock.tick(60)
+    
+    def trace_frame(self, now: float):
+        """Complete traced inputs this frame drew and refresh the overlay now and then."""
+        render_time = now - self.state_buffer.interpolation_delay
+        if self.tracer.frame(render_time):
+            self.overlay_stale = True
+        if self.overlay_stale and now - self.overlay_refreshed >= OVERLAY_INTERVAL:
+            self.renderer.overlay = self.tracer.overlay_lines()
+            self.overlay_stale = False
+            self.overlay_refreshed = now
     
-    async def run(self):
+    def run(self):
         """Run the game client."""
-        await self.connect()
+        self.connect()
         
         if self.running:
-            await self.game_loop()
+            self.game_loop()
         
         # Cleanup
-        if self.websocket:
-            await self.websocket.close()
+        self.network.stop()
+        if self.tracer is not None:
+            self.tracer.dump(self.trace_path)
+            print(f"Latency trace written to {self.trace_path}")
         
         self.renderer.close()
         print("Client shut down")
 
 
-async def main():
+def main():
     """Entry point for the client."""
-    server_url = sys.argv[1] if len(sys.argv) > 1 else "ws://localhost:8765"
+    parser = argparse.ArgumentParser(description="Multiplayer coin collector client")
+    parser.add_argument("server_url", nargs="?", default="ws://localhost:8765")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="trace input-to-photon latency, showing it on screen and writing it to FILE")
+    parser.add_argument("--name", help="play under this name, so the server keeps your scores")
+    args = parser.parse_args()
     
-    client = GameClient(server_url)
-    await client.run()
+    client = GameClient(args.server_url, args.trace, args.name)
+    client.run()
 
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        main()
     except KeyboardInterrupt:
         print("\nClient terminated by user")
\ No newline at end of file
@@ -0,0 +1,249 @@
+import asyncio
+import json
+import threading
+import websockets
+from collections import deque
+from urllib.parse import urlencode
+from typing import List, Optional, Set, Tuple
+from client.datagram import DatagramClient, open_datagram_client
+from client.latency import LatencyTracer
+from client.world import WorldModel
+
+
+class SnapshotMailbox:
+    """
+    Lock-free handoff of decoded snapshots from the network thread.
+    
+    deque.append and deque.popleft are atomic, so the network thread can
+    publish while the render loop drains without either side blocking. When
+    the render loop falls behind, the oldest pending snapshots are dropped
+    (latest wins).
+    """
+    
+    def __init__(self, max_pending: int = 8):
+        self._pending: deque = deque(maxlen=max_pending)
+    
+    def put(self, timestamp: float, state: dict) -> None:
+        """Publish a decoded snapshot (network thread)."""
+        self._pending.append((timestamp, state))
+    
+    def drain(self) -> List[Tuple[float, dict]]:
+        """Take all pending snapshots, oldest first (render thread)."""
+        snapshots = []
+        while True:
+            try:
+                snapshots.append(self._pending.popleft())
+            except IndexError:
+                return snapshots
+
+
+class NetworkThread(threading.Thread):
+    """Runs the server connection on its own thread and event loop."""
+    
+    def __init__(
+        self,
+        server_url: str,
+        mailbox: SnapshotMailbox,
+        tracer: Optional[LatencyTracer] = None,
+        name: Optional[str] = None
+    ):
+        super().__init__(name="network", daemon=True)
+        self.server_url = server_url
+        self.mailbox = mailbox
+        self.tracer = tracer
+        self.player_name = name  # Keeps our stats on the server
+        
+        self.welcome: Optional[dict] = None
+        self.world = WorldModel()
+        self.resume_token: Optional[str] = None
+        self.stats: Optional[dict] = None
+        self.datagram: Optional[DatagramClient] = None
+        self.ghosts: Optional[dict] = None  # From the WebSocket, for datagram states
+        self.ready = threading.Event()
+        self.closed = threading.Event()
+        
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._main_task: Optional[asyncio.Task] = None
+        self._websocket = None
+        self._send_tasks: Set[asyncio.Task] = set()  # Held so they can't be collected mid-send
+        self._stopping = threading.Event()
+    
+    def run(self) -> None:
+        """Thread entry point."""
+        try:
+            asyncio.run(self._main())
+        except asyncio.CancelledError:
+            pass  # Stopped
+        finally:
+            self.ready.set()
+            self.closed.set()
+    
+    async def _main(self) -> None:
+        """Connect, then receive snapshots, resuming across server restarts."""
+        self._loop = asyncio.get_running_loop()
+        self._main_task = asyncio.current_task()
+        
+        # stop() may have been called before there was a task to cancel
+        while not self._stopping.is_set():
+            if not await self._connect():
+                return
+            
+            try:
+                resuming = await self.receive_updates()
+            finally:
+                await self._websocket.close()
+                if self.datagram is not None:
+                    self.datagram.close()
+                    self.datagram = None
+            
+            if not resuming:
+                return
+            print(f"Resuming session on {self.server_url}")
+    
+    async def _connect(self) -> bool:
+        """Connect and wait for the welcome message; resumes if we have a token."""
+        url = self.server_url
+        query = {}
+        if self.player_name is not None:
+            query["name"] = self.player_name
+        if self.resume_token is not None:
+            query["resume"] = self.resume_token
+        if query:
+            url = f"{url.rstrip('/')}/?{urlencode(query)}"
+        
+        self._websocket = None
+        try:
+            self._websocket = await websockets.connect(url)
+            self.world = WorldModel()
+            print(f"Connected to server at {self.server_url}")
+            
+            welcome_data = json.loads(await self._websocket.recv())
+            if welcome_data.get("type") == "welcome":
+                self.welcome = welcome_data
+                self.resume_token = welcome_data.get("resume_token")
+                self.world.world_size = (welcome_data.get("world_width"), welcome_data.get("world_height"))
+                if "datagram" in welcome_data:
+                    await self._open_datagram(welcome_data["datagram"])
+            return True
+        except asyncio.CancelledError:
+            # Stopped before the welcome; close rather than leave the
+            # connection to time out
+            if self._websocket is not None:
+                await self._websocket.close()
+            raise
+        except Exception as e:
+            print(f"Failed to connect to server: {e}")
+            return False
+        finally:
+            self.ready.set()
+    
+    async def _open_datagram(self, offer: dict) -> None:
+        """Take up the server's offer of state and input over UDP."""
+        host = self._websocket.remote_address[0]
+        self.ghosts = None
+        try:
+            self.datagram = await open_datagram_client(host, offer["port"], offer["token"], self.receive_datagram)
+        except OSError as e:
+            print(f"Datagram transport unavailable, staying on the WebSocket: {e}")
+    
+    async def receive_updates(self) -> bool:
+        """
+        Continuously receive, decode and publish state updates.
+        Returns True if the server asked us to resume, after a restart or
+        on another node.
+        
+        Events in each state message are applied to the world model, and the
+        published snapshot is the complete state rebuilt from it. Once the
+        server sends our players by datagram, state messages here have no
+        players and only bring events and ghosts.
+        """
+        sync_requested = False
+        try:
+            while True:
+                message = await self._websocket.recv()
+                data = json.loads(message)
+                
+                if data.get("type") == "state":
+                    if self.tracer is not None and "traces" in data:
+                        self.trace_arrival(data)
+                    if self.world.apply(data):
+                        if "players" in data:
+                            self.mailbox.put(data.get("timestamp"), self.world.expand(data))
+                        else:
+                            self.ghosts = data.get("ghosts")
+                    elif self.world.needs_sync and not sync_requested:
+                        # Events went missing; ask for the whole world again
+                        sync_requested = True
+                        await self._send(json.dumps({"type": "sync_request"}))
+                elif data.get("type") == "sync":
+                    self.world.load_sync(data)
+                    sync_requested = False
+                elif data.get("type") == "stats":
+                    self.stats = data.get("stats")
+                    if self.stats is not None:
+                        print(
+                            f"Welcome back, {data.get('name')}: {self.stats['matches']} matches, "
+                            f"best score {self.stats['best_score']}"
+                        )
+                elif data.get("type") == "restart":
+                    return True
+                elif data.get("type") == "redirect":
+                    # Our player moved into a region served by another node
+                    self.server_url = data["url"]
+                    self.resume_token = data.get("resume_token")
+                    return True
+        
+        except websockets.exceptions.ConnectionClosed:
+            print("Server connection closed")
+        except Exception as e:
+            print(f"Error receiving updates: {e}")
+        return False
+    
+    def receive_datagram(self, data: dict) -> None:
+        """Publish a state datagram, with the ghosts last sent by WebSocket."""
+        if self.world.seq is None or self.world.needs_sync:
+            return
+        if self.ghosts:
+            data["ghosts"] = self.ghosts
+        self.mailbox.put(data.get("timestamp"), self.world.expand(data))
+    
+    def trace_arrival(self, data: dict) -> None:
+        """Pass the echoes of our traced inputs in a state message to the tracer."""
+        player_id = self.welcome.get("player_id") if self.welcome else None
+        ours = [trace for trace in data["traces"] if trace.get("player") == player_id]
+        if ours:
+            self.tracer.arrived(ours, data.get("timestamp"))
+    
+    def send(self, message: dict) -> None:
+        """Queue a message for sending without blocking the caller."""
+        if self._loop is None or self.closed.is_set():
+            return
+        datagram = self.datagram
+        if message.get("type") == "input" and datagram is not None and datagram.active:
+            self._loop.call_soon_threadsafe(datagram.send_input, message.get("move"), message.get("trace"))
+        else:
+            self._loop.call_soon_threadsafe(self._schedule_send, json.dumps(message))
+    
+    def _schedule_send(self, data: str) -> None:
+        """Start a send task on the network loop, holding on to it until it is done."""
+        task = asyncio.create_task(self._send(data))
+        self._send_tasks.add(task)
+        task.add_done_callback(self._send_tasks.discard)
+    
+    async def _send(self, data: str) -> None:
+        """Send encoded data to the server."""
+        try:
+            await self._websocket.send(data)
+        except websockets.exceptions.ConnectionClosed:
+            print("Connection to server lost")
+        except Exception as e:
+            print(f"Error sending to server: {e}")
+    
+    def stop(self) -> None:
+        """Ask the network loop to shut down and wait for the thread."""
+        self._stopping.set()
+        loop, task = self._loop, self._main_task
+        if loop is not None and task is not None and not self.closed.is_set():
+            # Also interrupts a connection attempt still in progress
+            loop.call_soon_threadsafe(task.cancel)
+        self.join(timeout=2.0)
\ No newline at end of file
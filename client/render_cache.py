@@ -0,0 +1,100 @@
+import pygame
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+# Transparent key colors for sprites; a sprite has at most two colors (fill
+# and outline), so one of three keys is always free
+_COLORKEYS = [(255, 0, 255), (0, 255, 0), (0, 0, 255)]
+
+
+class SpriteCache:
+    """Pre-rasterized circle sprites keyed by (radius, color, outline)."""
+    
+    def __init__(self):
+        self.sprites: Dict[tuple, pygame.Surface] = {}
+    
+    def circle(
+        self,
+        radius: int,
+        color: tuple,
+        outline: Optional[Tuple[tuple, int, int]] = None
+    ) -> pygame.Surface:
+        """
+        Get a circle sprite, rasterizing it on first use.
+        
+        Args:
+            radius: circle radius in pixels
+            color: fill color
+            outline: optional (color, gap, width) ring drawn gap pixels outside the fill
+        
+        The sprite is square and centered, so it is blitted at
+        (x - sprite.get_width() // 2, y - sprite.get_height() // 2).
+        """
+        key = (radius, color, outline)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            outer = radius + (outline[1] if outline else 0)
+            size = outer * 2 + 1
+            
+            # Colorkeyed RLE sprites blit much faster than per-pixel alpha
+            used = {tuple(color), tuple(outline[0]) if outline else None}
+            colorkey = next(c for c in _COLORKEYS if c not in used)
+            sprite = pygame.Surface((size, size))
+            sprite.fill(colorkey)
+            pygame.draw.circle(sprite, color, (outer, outer), radius)
+            if outline:
+                outline_color, _, width = outline
+                pygame.draw.circle(sprite, outline_color, (outer, outer), outer, width)
+            sprite.set_colorkey(colorkey, pygame.RLEACCEL)
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert()
+            self.sprites[key] = sprite
+        return sprite
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (font, text, color)."""
+    
+    def __init__(self, max_entries: int = 512, max_bytes: int = 4 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def render(self, font: pygame.font.Font, text: str, color: tuple) -> pygame.Surface:
+        """Get a rendered text surface, rasterizing it only on a cache miss."""
+        key = (font, text, color)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+        
+        self.misses += 1
+        surface = font.render(text, True, color)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        self.entries[key] = surface
+        self.size_bytes += _surface_bytes(surface)
+        
+        # Evict least recently used entries until within both bounds
+        while len(self.entries) > self.max_entries or (
+            self.size_bytes > self.max_bytes and len(self.entries) > 1
+        ):
+            _, evicted = self.entries.popitem(last=False)
+            self.size_bytes -= _surface_bytes(evicted)
+        
+        return surface
+    
+    def clear(self) -> None:
+        """Drop all cached surfaces."""
+        self.entries.clear()
+        self.size_bytes = 0
+
+
+def _surface_bytes(surface: pygame.Surface) -> int:
+    """Approximate pixel memory held by a surface."""
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
\ No newline at end of file
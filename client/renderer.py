@@ -1,17 +1,47 @@
+import os
+import time
 import pygame
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple
+from client.camera import Camera
+from client.render_cache import SpriteCache, TextCache
+
+
+# Extra culling margin above a player for their score label
+PLAYER_LABEL_MARGIN = 30
 
 
 class Renderer:
     """Handles rendering of the game state using Pygame."""
     
-    def __init__(self, width: int = 800, height: int = 600):
+    def __init__(
+        self,
+        width: int = 800,
+        height: int = 600,
+        dirty_rects: bool = False,
+        dirty_fallback_ratio: float = 0.5,
+        world_width: Optional[float] = None,
+        world_height: Optional[float] = None,
+        headless: bool = False,
+        profile: bool = False
+    ):
+        if headless:
+            # Render to an offscreen surface through SDL's dummy video driver
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+        
         pygame.init()
         self.width = width
         self.height = height
         self.screen = pygame.display.set_mode((width, height))
         pygame.display.set_caption("Multiplayer Coin Collector")
         
+        # Real frame timing for the FPS counter
+        self.clock = pygame.time.Clock()
+        
+        # Optional per-stage timing breakdown, in seconds summed over frames,
+        # and per draw call kind the number of calls and seconds spent in them
+        self.timings: Optional[Dict[str, float]] = {} if profile else None
+        self.draw_calls: Optional[Dict[str, List[float]]] = {} if profile else None
+        
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
         
@@ -19,80 +49,279 @@ class Renderer:
         self.bg_color = (20, 20, 30)
         self.coin_color = (255, 215, 0)  # Gold
         self.text_color = (255, 255, 255)
+        
+        # Camera following the local player; entities are drawn in screen
+        # coordinates and anything outside the view is skipped.
+        self.camera = Camera(width, height, world_width, world_height)
+        
+        # Dirty-rect mode: only erase, redraw and present regions that
+        # changed, falling back to a full flip when too much changed.
+        self.dirty_rects = dirty_rects
+        self.dirty_fallback_ratio = dirty_fallback_ratio
+        self._prev_items: Optional[List[Tuple[tuple, pygame.Rect]]] = None
+        
+        # Render cache: circles and text are rasterized once, and draw calls
+        # queue blits that are submitted to the screen in a single batch.
+        self.sprites = SpriteCache()
+        self.texts = TextCache()
+        self.pending_blits: List[Tuple[pygame.Surface, tuple]] = []
+        
+        # Extra text lines shown under the FPS counter, e.g. latency stats
+        self.overlay: List[str] = []
     
     def render(self, state: Optional[dict], player_id: Optional[str] = None) -> None:
         """Render the current game state."""
+        self.clock.tick()
+        
+        if state is not None and self.dirty_rects:
+            self.render_dirty(state, player_id)
+            return
+        
         # Clear screen
-        self.screen.fill(self.bg_color)
+        start = time.perf_counter()
+        self.fill()
+        start = self._lap("clear", start)
         
         if state is None:
             # Show waiting message
-            text = self.font.render("Connecting to server...", True, self.text_color)
+            text = self.texts.render(self.font, "Connecting to server...", self.text_color)
             text_rect = text.get_rect(center=(self.width // 2, self.height // 2))
             self.screen.blit(text, text_rect)
-            pygame.display.flip()
+            self.present()
+            self._prev_items = None
             return
         
+        players = state.get("players", [])
+        self.follow_player(players, player_id)
+        camera = self.camera
+        
         # Draw coins
         for coin in state.get("coins", []):
-            self.draw_coin(coin)
+            if camera.is_visible(coin["x"], coin["y"], coin["radius"]):
+                self.draw_coin(coin)
+        start = self._lap("coins", start)
         
         # Draw players
-        for player in state.get("players", []):
-            is_local = player["id"] == player_id
-            self.draw_player(player, is_local)
+        for player in players:
+            if camera.is_visible(player["x"], player["y"], player["radius"] + PLAYER_LABEL_MARGIN):
+                is_local = player["id"] == player_id
+                self.draw_player(player, is_local)
+        start = self._lap("players", start)
         
         # Draw scoreboard
-        self.draw_scoreboard(state.get("players", []), player_id)
+        self.draw_scoreboard(state.get("leaders", players), player_id)
         
         # Draw FPS
         self.draw_fps()
+        self.draw_overlay()
+        start = self._lap("hud", start)
         
-        pygame.display.flip()
+        self.flush()
+        start = self._lap("blit", start)
+        self.present()
+        self._lap("present", start)
+    
+    def render_dirty(self, state: dict, player_id: Optional[str] = None) -> None:
+        """Render only the regions that changed since the previous frame."""
+        start = time.perf_counter()
+        items = self.frame_items(state, player_id)
+        
+        if self._prev_items is None:
+            dirty = [self.screen.get_rect()]
+        else:
+            current = {signature for signature, _, _ in items}
+            previous = {signature for signature, _ in self._prev_items}
+            
+            # Erase where things were, draw where things are now
+            dirty = [rect for signature, rect in self._prev_items if signature not in current]
+            dirty.extend(rect for signature, rect, _ in items if signature not in previous)
+        
+        self._prev_items = [(signature, rect) for signature, rect, _ in items]
+        start = self._lap("items", start)
+        
+        if not dirty:
+            return
+        
+        dirty_area = sum(rect.width * rect.height for rect in dirty)
+        if dirty_area > self.dirty_fallback_ratio * self.width * self.height:
+            self.fill()
+            for _, _, draw in items:
+                draw()
+            self.flush()
+            start = self._lap("redraw", start)
+            self.present()
+            self._lap("present", start)
+            return
+        
+        # Redraw each dirty region clipped, so unchanged neighbours that
+        # overlap it are repainted exactly as they were
+        item_rects = [rect for _, rect, _ in items]
+        for dirty_rect in dirty:
+            self.screen.set_clip(dirty_rect)
+            self.fill(dirty_rect)
+            for index in sorted(dirty_rect.collidelistall(item_rects)):
+                items[index][2]()
+            self.flush()
+        self.screen.set_clip(None)
+        start = self._lap("redraw", start)
+        
+        self.present(dirty)
+        self._lap("present", start)
+    
+    def _lap(self, stage: str, start: float) -> float:
+        """Charge time since start to a profiling stage; returns the new start."""
+        now = time.perf_counter()
+        if self.timings is not None:
+            self.timings[stage] = self.timings.get(stage, 0.0) + (now - start)
+        return now
+    
+    def _count(self, kind: str, calls: int = 1, seconds: float = 0.0) -> None:
+        """Charge draw calls of one kind, and the time they took, when profiling."""
+        if self.draw_calls is not None:
+            entry = self.draw_calls.setdefault(kind, [0, 0.0])
+            entry[0] += calls
+            entry[1] += seconds
+    
+    def fill(self, rect: Optional[pygame.Rect] = None) -> None:
+        """Clear the screen, or one rect of it, to the background."""
+        start = time.perf_counter()
+        self.screen.fill(self.bg_color, rect)
+        self._count("fill", 1, time.perf_counter() - start)
+    
+    def present(self, rects: Optional[List[pygame.Rect]] = None) -> None:
+        """Show the frame: the whole screen, or only the given rects."""
+        start = time.perf_counter()
+        if rects is None:
+            pygame.display.flip()
+            self._count("flip", 1, time.perf_counter() - start)
+        else:
+            pygame.display.update(rects)
+            self._count("update", 1, time.perf_counter() - start)
+    
+    def frame_items(
+        self, state: dict, player_id: Optional[str]
+    ) -> List[Tuple[tuple, pygame.Rect, Callable[[], object]]]:
+        """
+        Build the ordered list of drawable items for a frame.
+        
+        Each item is (signature, bounding rect, draw callback). Two items with
+        equal signatures draw identical pixels, which is what lets dirty-rect
+        mode skip them.
+        """
+        items: List[Tuple[tuple, pygame.Rect, Callable[[], object]]] = []
+        players = state.get("players", [])
+        self.follow_player(players, player_id)
+        camera = self.camera
+        
+        for coin in state.get("coins", []):
+            if not camera.is_visible(coin["x"], coin["y"], coin["radius"]):
+                continue
+            x, y = camera.world_to_screen(coin["x"], coin["y"])
+            signature = ("coin", coin["id"], x, y, int(coin["radius"]), coin.get("value", 1))
+            items.append((signature, self.coin_bounds(coin), lambda c=coin: self.draw_coin(c)))
+        
+        for player in players:
+            if not camera.is_visible(player["x"], player["y"], player["radius"] + PLAYER_LABEL_MARGIN):
+                continue
+            is_local = player["id"] == player_id
+            x, y = camera.world_to_screen(player["x"], player["y"])
+            signature = (
+                "player", player["id"], x, y,
+                int(player["radius"]), tuple(player["color"]), player["score"], is_local
+            )
+            items.append((
+                signature,
+                self.player_bounds(player),
+                lambda p=player, local=is_local: self.draw_player(p, local)
+            ))
+        
+        leaders = state.get("leaders", players)
+        scoreboard = self.scoreboard_lines(leaders, player_id)
+        items.append((
+            ("scoreboard", tuple(scoreboard)),
+            self.scoreboard_bounds(scoreboard),
+            lambda: self.draw_scoreboard(leaders, player_id)
+        ))
+        
+        fps_text = self.fps_text()
+        items.append((
+            ("fps", fps_text),
+            self.texts.render(self.small_font, fps_text, self.text_color).get_rect(topleft=(10, 10)),
+            self.draw_fps
+        ))
+        
+        if self.overlay:
+            lines = tuple(self.overlay)
+            items.append((("overlay", lines), self.overlay_bounds(), self.draw_overlay))
+        
+        return items
+    
+    def follow_player(self, players: list, player_id: Optional[str]) -> None:
+        """Center the camera on the local player if they are in the state."""
+        for player in players:
+            if player["id"] == player_id:
+                self.camera.follow(player["x"], player["y"])
+                return
+    
+    def player_bounds(self, player: dict) -> pygame.Rect:
+        """Bounding rect of a player circle, outline and score label."""
+        x, y = self.camera.world_to_screen(player["x"], player["y"])
+        radius = int(player["radius"]) + 2
+        rect = pygame.Rect(x - radius, y - radius, radius * 2 + 1, radius * 2 + 1)
+        
+        label = self.texts.render(self.small_font, str(player["score"]), self.text_color)
+        return rect.union(label.get_rect(center=(x, y - int(player["radius"]) - 15)))
+    
+    def coin_bounds(self, coin: dict) -> pygame.Rect:
+        """Bounding rect of a coin."""
+        x, y = self.camera.world_to_screen(coin["x"], coin["y"])
+        radius = int(coin["radius"])
+        return pygame.Rect(x - radius, y - radius, radius * 2 + 1, radius * 2 + 1)
+    
+    def scoreboard_bounds(self, lines: List[Tuple[str, tuple]]) -> pygame.Rect:
+        """Region covered by the rendered scoreboard title and lines."""
+        blits = self.scoreboard_blits(lines)
+        surface, position = blits[0]
+        rect = surface.get_rect(topleft=position)
+        for surface, position in blits[1:]:
+            rect.union_ip(surface.get_rect(topleft=position))
+        return rect.clip(self.screen.get_rect())
     
     def draw_player(self, player: dict, is_local: bool = False) -> None:
-        """Draw a player circle."""
-        x = int(player["x"])
-        y = int(player["y"])
+        """Queue a player circle and score label; see flush()."""
+        x, y = self.camera.world_to_screen(player["x"], player["y"])
         radius = int(player["radius"])
         color = tuple(player["color"])
         
-        # Draw player circle
-        pygame.draw.circle(self.screen, color, (x, y), radius)
-        
-        # Draw outline for local player
-        if is_local:
-            pygame.draw.circle(self.screen, (255, 255, 255), (x, y), radius + 2, 2)
+        # Draw player circle, with an outline for the local player
+        outline = ((255, 255, 255), 2, 2) if is_local else None
+        sprite = self.sprites.circle(radius, color, outline)
+        half = sprite.get_width() // 2
+        self.pending_blits.append((sprite, (x - half, y - half)))
         
         # Draw player score above them
-        score_text = self.small_font.render(str(player["score"]), True, self.text_color)
+        score_text = self.texts.render(self.small_font, str(player["score"]), self.text_color)
         score_rect = score_text.get_rect(center=(x, y - radius - 15))
-        self.screen.blit(score_text, score_rect)
+        self.pending_blits.append((score_text, score_rect.topleft))
     
     def draw_coin(self, coin: dict) -> None:
-        """Draw a coin."""
-        x = int(coin["x"])
-        y = int(coin["y"])
+        """Queue a coin; see flush()."""
+        x, y = self.camera.world_to_screen(coin["x"], coin["y"])
         radius = int(coin["radius"])
         
         # Draw coin with value indicator
-        pygame.draw.circle(self.screen, self.coin_color, (x, y), radius)
+        sprite = self.sprites.circle(radius, self.coin_color)
+        self.pending_blits.append((sprite, (x - radius, y - radius)))
         
         # Draw value text if > 1
         if coin.get("value", 1) > 1:
-            value_text = self.small_font.render(str(coin["value"]), True, (0, 0, 0))
+            value_text = self.texts.render(self.small_font, str(coin["value"]), (0, 0, 0))
             value_rect = value_text.get_rect(center=(x, y))
-            self.screen.blit(value_text, value_rect)
+            self.pending_blits.append((value_text, value_rect.topleft))
     
-    def draw_scoreboard(self, players: list, player_id: Optional[str]) -> None:
-        """Draw scoreboard in top-right corner."""
-        y_offset = 10
-        x_offset = self.width - 150
-        
-        # Title
-        title = self.small_font.render("Scoreboard", True, self.text_color)
-        self.screen.blit(title, (x_offset, y_offset))
-        y_offset += 30
+    def scoreboard_lines(self, players: list, player_id: Optional[str]) -> List[Tuple[str, tuple]]:
+        """Build the (text, color) lines shown under the scoreboard title."""
+        lines = []
         
         # Sort players by score
         sorted_players = sorted(players, key=lambda p: p["score"], reverse=True)
@@ -106,16 +335,63 @@ class Renderer:
             if is_local:
                 score_text += " (You)"
             
-            text = self.small_font.render(score_text, True, color)
-            self.screen.blit(text, (x_offset, y_offset))
-            y_offset += 25
+            lines.append((score_text, color))
+        
+        return lines
+    
+    def scoreboard_blits(self, lines: List[Tuple[str, tuple]]) -> List[Tuple[pygame.Surface, tuple]]:
+        """Lay out the scoreboard title and lines in the top-right corner."""
+        title = self.texts.render(self.small_font, "Scoreboard", self.text_color)
+        texts = [self.texts.render(self.small_font, text, color) for text, color in lines]
+        
+        # Long lines move the scoreboard left rather than off the screen
+        widest = max(text.get_width() for text in [title] + texts)
+        x_offset = min(self.width - 150, self.width - 10 - widest)
+        
+        blits: List[Tuple[pygame.Surface, tuple]] = [(title, (x_offset, 10))]
+        for i, text in enumerate(texts):
+            blits.append((text, (x_offset, 40 + i * 25)))
+        return blits
+    
+    def draw_scoreboard(self, players: list, player_id: Optional[str]) -> None:
+        """Draw scoreboard in top-right corner."""
+        self.pending_blits.extend(self.scoreboard_blits(self.scoreboard_lines(players, player_id)))
+    
+    def fps_text(self) -> str:
+        """Text shown by the FPS counter."""
+        return f"FPS: {int(self.clock.get_fps())}"
     
     def draw_fps(self) -> None:
         """Draw FPS counter."""
-        clock = pygame.time.Clock()
-        fps = int(clock.get_fps())
-        fps_text = self.small_font.render(f"FPS: {fps}", True, self.text_color)
-        self.screen.blit(fps_text, (10, 10))
+        fps_text = self.texts.render(self.small_font, self.fps_text(), self.text_color)
+        self.pending_blits.append((fps_text, (10, 10)))
+    
+    def overlay_bounds(self) -> pygame.Rect:
+        """Region covered by the overlay lines."""
+        rect = pygame.Rect(10, 35, 0, 0)
+        for i, line in enumerate(self.overlay):
+            text = self.texts.render(self.small_font, line, self.text_color)
+            rect.union_ip(text.get_rect(topleft=(10, 35 + i * 20)))
+        return rect
+    
+    def draw_overlay(self) -> None:
+        """Draw the overlay lines under the FPS counter."""
+        for i, line in enumerate(self.overlay):
+            text = self.texts.render(self.small_font, line, self.text_color)
+            self.pending_blits.append((text, (10, 35 + i * 20)))
+    
+    def flush(self) -> None:
+        """Submit all queued blits to the screen in one batch."""
+        if self.pending_blits:
+            start = time.perf_counter()
+            self.screen.blits(self.pending_blits, doreturn=False)
+            if self.draw_calls is not None:
+                # Sprites are colorkeyed, text has per-pixel alpha
+                sprites = sum(1 for surface, _ in self.pending_blits if surface.get_colorkey() is not None)
+                self._count("blits", 1, time.perf_counter() - start)
+                self._count("sprite", sprites)
+                self._count("text", len(self.pending_blits) - sprites)
+            self.pending_blits.clear()
     
     def close(self) -> None:
         """Clean up and close the renderer."""
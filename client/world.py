@@ -0,0 +1,209 @@
+"""
+Client-side copy of the world, built from the server's event stream.
+
+State messages only carry the fast-changing player fields. Coins, player
+colors, radii and scores arrive as ordered events (or in a full-world sync)
+and are kept here; WorldModel.expand() merges them back into each snapshot
+so interpolation and rendering see complete states.
+
+Ghosts from neighbouring server nodes work the same way: their static
+fields arrive in ghost_manifest events and state messages only carry ghost
+players' positions.
+
+Under a snapshot budget, state messages are partial: players left out are
+carried forward from where they were last sent, along their velocity.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DEFAULT_PLAYER = {"color": (255, 100, 100), "radius": 20.0, "score": 0}
+
+# Longest a player missing from partial states is moved along their velocity
+CARRY_LIMIT = 1.0
+
+
+class WorldModel:
+    """Static entity state, kept current by applying events in order."""
+    
+    def __init__(self):
+        self.seq: Optional[int] = None  # None until the first sync
+        self.needs_sync = False  # Set when events were missed
+        self.players: Dict[str, dict] = {}
+        self.coins: Dict[str, dict] = {}
+        self._coin_list: Optional[List[dict]] = None
+        
+        # Static fields of ghosts mirrored from neighbouring nodes
+        self.ghost_players: Dict[str, dict] = {}
+        self.ghost_coins: Dict[str, dict] = {}
+        self._all_coins: Optional[List[dict]] = None
+        
+        # Last dynamic fields received per player and the state time they
+        # are from, for partial states; world_size keeps carried players in
+        # bounds
+        self.dynamic: Dict[str, Tuple[float, dict]] = {}
+        self.world_size: Optional[Tuple[float, float]] = None
+    
+    def load_sync(self, message: Dict[str, Any]) -> None:
+        """Replace the world with a full-world sync message."""
+        self.players = {
+            p["id"]: {"color": p["color"], "radius": p["radius"], "score": p["score"]}
+            for p in message.get("players", [])
+        }
+        self.coins = {c["id"]: c for c in message.get("coins", [])}
+        self._coin_list = None
+        ghosts = message.get("ghosts", {})
+        self.ghost_players = {
+            p["id"]: {"color": p["color"], "radius": p["radius"], "score": p["score"]}
+            for p in ghosts.get("players", [])
+        }
+        self.ghost_coins = {c["id"]: c for c in ghosts.get("coins", [])}
+        self._all_coins = None
+        self.dynamic = {player_id: known for player_id, known in self.dynamic.items() if player_id in self.players}
+        self.seq = message["seq"]
+        self.needs_sync = False
+    
+    def apply(self, message: Dict[str, Any]) -> bool:
+        """
+        Apply the events carried by a state message.
+        
+        Events already covered by the last sync are skipped. Returns False
+        before the first sync, or if events were missed, in which case
+        needs_sync is set and nothing more applies until a new sync.
+        """
+        if self.seq is None:
+            return False
+        events = message.get("events", [])
+        seq = message.get("seq", self.seq)
+        first = seq - len(events) + 1
+        if first > self.seq + 1:
+            self.seq = None
+            self.needs_sync = True
+            return False
+        
+        for event in events[max(0, self.seq + 1 - first):]:
+            self._apply_event(event)
+        self.seq = max(self.seq, seq)
+        return True
+    
+    def _apply_event(self, event: Dict[str, Any]) -> None:
+        """Apply a single event."""
+        event_type = event.get("type")
+        if event_type == "coin_spawned":
+            coin = event["coin"]
+            self.coins[coin["id"]] = coin
+            self._coin_list = None
+            self._all_coins = None
+        elif event_type in ("coin_collected", "coin_despawned"):
+            if self.coins.pop(event["coin_id"], None) is not None:
+                self._coin_list = None
+                self._all_coins = None
+        elif event_type == "player_joined":
+            player = event["player"]
+            self.players[player["id"]] = {
+                "color": player["color"], "radius": player["radius"], "score": player["score"]
+            }
+        elif event_type == "player_left":
+            self.players.pop(event["player_id"], None)
+            self.dynamic.pop(event["player_id"], None)
+        elif event_type == "score":
+            player = self.players.get(event["player_id"])
+            if player is not None:
+                player["score"] = event["score"]
+        elif event_type == "ghost_manifest":
+            for player in event["players"]:
+                self.ghost_players[player["id"]] = {
+                    "color": player["color"], "radius": player["radius"], "score": player["score"]
+                }
+            for player_id in event["removed_players"]:
+                self.ghost_players.pop(player_id, None)
+            for coin in event["coins"]:
+                self.ghost_coins[coin["id"]] = coin
+            for coin_id in event["removed_coins"]:
+                self.ghost_coins.pop(coin_id, None)
+            if event["coins"] or event["removed_coins"]:
+                self._all_coins = None
+    
+    def coin_list(self) -> List[dict]:
+        """
+        All coins, as a list shared by every snapshot until the coins change.
+        Callers must not modify it.
+        """
+        if self._coin_list is None:
+            self._coin_list = list(self.coins.values())
+        return self._coin_list
+    
+    def all_coins(self) -> List[dict]:
+        """Our coins and ghost coins, shared like coin_list()."""
+        if not self.ghost_coins:
+            return self.coin_list()
+        if self._all_coins is None:
+            self._all_coins = self.coin_list() + list(self.ghost_coins.values())
+        return self._all_coins
+    
+    def sync_message(self) -> Dict[str, Any]:
+        """A full-world sync equivalent to the model, for passing on to others."""
+        return {
+            "type": "sync",
+            "seq": self.seq,
+            "players": [dict(static, id=player_id) for player_id, static in self.players.items()],
+            "coins": self.coin_list(),
+            "ghosts": {
+                "players": [dict(static, id=player_id) for player_id, static in self.ghost_players.items()],
+                "coins": list(self.ghost_coins.values())
+            }
+        }
+    
+    def expand(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a complete state from a state message's dynamic fields."""
+        if message.get("partial"):
+            players = self._carry_forward(message)
+        else:
+            players = []
+            for dynamic in message.get("players", []):
+                player = dict(self.players.get(dynamic["id"], DEFAULT_PLAYER))
+                player.update(dynamic)
+                players.append(player)
+        coins = self.all_coins()
+        
+        # Entities mirrored from neighbouring server nodes
+        ghosts = message.get("ghosts")
+        if ghosts:
+            for dynamic in ghosts.get("players", []):
+                player = dict(self.ghost_players.get(dynamic["id"], DEFAULT_PLAYER))
+                player.update(dynamic)
+                players.append(player)
+            if ghosts.get("coins"):
+                coins = coins + ghosts["coins"]
+        
+        return {
+            "type": "state",
+            "timestamp": message.get("timestamp"),
+            "players": players,
+            "coins": coins
+        }
+    
+    def _carry_forward(self, message: Dict[str, Any]) -> List[dict]:
+        """Every known player, from a partial state plus those it left out."""
+        timestamp = message.get("timestamp") or 0.0
+        for dynamic in message.get("players", []):
+            self.dynamic[dynamic["id"]] = (timestamp, dynamic)
+        
+        players = []
+        for player_id, static in self.players.items():
+            known = self.dynamic.get(player_id)
+            if known is None:
+                continue  # Not sent yet
+            sent_at, dynamic = known
+            player = dict(static)
+            player.update(dynamic)
+            
+            elapsed = min(timestamp - sent_at, CARRY_LIMIT)
+            if elapsed > 0:
+                player["x"] += player["vx"] * elapsed
+                player["y"] += player["vy"] * elapsed
+                if self.world_size is not None:
+                    radius = player["radius"]
+                    player["x"] = max(radius, min(self.world_size[0] - radius, player["x"]))
+                    player["y"] = max(radius, min(self.world_size[1] - radius, player["y"]))
+            players.append(player)
+        return players
\ No newline at end of file
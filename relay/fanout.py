@@ -0,0 +1,87 @@
+"""
+Building blocks of the relay: a delay buffer for the upstream stream and
+per-viewer senders that skip frames for viewers that can't keep up.
+"""
+import asyncio
+import websockets
+from collections import deque
+from typing import Any, Callable, List, Optional
+
+
+class DelayBuffer:
+    """Holds frames for a fixed delay, then releases them in arrival order."""
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.frames: deque = deque()
+    
+    def __len__(self) -> int:
+        return len(self.frames)
+    
+    def push(self, frame: Any, now: float) -> None:
+        """Add a frame that arrived at now."""
+        self.frames.append((now + self.delay, frame))
+    
+    def next_due(self) -> Optional[float]:
+        """When the oldest held frame is due, if any."""
+        return self.frames[0][0] if self.frames else None
+    
+    def pop_due(self, now: float) -> List[Any]:
+        """Remove and return every frame due by now, oldest first."""
+        due = []
+        while self.frames and self.frames[0][0] <= now:
+            due.append(self.frames.popleft()[1])
+        return due
+
+
+class Viewer:
+    """
+    One downstream connection.
+    
+    Frames are offered to every viewer as they are released, and each
+    viewer's sender only ever picks up the newest one: frames offered while
+    it is still busy sending are skipped. Skipped frames may have carried
+    events, so the next frame sent after a skip is preceded by a full sync.
+    """
+    
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.latest: Optional[str] = None
+        self.needs_sync = True  # New viewers start from a sync
+        self.ready = asyncio.Event()
+        self.sent = 0
+        self.skipped = 0
+    
+    def offer(self, frame: str) -> None:
+        """Make frame the next one to send, replacing any unsent frame."""
+        if self.latest is not None:
+            self.skipped += 1
+            self.needs_sync = True
+        self.latest = frame
+        self.ready.set()
+    
+    async def run(self, sync_text: Callable[[], Optional[str]]) -> None:
+        """
+        Send frames until the connection closes, then return quietly.
+        
+        sync_text returns the relay's current sync (matching the newest
+        released frame), or None while the relay has none.
+        """
+        try:
+            while True:
+                await self.ready.wait()
+                self.ready.clear()
+                frame, self.latest = self.latest, None
+                if frame is None:
+                    continue
+                
+                if self.needs_sync:
+                    sync = sync_text()
+                    if sync is None:
+                        continue  # Frames are useless to a viewer without a sync
+                    self.needs_sync = False
+                    await self.websocket.send(sync)
+                await self.websocket.send(frame)
+                self.sent += 1
+        except websockets.exceptions.ConnectionClosed:
+            pass
\ No newline at end of file
@@ -0,0 +1,5 @@
+"""
+Spectator relay for the multiplayer coin collector game.
+"""
+
+__version__ = "1.0.0"
\ No newline at end of file
@@ -0,0 +1,172 @@
+"""
+Spectator relay.
+
+Subscribes once to a game server's spectator stream and rebroadcasts it to
+any number of viewers, so the audience costs the game server a single
+connection. Upstream messages are decoded once to keep a world model for
+syncing late joiners; viewers are sent the original encoded text.
+
+    RELAY_UPSTREAM=ws://localhost:8765 RELAY_PORT=8865 python -m relay.main
+
+Viewers connect with the regular client: python -m client.main ws://localhost:8865
+"""
+import asyncio
+import json
+import os
+import time
+from http import HTTPStatus
+from typing import Optional, Set
+import websockets
+from dotenv import load_dotenv
+from client.world import WorldModel
+from relay.fanout import DelayBuffer, Viewer
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+RELAY_UPSTREAM = os.getenv("RELAY_UPSTREAM", "ws://localhost:8765")
+RELAY_HOST = os.getenv("RELAY_HOST", "localhost")
+RELAY_PORT = int(os.getenv("RELAY_PORT", "8865"))
+RELAY_DELAY = float(os.getenv("RELAY_DELAY", "0"))  # Seconds viewers lag the game
+RELAY_MAX_VIEWERS = int(os.getenv("RELAY_MAX_VIEWERS", "10000"))
+RECONNECT_DELAY = 1.0
+STATS_INTERVAL = 30.0
+
+
+class Relay:
+    """Fans one upstream spectator stream out to many viewers."""
+    
+    def __init__(self, upstream_url: str, delay: float = 0.0, max_viewers: int = 10000):
+        self.upstream_url = upstream_url.rstrip("/") + "/spectate"
+        self.max_viewers = max_viewers
+        self.buffer = DelayBuffer(delay)
+        self.world = WorldModel()
+        self.viewers: Set[Viewer] = set()
+        
+        self.welcome: Optional[str] = None
+        self._upstream = None
+        self._frame_waiting = asyncio.Event()
+        self._sync_text: Optional[str] = None
+        self._sync_requested = False
+        self.frames_received = 0
+    
+    def sync_text(self) -> Optional[str]:
+        """Encoded sync of the world as of the newest released frame."""
+        if self._sync_text is None and self.world.seq is not None:
+            self._sync_text = json.dumps(self.world.sync_message())
+        return self._sync_text
+    
+    async def subscribe(self) -> None:
+        """Follow the upstream stream, reconnecting whenever it drops."""
+        while True:
+            try:
+                async with websockets.connect(self.upstream_url, compression=None) as websocket:
+                    self._upstream = websocket
+                    self.welcome = await websocket.recv()
+                    print(f"Relaying {self.upstream_url}")
+                    async for message in websocket:
+                        self.receive(message)
+            except (OSError, websockets.exceptions.WebSocketException) as e:
+                print(f"Upstream unavailable: {e}")
+            self._upstream = None
+            await asyncio.sleep(RECONNECT_DELAY)
+    
+    def receive(self, message: str) -> None:
+        """Queue an upstream state or sync message for release."""
+        data = json.loads(message)
+        if data.get("type") not in ("state", "sync"):
+            return  # e.g. restart: the connection drops and we resubscribe
+        self.frames_received += 1
+        
+        if self.buffer.delay <= 0:
+            self.release(message, data)
+        else:
+            self.buffer.push((message, data), time.monotonic())
+            self._frame_waiting.set()
+    
+    async def release_delayed(self) -> None:
+        """Release buffered frames as their delay runs out."""
+        while True:
+            due = self.buffer.next_due()
+            if due is None:
+                self._frame_waiting.clear()
+                await self._frame_waiting.wait()
+                continue
+            await asyncio.sleep(max(0.0, due - time.monotonic()))
+            for message, data in self.buffer.pop_due(time.monotonic()):
+                self.release(message, data)
+    
+    def release(self, message: str, data: dict) -> None:
+        """Apply a frame to the world model and offer it to every viewer."""
+        if data["type"] == "sync":
+            self.world.load_sync(data)
+            self._sync_text = None
+            self._sync_requested = False
+        elif self.world.apply(data):
+            if data.get("events"):
+                self._sync_text = None
+        elif self.world.needs_sync and not self._sync_requested and self._upstream is not None:
+            # We missed events ourselves; viewers keep getting frames meanwhile
+            self._sync_requested = True
+            asyncio.create_task(self._upstream.send(json.dumps({"type": "sync_request"})))
+        
+        for viewer in self.viewers:
+            viewer.offer(message)
+    
+    def admit(self, path: str, request_headers):
+        """Refuse viewers before the upstream is up or past the viewer cap."""
+        if self.welcome is None:
+            return HTTPStatus.SERVICE_UNAVAILABLE, [("Retry-After", "2")], b"Relay not connected\n"
+        if len(self.viewers) >= self.max_viewers:
+            return HTTPStatus.SERVICE_UNAVAILABLE, [("Retry-After", "10")], b"Relay full\n"
+        return None
+    
+    async def handle_viewer(self, websocket, path) -> None:
+        """Send a viewer the welcome, then frames until it disconnects."""
+        viewer = Viewer(websocket)
+        await websocket.send(self.welcome)
+        self.viewers.add(viewer)
+        sender = asyncio.create_task(viewer.run(self.sync_text))
+        try:
+            async for message in websocket:
+                # Viewers only ever ask for a fresh sync
+                if "sync_request" in message:
+                    viewer.needs_sync = True
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            self.viewers.discard(viewer)
+            sender.cancel()
+            await asyncio.gather(sender, return_exceptions=True)
+    
+    async def report_stats(self) -> None:
+        """Periodically log audience size and frame skipping."""
+        while True:
+            await asyncio.sleep(STATS_INTERVAL)
+            skipped = sum(viewer.skipped for viewer in self.viewers)
+            print(f"Relay: {len(self.viewers)} viewers, {self.frames_received} frames received, {skipped} skipped")
+
+
+async def main():
+    """Start the relay."""
+    relay = Relay(RELAY_UPSTREAM, RELAY_DELAY, RELAY_MAX_VIEWERS)
+    asyncio.create_task(relay.subscribe())
+    asyncio.create_task(relay.release_delayed())
+    asyncio.create_task(relay.report_stats())
+    
+    print(f"Starting relay on {RELAY_HOST}:{RELAY_PORT}")
+    async with websockets.serve(
+        relay.handle_viewer,
+        RELAY_HOST,
+        RELAY_PORT,
+        process_request=relay.admit,
+        # Per-connection compression would cost CPU per viewer per frame
+        compression=None,
+        max_size=4096
+    ):
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+Admission control and per-connection input rate limiting.
+
+Every check here is O(1) and runs before a message is decoded, so an
+abusive client costs the server a counter increment per message rather than
+a JSON parse and a simulation update.
+"""
+import time
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+
+class TokenBucket:
+    """Classic token bucket: refills at rate per second up to burst."""
+    
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+    
+    def consume(self, amount: float = 1.0, now: Optional[float] = None) -> bool:
+        """Take amount tokens if available; returns False if throttled."""
+        if now is None:
+            now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True
+        return False
+
+
+@dataclass
+class AdmissionStats:
+    """Counters for rejected and dropped traffic."""
+    accepted_connections: int = 0
+    rejected_connections: int = 0
+    throttled_messages: int = 0
+    throttled_bytes: int = 0
+    oversized_messages: int = 0
+    decode_errors: int = 0
+    kicked_clients: int = 0
+    rejected_peers: int = 0
+    peer_errors: int = 0
+    
+    def as_dict(self) -> dict:
+        """Counters as a plain dictionary."""
+        return asdict(self)
+
+
+class ClientRateLimiter:
+    """Per-connection limits on inbound message count, bytes and size."""
+    
+    def __init__(
+        self,
+        stats: AdmissionStats,
+        messages_per_second: float = 30.0,
+        message_burst: float = 60.0,
+        bytes_per_second: float = 16384.0,
+        byte_burst: float = 32768.0,
+        max_message_size: int = 4096,
+        max_violations: int = 1000
+    ):
+        self.stats = stats
+        self.messages = TokenBucket(messages_per_second, message_burst)
+        self.bytes = TokenBucket(bytes_per_second, byte_burst)
+        self.max_message_size = max_message_size
+        self.max_violations = max_violations
+        self.violations = 0
+    
+    def allow(self, message, now: Optional[float] = None) -> bool:
+        """Check a raw, undecoded message against the limits."""
+        size = len(message)
+        if size > self.max_message_size:
+            self.stats.oversized_messages += 1
+            self.violations += 1
+            return False
+        
+        if now is None:
+            now = time.monotonic()
+        if not self.messages.consume(1.0, now):
+            self.stats.throttled_messages += 1
+            self.violations += 1
+            return False
+        if not self.bytes.consume(size, now):
+            self.stats.throttled_bytes += size
+            self.violations += 1
+            return False
+        
+        # Good behaviour slowly pays off earlier violations
+        if self.violations:
+            self.violations -= 1
+        return True
+    
+    @property
+    def abusive(self) -> bool:
+        """True once violations outnumber allowed messages by max_violations."""
+        return self.violations >= self.max_violations
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""
+Coin lifecycle shared by the node's main world and by rooms.
+
+CoinTimers owns a world's coin despawn timers and its coin waves on the
+world's timing wheel, emits the coin events, and credits pickups, so both
+kinds of world run the same code and only choose where coins land and
+whether a wave spawns at all.
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+from server.events import EventLog
+from server.game_logic import resolve_coin_collisions, spawn_coin
+from server.game_state import Coin, GameState
+from server.protocol import (
+    create_coin_spawned_event,
+    create_coin_collected_event,
+    create_coin_despawned_event,
+    create_score_event
+)
+from server.scheduler import TimingWheel, Timer
+
+
+Bounds = Tuple[float, float, float, float]
+
+
+class CoinTimers:
+    """A world's coin despawn timers and coin waves."""
+    
+    def __init__(
+        self,
+        scheduler: TimingWheel,
+        event_log: EventLog,
+        ttl: float = 60.0,
+        spawn_interval: float = 3.0,
+        wave_size: int = 1,
+        max_coins: int = 50
+    ):
+        self.scheduler = scheduler
+        self.event_log = event_log
+        self.ttl = ttl  # 0 keeps coins forever
+        self.spawn_interval = spawn_interval
+        self.wave_size = wave_size
+        self.max_coins = max_coins
+        self.expiry: Dict[str, Timer] = {}
+        self.wave: Optional[Timer] = None
+    
+    def place(self, game_state: GameState, bounds: Optional[Bounds] = None) -> Coin:
+        """Spawn a coin and schedule its despawn."""
+        coin = spawn_coin(game_state, bounds)
+        self.event_log.emit(create_coin_spawned_event(coin))
+        self.resume(game_state, coin, self.ttl)
+        return coin
+    
+    def resume(self, game_state: GameState, coin: Coin, ttl: float) -> None:
+        """Schedule the despawn of a coin with ttl seconds left (0 for none)."""
+        if ttl > 0:
+            self.expiry[coin.id] = self.scheduler.schedule(ttl, self.expire, game_state, coin)
+    
+    def expire(self, game_state: GameState, coin: Coin) -> None:
+        """Despawn a coin nobody collected in time."""
+        del self.expiry[coin.id]
+        game_state.coins.remove(coin)
+        self.event_log.emit(create_coin_despawned_event(coin.id))
+    
+    def forget(self, coin_id: str) -> None:
+        """Cancel the despawn of a collected coin."""
+        timer = self.expiry.pop(coin_id, None)
+        if timer is not None:
+            self.scheduler.cancel(timer)
+    
+    def pause(self, coin: Coin) -> float:
+        """Stop a coin's despawn timer; returns the time it had left (0 for none)."""
+        timer = self.expiry.pop(coin.id, None)
+        if timer is None:
+            return 0.0
+        self.scheduler.cancel(timer)
+        return self.scheduler.remaining(timer)
+    
+    def remaining(self) -> Dict[str, float]:
+        """Time left of each coin with a despawn timer."""
+        return {coin_id: self.scheduler.remaining(timer) for coin_id, timer in self.expiry.items()}
+    
+    def collect(
+        self,
+        game_state: GameState,
+        starts: Optional[Dict[str, Tuple[float, float]]] = None
+    ) -> List[Tuple[str, str]]:
+        """
+        Resolve this tick's pickups: cancel the coins' despawns and log the
+        collected and score events. Returns (player_id, coin_id) pairs.
+        """
+        collected = resolve_coin_collisions(game_state, starts)
+        for player_id, coin_id in collected:
+            self.forget(coin_id)
+            self.event_log.emit(create_coin_collected_event(coin_id, player_id))
+            self.event_log.emit(create_score_event(player_id, game_state.players[player_id].score))
+        return collected
+    
+    def wave_count(self, coins: int) -> int:
+        """How many coins the next wave adds to a world holding coins."""
+        return max(0, min(self.wave_size, self.max_coins - coins))
+    
+    def schedule_waves(self, spawn: Callable[[], None], delay: Optional[float] = None) -> None:
+        """Call spawn every spawn_interval, the first time after delay."""
+        self.wave = self.scheduler.schedule(self.spawn_interval if delay is None else delay, self._wave, spawn)
+    
+    def next_wave(self) -> float:
+        """Seconds until the next wave."""
+        return self.scheduler.remaining(self.wave) if self.wave is not None else self.spawn_interval
+    
+    def _wave(self, spawn: Callable[[], None]) -> None:
+        spawn()
+        self.schedule_waves(spawn)
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Unreliable datagram transport for state snapshots and input.
+
+Over TCP a single lost packet holds back everything behind it until it is
+retransmitted, and the client then gets a burst of stale snapshots. State
+and input are superseded every tick, so they are better off over UDP, where
+a lost packet is simply replaced by the next one:
+
+- The WebSocket stays in charge of the handshake, syncs and the reliable
+  event stream. The welcome message hands the client a session token.
+- The client sends datagrams carrying the token; the first one binds the
+  session to the client's address. Only newer input moves it later (NAT
+  rebinding), so a delayed or replayed packet from an old address cannot
+  pull state away from the client.
+- Every datagram carries a sequence number, and anything not newer than the
+  last one received is dropped on arrival instead of being applied late.
+- State datagrams are packed to fit one MTU-sized packet (see priority.py).
+- The client keeps resending its current input, so a session that goes
+  quiet has lost its path; it is unbound and state goes back to the
+  WebSocket until datagrams arrive again.
+"""
+import asyncio
+import json
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+from server.admission import AdmissionStats, ClientRateLimiter
+
+
+Address = Tuple[Any, ...]
+
+
+@dataclass(eq=False)
+class DatagramSession:
+    """A player's datagram channel, bound to the address it is used from."""
+    token: str
+    player_id: str
+    limiter: ClientRateLimiter
+    address: Optional[Address] = None
+    last_seq: int = -1  # Newest input sequence number applied
+    received: int = 0
+    stale: int = 0
+    heard_at: float = 0.0  # When the last datagram arrived
+
+
+class DatagramEndpoint(asyncio.DatagramProtocol):
+    """Server end of the datagram transport: sessions, input and state."""
+    
+    def __init__(
+        self,
+        on_input: Callable[[str, Dict[str, Any]], None],
+        stats: AdmissionStats,
+        limiter_factory: Callable[[], ClientRateLimiter],
+        latency: float = 0.0,
+        timeout: float = 2.0
+    ):
+        self.on_input = on_input
+        self.stats = stats
+        self.limiter_factory = limiter_factory
+        self.latency = latency  # Artificial latency, as for WebSockets
+        self.timeout = timeout  # Silence after which a session is unbound
+        self.sessions: Dict[str, DatagramSession] = {}
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.sent = 0
+    
+    def connection_made(self, transport) -> None:
+        """Keep the transport to send state on."""
+        self.transport = transport
+    
+    def open_session(self, player_id: str) -> DatagramSession:
+        """Create a session whose token is given to the client at welcome."""
+        session = DatagramSession(secrets.token_urlsafe(12), player_id, self.limiter_factory())
+        self.sessions[session.token] = session
+        return session
+    
+    def close_session(self, session: DatagramSession) -> None:
+        """Forget a session when its WebSocket goes away."""
+        self.sessions.pop(session.token, None)
+    
+    def datagram_received(self, data: bytes, address: Address, now: Optional[float] = None) -> None:
+        """Bind sessions and apply input that is newer than any before it."""
+        try:
+            message = json.loads(data)
+            session = self.sessions.get(message["token"])
+        except (ValueError, KeyError, TypeError):
+            self.stats.decode_errors += 1
+            return
+        if session is None or not session.limiter.allow(data):
+            return
+        
+        session.received += 1
+        session.heard_at = time.monotonic() if now is None else now
+        if session.address is None:
+            session.address = address
+        
+        if message.get("type") == "input":
+            seq = message.get("seq")
+            if not isinstance(seq, int) or seq <= session.last_seq:
+                session.stale += 1
+                return
+            session.last_seq = seq
+            # The client's address changed (NAT rebinding)
+            session.address = address
+            self.on_input(session.player_id, message)
+    
+    def send(self, session: DatagramSession, data: str) -> None:
+        """Send a datagram to a bound session, after any artificial latency."""
+        if self.transport is None or session.address is None:
+            return
+        packet = data.encode()
+        self.sent += 1
+        if self.latency > 0:
+            asyncio.get_running_loop().call_later(self.latency, self._send_now, packet, session.address)
+        else:
+            self.transport.sendto(packet, session.address)
+    
+    def _send_now(self, packet: bytes, address: Address) -> None:
+        """Send a delayed packet, unless the endpoint closed meanwhile."""
+        if self.transport is not None and not self.transport.is_closing():
+            self.transport.sendto(packet, address)
+    
+    def bound_sessions(self, now: Optional[float] = None) -> Dict[str, DatagramSession]:
+        """Sessions with a known address heard from recently, by player ID."""
+        if now is None:
+            now = time.monotonic()
+        return {
+            session.player_id: session for session in self.sessions.values()
+            if session.address is not None and now - session.heard_at <= self.timeout
+        }
+    
+    def status(self) -> Dict[str, int]:
+        """Session and packet counters, for monitoring."""
+        sessions = self.sessions.values()
+        return {
+            "sessions": len(self.sessions),
+            "bound": len(self.bound_sessions()),
+            "sent": self.sent,
+            "received": sum(session.received for session in sessions),
+            "stale": sum(session.stale for session in sessions)
+        }
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Off-loop encoding of state broadcasts.
+
+The simulation hands over an immutable StateView each tick; building the
+state message and serializing it to JSON then happens on a worker thread or
+process, so encoding tick N overlaps simulating tick N+1 and the event loop
+is left free to read client input.
+"""
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Callable, List, Optional, Sequence
+from server.game_state import StateView
+from server.protocol import create_player_entry, create_state_message, encode_message
+
+
+def encode_state(
+    view: StateView,
+    seq: int = 0,
+    events: Sequence[dict] = (),
+    ghost_players: Sequence[dict] = (),
+    ghost_coins: Sequence[dict] = (),
+    traces: Sequence[dict] = ()
+) -> str:
+    """Build and encode the state message for a view, its events, ghosts and traces."""
+    return encode_message(create_state_message(view, seq, list(events), ghost_players, ghost_coins, traces))
+
+
+@dataclass
+class StateParts:
+    """A state message encoded in pieces, for budgeted per-client messages."""
+    full: str  # The complete message, for clients without a budget
+    header: str  # The message without its players
+    fragments: List[str]  # Each player's entry, in view order
+
+
+def encode_state_parts(
+    view: StateView,
+    seq: int = 0,
+    events: Sequence[dict] = (),
+    ghost_players: Sequence[dict] = (),
+    ghost_coins: Sequence[dict] = (),
+    traces: Sequence[dict] = ()
+) -> StateParts:
+    """Encode a state message's header and player entries separately."""
+    message = create_state_message(replace(view, players=()), seq, list(events), ghost_players, ghost_coins, traces)
+    del message["players"]
+    header = encode_message(message)
+    fragments = [encode_message(create_player_entry(row)) for row in view.players]
+    full = header[:-1] + ', "players": [' + ",".join(fragments) + "]}"
+    return StateParts(full, header, fragments)
+
+
+class StateEncoder:
+    """
+    Encodes state views on a worker pool.
+    
+    Threads are cheap to hand a view to but share the GIL with the event
+    loop, which still gets to run between their time slices; processes
+    encode truly in parallel at the cost of pickling the view. With zero
+    workers views are encoded inline.
+    
+    Per-client packing of encoded parts keeps state between ticks (the
+    priority accumulators), so it runs on a single thread of its own, in
+    submission order, rather than on the pool.
+    """
+    
+    def __init__(self, workers: int = 1, use_processes: bool = False):
+        self.executor: Optional[Executor] = None
+        self.packer: Optional[Executor] = None
+        if workers > 0:
+            pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+            self.executor = pool(max_workers=workers)
+            self.packer = ThreadPoolExecutor(max_workers=1)
+    
+    def submit(
+        self,
+        view: StateView,
+        seq: int = 0,
+        events: Sequence[dict] = (),
+        ghost_players: Sequence[dict] = (),
+        ghost_coins: Sequence[dict] = (),
+        traces: Sequence[dict] = (),
+        parts: bool = False
+    ) -> asyncio.Future:
+        """
+        Start encoding a view; the returned future resolves to the JSON, or
+        to its StateParts if parts is set.
+        
+        The events, ghost and trace lists must not be modified afterwards.
+        """
+        loop = asyncio.get_running_loop()
+        encode = encode_state_parts if parts else encode_state
+        args = (view, seq, events, ghost_players, ghost_coins, traces)
+        if self.executor is None:
+            future = loop.create_future()
+            future.set_result(encode(*args))
+            return future
+        return loop.run_in_executor(self.executor, encode, *args)
+    
+    def pack(self, pack: Callable[..., Any], *args: Any) -> asyncio.Future:
+        """Run a packing step off the event loop; the future resolves to its result."""
+        loop = asyncio.get_running_loop()
+        if self.packer is None:
+            future = loop.create_future()
+            future.set_result(pack(*args))
+            return future
+        return loop.run_in_executor(self.packer, pack, *args)
+    
+    def shutdown(self) -> None:
+        """Stop the workers once queued encodes finish."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        if self.packer is not None:
+            self.packer.shutdown(wait=False)
\ No newline at end of file
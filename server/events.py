@@ -0,0 +1,28 @@
+"""
+Reliable, ordered stream of entity events.
+
+Things that change rarely (coins appearing and disappearing, players joining
+and leaving, scores) are sent once as events instead of being repeated in
+every state message. Each event gets the next sequence number; a tick's
+events ride along with that tick's state broadcast, and a full-world sync
+tells late joiners the sequence number it is current as of.
+"""
+from typing import Any, Dict, List
+
+
+class EventLog:
+    """Numbers events as they happen and hands them out once per tick."""
+    
+    def __init__(self):
+        self.seq = 0  # Sequence number of the newest event
+        self.pending: List[Dict[str, Any]] = []
+    
+    def emit(self, event: Dict[str, Any]) -> None:
+        """Record an event for the next broadcast."""
+        self.seq += 1
+        self.pending.append(event)
+    
+    def drain(self) -> List[Dict[str, Any]]:
+        """Take the events recorded since the last drain, oldest first."""
+        events, self.pending = self.pending, []
+        return events
\ No newline at end of file
@@ -1,13 +1,27 @@
+import math
 import random
 import uuid
-import math
-from typing import List, Tuple
-from server.game_state import GameState, PlayerState, Coin
+from typing import Dict, List, Optional, Tuple
+from server.game_state import Color, GameState, PlayerState, Coin
+
 
+# A player's movement over a tick, for swept collision checks: the player,
+# start position, displacement and the bounding box of the whole path
+Sweep = Tuple[PlayerState, float, float, float, float, float, float, float, float]
 
-def update_player_positions(game_state: GameState, delta_time: float) -> None:
-    """Update all player positions based on their velocities."""
+
+def update_player_positions(game_state: GameState, delta_time: float) -> Dict[str, Tuple[float, float]]:
+    """
+    Update all player positions based on their velocities.
+    
+    Returns where each player that moved started, so collisions can be
+    checked along the whole path rather than just at its end.
+    """
+    starts: Dict[str, Tuple[float, float]] = {}
     for player in game_state.players.values():
+        if player.vx != 0.0 or player.vy != 0.0:
+            starts[player.id] = (player.x, player.y)
+        
         # Update position
         player.x += player.vx * delta_time
         player.y += player.vy * delta_time
@@ -15,6 +29,7 @@ def update_player_positions(game_state: GameState, delta_time: float) -> None:
         # Clamp to world boundaries
         player.x = max(player.radius, min(game_state.world_width - player.radius, player.x))
         player.y = max(player.radius, min(game_state.world_height - player.radius, player.y))
+    return starts
 
 
 def set_player_velocity(player: PlayerState, direction: str) -> None:
@@ -22,38 +37,103 @@ def set_player_velocity(player: PlayerState, direction: str) -> None:
     speed = player.speed
     
     if direction == "up":
-        player.vx, player.vy = 0, -speed
+        player.vx, player.vy = 0.0, -speed
     elif direction == "down":
-        player.vx, player.vy = 0, speed
+        player.vx, player.vy = 0.0, speed
     elif direction == "left":
-        player.vx, player.vy = -speed, 0
+        player.vx, player.vy = -speed, 0.0
     elif direction == "right":
-        player.vx, player.vy = speed, 0
+        player.vx, player.vy = speed, 0.0
     elif direction == "stop":
-        player.vx, player.vy = 0, 0
+        player.vx, player.vy = 0.0, 0.0
 
 
 def check_collision(x1: float, y1: float, r1: float, x2: float, y2: float, r2: float) -> bool:
     """Check if two circular objects collide."""
-    distance = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-    return distance < (r1 + r2)
+    # Compare squared distances; no square root needed
+    dx = x2 - x1
+    dy = y2 - y1
+    reach = r1 + r2
+    return dx * dx + dy * dy < reach * reach
+
+
+def sweep_contact(x: float, y: float, dx: float, dy: float, r1: float, cx: float, cy: float, r2: float) -> float:
+    """
+    When a circle moving from (x, y) by (dx, dy) first touches a still one.
+    
+    Returns the fraction of the move at first contact, 0 if they already
+    touch at the start, or -1 if they never do.
+    """
+    reach = r1 + r2
+    fx = cx - x
+    fy = cy - y
+    c = fx * fx + fy * fy - reach * reach
+    if c < 0.0:
+        return 0.0
+    # Solve |f - t * d| = reach for the smaller t
+    a = dx * dx + dy * dy
+    b = fx * dx + fy * dy
+    if b <= 0.0:
+        return -1.0  # Still, or moving away
+    discriminant = b * b - a * c
+    if discriminant < 0.0:
+        return -1.0  # Passes wide
+    t = (b - math.sqrt(discriminant)) / a
+    return t if t <= 1.0 else -1.0
+
+
+def player_sweeps(
+    game_state: GameState,
+    starts: Optional[Dict[str, Tuple[float, float]]] = None
+) -> List[Sweep]:
+    """Each player's path this tick, from starts (see update_player_positions) to where they are."""
+    sweeps: List[Sweep] = []
+    for player in game_state.players.values():
+        x, y = player.x, player.y
+        if starts is not None and player.id in starts:
+            x, y = starts[player.id]
+        r = player.radius
+        sweeps.append((
+            player, x, y, player.x - x, player.y - y,
+            min(x, player.x) - r, min(y, player.y) - r, max(x, player.x) + r, max(y, player.y) + r
+        ))
+    return sweeps
 
 
-def resolve_coin_collisions(game_state: GameState) -> List[Tuple[str, str]]:
+def resolve_coin_collisions(
+    game_state: GameState,
+    starts: Optional[Dict[str, Tuple[float, float]]] = None
+) -> List[Tuple[str, str]]:
     """
     Check for player-coin collisions and remove collected coins.
     Returns list of (player_id, coin_id) tuples for collected coins.
+    
+    With the start positions returned by update_player_positions, every
+    point along each player's path counts, so fast players (or slow ticks)
+    can't pass through coins; a coin goes to whoever reached it first.
     """
-    collected = []
-    coins_to_remove = []
+    collected: List[Tuple[str, str]] = []
+    coins_to_remove: List[Coin] = []
+    sweeps = player_sweeps(game_state, starts)
     
     for coin in game_state.coins:
-        for player in game_state.players.values():
-            if check_collision(player.x, player.y, player.radius, coin.x, coin.y, coin.radius):
-                player.score += coin.value
-                coins_to_remove.append(coin)
-                collected.append((player.id, coin.id))
-                break
+        cx, cy, cr = coin.x, coin.y, coin.radius
+        winner: Optional[PlayerState] = None
+        first = 2.0
+        for player, x, y, dx, dy, left, top, right, bottom in sweeps:
+            # Cheap rejection by the path's bounding box
+            if cx + cr < left or cx - cr > right or cy + cr < top or cy - cr > bottom:
+                continue
+            t = sweep_contact(x, y, dx, dy, player.radius, cx, cy, cr)
+            if 0.0 <= t < first:
+                winner, first = player, t
+                if t == 0.0:
+                    break
+        
+        if winner is not None:
+            winner.score += coin.value
+            coins_to_remove.append(coin)
+            collected.append((winner.id, coin.id))
     
     # Remove collected coins
     for coin in coins_to_remove:
@@ -62,21 +142,40 @@ def resolve_coin_collisions(game_state: GameState) -> List[Tuple[str, str]]:
     return collected
 
 
-def spawn_coin(game_state: GameState) -> Coin:
-    """Spawn a new coin at a random position."""
+def spawn_coin(
+    game_state: GameState,
+    bounds: Optional[Tuple[float, float, float, float]] = None
+) -> Coin:
+    """
+    Spawn a new coin at a random position.
+    
+    bounds optionally limits spawning to a (left, top, right, bottom) part
+    of the world; coins keep a 50 pixel margin from the world edges.
+    """
+    left, top, right, bottom = bounds or (0, 0, game_state.world_width, game_state.world_height)
     coin = Coin(
         id=str(uuid.uuid4()),
-        x=random.uniform(50, game_state.world_width - 50),
-        y=random.uniform(50, game_state.world_height - 50),
+        x=random.uniform(max(50, left), min(game_state.world_width - 50, right)),
+        y=random.uniform(max(50, top), min(game_state.world_height - 50, bottom)),
         value=random.choice([1, 1, 1, 2, 5])  # Weighted towards 1 point coins
     )
     game_state.coins.append(coin)
     return coin
 
 
-def add_player(game_state: GameState, player_id: str) -> PlayerState:
-    """Add a new player to the game at a random spawn position."""
-    colors = [
+def add_player(
+    game_state: GameState,
+    player_id: str,
+    bounds: Optional[Tuple[float, float, float, float]] = None
+) -> PlayerState:
+    """
+    Add a new player to the game at a random spawn position.
+    
+    bounds optionally limits the spawn to a (left, top, right, bottom) part
+    of the world; players keep a 100 pixel margin from the world edges.
+    """
+    left, top, right, bottom = bounds or (0, 0, game_state.world_width, game_state.world_height)
+    colors: List[Color] = [
         (255, 100, 100),  # Red
         (100, 255, 100),  # Green
         (100, 100, 255),  # Blue
@@ -87,8 +186,8 @@ def add_player(game_state: GameState, player_id: str) -> PlayerState:
     
     player = PlayerState(
         id=player_id,
-        x=random.uniform(100, game_state.world_width - 100),
-        y=random.uniform(100, game_state.world_height - 100),
+        x=random.uniform(max(100, left), min(game_state.world_width - 100, right)),
+        y=random.uniform(max(100, top), min(game_state.world_height - 100, bottom)),
         color=random.choice(colors)
     )
     game_state.players[player_id] = player
@@ -1,7 +1,22 @@
 from dataclasses import dataclass, field
-from typing import List, Dict
+from typing import Any, List, Dict, Sequence, Tuple
 import time
 
+# Field order of the tuples held by StateView, and of the dictionaries in a
+# state message
+PLAYER_VIEW_FIELDS = ("id", "x", "y", "vx", "vy", "score", "color", "radius")
+COIN_VIEW_FIELDS = ("id", "x", "y", "value", "radius")
+
+Color = Tuple[int, int, int]
+PlayerRow = Tuple[str, float, float, float, float, int, Color, float]
+CoinRow = Tuple[str, float, float, int, float]
+
+
+def to_color(value: Sequence[int]) -> Color:
+    """Convert a decoded [r, g, b] list back into a color tuple."""
+    red, green, blue = value
+    return (red, green, blue)
+
 
 @dataclass
 class PlayerState:
@@ -12,9 +27,22 @@ class PlayerState:
     vx: float = 0.0
     vy: float = 0.0
     score: int = 0
-    color: tuple = (255, 100, 100)
+    color: Color = (255, 100, 100)
     radius: float = 20.0
     speed: float = 200.0  # pixels per second
+    
+    def to_record(self) -> List[Any]:
+        """Pack every field, including server-only ones, into a flat list."""
+        return [self.id, self.x, self.y, self.vx, self.vy, self.score, list(self.color), self.radius, self.speed]
+    
+    @classmethod
+    def from_record(cls, record: List[Any]) -> 'PlayerState':
+        """Unpack a list written by to_record."""
+        player_id, x, y, vx, vy, score, color, radius, speed = record
+        return cls(
+            id=player_id, x=x, y=y, vx=vx, vy=vy, score=score,
+            color=to_color(color), radius=radius, speed=speed
+        )
 
 
 @dataclass
@@ -25,6 +53,38 @@ class Coin:
     y: float
     value: int = 1
     radius: float = 10.0
+    
+    def to_record(self) -> List[Any]:
+        """Pack every field into a flat list."""
+        return [self.id, self.x, self.y, self.value, self.radius]
+    
+    @classmethod
+    def from_record(cls, record: List[Any]) -> 'Coin':
+        """Unpack a list written by to_record."""
+        coin_id, x, y, value, radius = record
+        return cls(id=coin_id, x=x, y=y, value=value, radius=radius)
+
+
+@dataclass(frozen=True)
+class StateView:
+    """Read-only snapshot of the fields broadcast to clients."""
+    timestamp: float
+    players: Tuple[PlayerRow, ...]
+    coins: Tuple[CoinRow, ...]
+    
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Pickle through the constructor: a compiled frozen dataclass can't
+        # have its fields restored one by one
+        return (StateView, (self.timestamp, self.players, self.coins))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Build the state message, in GameState.to_dict form."""
+        return {
+            "type": "state",
+            "timestamp": self.timestamp,
+            "players": [dict(zip(PLAYER_VIEW_FIELDS, p)) for p in self.players],
+            "coins": [dict(zip(COIN_VIEW_FIELDS, c)) for c in self.coins]
+        }
 
 
 @dataclass
@@ -35,39 +95,33 @@ class GameState:
     timestamp: float = field(default_factory=time.time)
     world_width: float = 800.0
     world_height: float = 600.0
+    # Coins of sleeping cells, packed and left out of the simulation but
+    # still shown and saved (see server/sleep.py)
+    dormant_coins: Tuple[CoinRow, ...] = ()
     
-    def to_dict(self) -> dict:
+    def to_dict(self) -> Dict[str, Any]:
         """Serialize game state to dictionary."""
-        return {
-            "type": "state",
-            "timestamp": self.timestamp,
-            "players": [
-                {
-                    "id": p.id,
-                    "x": p.x,
-                    "y": p.y,
-                    "vx": p.vx,
-                    "vy": p.vy,
-                    "score": p.score,
-                    "color": p.color,
-                    "radius": p.radius
-                }
+        return self.view().to_dict()
+    
+    def view(self) -> 'StateView':
+        """
+        Take an immutable copy of the broadcast fields.
+        
+        Copying into tuples is much cheaper than building the state message,
+        and the view can be encoded on another thread or process while the
+        simulation carries on mutating this state.
+        """
+        return StateView(
+            timestamp=self.timestamp,
+            players=tuple(
+                (p.id, p.x, p.y, p.vx, p.vy, p.score, p.color, p.radius)
                 for p in self.players.values()
-            ],
-            "coins": [
-                {
-                    "id": c.id,
-                    "x": c.x,
-                    "y": c.y,
-                    "value": c.value,
-                    "radius": c.radius
-                }
-                for c in self.coins
-            ]
-        }
+            ),
+            coins=tuple((c.id, c.x, c.y, c.value, c.radius) for c in self.coins) + self.dormant_coins
+        )
     
     @classmethod
-    def from_dict(cls, data: dict) -> 'GameState':
+    def from_dict(cls, data: Dict[str, Any]) -> 'GameState':
         """Deserialize game state from dictionary."""
         state = cls()
         state.timestamp = data.get("timestamp", time.time())
@@ -80,7 +134,7 @@ class GameState:
                 vx=p_data.get("vx", 0.0),
                 vy=p_data.get("vy", 0.0),
                 score=p_data.get("score", 0),
-                color=tuple(p_data.get("color", [255, 100, 100])),
+                color=to_color(p_data.get("color", (255, 100, 100))),
                 radius=p_data.get("radius", 20.0)
             )
             state.players[player.id] = player
@@ -95,4 +149,34 @@ class GameState:
             )
             state.coins.append(coin)
         
+        return state
+    
+    def to_snapshot(self) -> Dict[str, Any]:
+        """
+        Serialize the complete server-side state for a hot restart.
+        
+        Unlike to_dict, this keeps server-only fields (speed) and packs each
+        entity into a flat list to keep the handoff payload small. Sleeping
+        coins are restored awake.
+        """
+        return {
+            "timestamp": self.timestamp,
+            "world": [self.world_width, self.world_height],
+            "players": [p.to_record() for p in self.players.values()],
+            "coins": [c.to_record() for c in self.coins] + [list(row) for row in self.dormant_coins]
+        }
+    
+    @classmethod
+    def from_snapshot(cls, data: Dict[str, Any]) -> 'GameState':
+        """Restore a game state written by to_snapshot."""
+        world_width, world_height = data["world"]
+        state = cls(timestamp=data["timestamp"], world_width=world_width, world_height=world_height)
+        
+        for record in data["players"]:
+            player = PlayerState.from_record(record)
+            state.players[player.id] = player
+        
+        for record in data["coins"]:
+            state.coins.append(Coin.from_record(record))
+        
         return state
\ No newline at end of file
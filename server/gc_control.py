@@ -0,0 +1,198 @@
+"""
+Garbage collector pause control and per-tick allocation accounting.
+
+Every tick allocates state views, messages, JSON strings, broadcast tasks
+and coroutines. CPython's cyclic collector runs whenever the number of
+tracked objects allocated since the last collection passes a threshold, so
+it runs in the middle of whichever tick crosses it, and now and then a full
+collection of a large heap delays a snapshot.
+
+GcController can freeze the objects that exist once the server has started
+(modules, config, the restored world) into a permanent generation that
+collections never scan again. It can also defer collections to the slack at
+the end of a tick: automatic collection stays armed only at headroom times
+the usual gen0 threshold, as a safety net, and between ticks the controller
+runs whichever generation Python's own rules say is due (including only
+doing a full collection once a quarter as many objects again as survived
+the last one are waiting), if its last pause fits in the time left. A due
+full collection is never put off beyond twice its threshold, so cycles are
+still reclaimed on a server that never has slack. Survivors are tallied by
+the gc callback from the young generations' sizes and what each collection
+freed, so deciding never walks the oldest generation; the tally misses
+objects freed by reference counting, so it is recounted exactly after a
+scheduled full collection whenever the rest of the slack fits the count.
+
+Either way it counts each tick's tracked objects allocated (net of those
+freed) and how long collections paused the server, split into the
+scheduled ones and the unscheduled ones that hit wherever they happened to.
+"""
+import gc
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+
+class GcController:
+    """Decides when the cyclic collector runs, and accounts for what it costs."""
+    
+    def __init__(self, defer: bool = False, headroom: int = 10, min_slack: float = 0.002, window: int = 300):
+        self.defer = defer
+        self.headroom = headroom
+        self.min_slack = min_slack
+        self.thresholds = gc.get_threshold()
+        self.frozen = 0
+        
+        # Net tracked objects allocated by each of the last window ticks
+        self.tick_objects: Deque[int] = deque(maxlen=window)
+        self._objects = 0  # Counted so far this tick, before collections reset gen0
+        self._baseline = gc.get_count()[0]
+        self._ticking = False
+        
+        # Objects that survived the last full collection (counted once here,
+        # then tallied by the gc callback), objects promoted into the oldest
+        # generation since, and the young generations' size as a collection
+        # starts
+        self._long_lived = 0
+        self._pending = 0
+        self._young = 0
+        self.recount_time = 0.0
+        self._recount()
+        
+        # Last pause of each generation, to tell whether it fits the slack
+        self.pauses: List[float] = [0.0, 0.0, 0.0]
+        self.scheduled_collections = 0
+        self.scheduled_pause = 0.0
+        self.unscheduled_collections = 0
+        self.unscheduled_pause = 0.0
+        self.max_unscheduled_pause = 0.0
+        self._scheduled = False
+        self._started = 0.0
+        
+        gc.callbacks.append(self._on_collection)
+        if defer:
+            gc.set_threshold(self.thresholds[0] * headroom, *self.thresholds[1:])
+    
+    def freeze(self) -> int:
+        """Collect once, then exempt every surviving object from later collections."""
+        self._scheduled = True
+        try:
+            gc.collect()
+        finally:
+            self._scheduled = False
+        gc.freeze()
+        self.frozen = gc.get_freeze_count()
+        # Frozen objects are out of every generation
+        self._long_lived = 0
+        self._pending = 0
+        return self.frozen
+    
+    def start_tick(self) -> None:
+        """Close the previous tick's allocation count and start a new one."""
+        count = gc.get_count()[0]
+        if self._ticking:
+            self.tick_objects.append(self._objects + count - self._baseline)
+        self._ticking = True
+        self._objects = 0
+        self._baseline = count
+    
+    def due(self, slack: float = float("inf")) -> Optional[int]:
+        """The oldest generation due for collection whose last pause fits in slack."""
+        counts = gc.get_count()
+        if counts[2] > self.thresholds[2] and self._full_collection_worthwhile():
+            if self.pauses[2] <= slack or counts[2] > 2 * self.thresholds[2]:
+                return 2  # Overdue ones run whatever they cost
+        for generation in (1, 0):
+            if counts[generation] > self.thresholds[generation] and self.pauses[generation] <= slack:
+                return generation
+        return None
+    
+    def _full_collection_worthwhile(self) -> bool:
+        """
+        Python's own rule: only scan the oldest generation once it has grown
+        by a quarter since the last full collection, so large heaps aren't
+        scanned over and over for little gain.
+        """
+        return self._pending > self._long_lived / 4
+    
+    def collect_in_slack(self, slack: float) -> Optional[int]:
+        """Run a due collection if deferring and slack seconds are left; returns its generation."""
+        if not self.defer or slack < self.min_slack:
+            return None
+        generation = self.due(slack)
+        if generation is None:
+            return None
+        self._scheduled = True
+        try:
+            gc.collect(generation)
+        finally:
+            self._scheduled = False
+        if generation == 2 and self.pauses[2] + self.recount_time <= slack:
+            self._recount()
+        return generation
+    
+    def _recount(self) -> None:
+        """Count the oldest generation exactly, and time how long that takes."""
+        started = time.perf_counter()
+        self._long_lived = len(gc.get_objects(generation=2))
+        self.recount_time = time.perf_counter() - started
+    
+    def _on_collection(self, phase: str, info: Dict[str, Any]) -> None:
+        """
+        gc callback: time each collection, keep the allocation count across
+        it, and tally survivors promoted into the oldest generation.
+        """
+        generation = info["generation"]
+        if phase == "start":
+            # The collection resets the gen0 count
+            self._objects += gc.get_count()[0] - self._baseline
+            self._baseline = 0
+            if generation > 0:
+                # Young generations are small; walking them costs far less
+                # than the collection that is about to scan them
+                self._young = len(gc.get_objects(generation=0)) + len(gc.get_objects(generation=1))
+            self._started = time.perf_counter()
+            return
+        
+        pause = time.perf_counter() - self._started
+        self.pauses[generation] = pause
+        if generation == 1:
+            self._pending += max(0, self._young - info["collected"])
+        elif generation == 2:
+            # Objects the oldest generation lost to reference counting since
+            # the last count aren't seen, so this can run high
+            self._long_lived = max(0, self._long_lived + self._pending + self._young - info["collected"])
+            self._pending = 0
+        if self._scheduled:
+            self.scheduled_collections += 1
+            self.scheduled_pause += pause
+        else:
+            self.unscheduled_collections += 1
+            self.unscheduled_pause += pause
+            self.max_unscheduled_pause = max(self.max_unscheduled_pause, pause)
+    
+    def close(self) -> None:
+        """Stop accounting and give the collector back its own thresholds."""
+        if self._on_collection in gc.callbacks:
+            gc.callbacks.remove(self._on_collection)
+        gc.set_threshold(*self.thresholds)
+    
+    def status(self) -> Dict[str, Any]:
+        """Allocation and pause figures, for monitoring."""
+        objects = self.tick_objects
+        return {
+            "deferred": self.defer,
+            "frozen": self.frozen,
+            "tick_objects": {
+                "mean": round(sum(objects) / len(objects), 1) if objects else 0.0,
+                "max": max(objects, default=0)
+            },
+            "scheduled": {
+                "collections": self.scheduled_collections,
+                "pause_ms": round(self.scheduled_pause * 1000, 3)
+            },
+            "unscheduled": {
+                "collections": self.unscheduled_collections,
+                "pause_ms": round(self.unscheduled_pause * 1000, 3),
+                "max_ms": round(self.max_unscheduled_pause * 1000, 3)
+            }
+        }
\ No newline at end of file
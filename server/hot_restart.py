@@ -0,0 +1,100 @@
+"""
+Zero-downtime hot restart support.
+
+The running server hands its listening socket and a snapshot of its live
+state to a freshly started process over a Unix domain socket:
+
+1. The old process listens on a Unix socket and starts the new build with
+   HOT_RESTART_SOCKET pointing at it.
+2. The new process connects; the old one stops ticking and sends the
+   listening socket (SCM_RIGHTS fd passing) plus the serialized state.
+3. The new process resumes ticking on the inherited socket, so no connection
+   attempt is ever refused, while the old one tells its clients to resume
+   and exits.
+"""
+import json
+import os
+import socket
+import struct
+import subprocess
+import sys
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+
+HEADER = struct.Struct("!Q")
+MAX_FDS = 16
+
+
+def encode_handoff(payload: dict) -> bytes:
+    """Serialize handoff state compactly."""
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def decode_handoff(data: bytes) -> dict:
+    """Deserialize handoff state."""
+    return json.loads(data)
+
+
+def listen_for_successor(path: str) -> socket.socket:
+    """Create the Unix socket the successor process connects to."""
+    if os.path.exists(path):
+        os.unlink(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+    return server
+
+
+def spawn_successor(path: str, argv: Optional[List[str]] = None) -> subprocess.Popen:
+    """Start a new server process that will take over from this one."""
+    env = dict(os.environ, HOT_RESTART_SOCKET=path)
+    return subprocess.Popen(argv or [sys.executable, "-m", "server.main"], env=env)
+
+
+def send_handoff(conn: socket.socket, fds: List[int], payload: bytes) -> None:
+    """Send file descriptors and a payload over a connected Unix socket."""
+    socket.send_fds(conn, [HEADER.pack(len(payload))], fds)
+    conn.sendall(payload)
+
+
+def receive_handoff(conn: socket.socket) -> Tuple[List[int], bytes]:
+    """Receive the file descriptors and payload sent by send_handoff."""
+    header, fds, _, _ = socket.recv_fds(conn, HEADER.size, MAX_FDS)
+    if len(header) != HEADER.size:
+        raise ConnectionError("Incomplete hot restart header")
+    
+    (length,) = HEADER.unpack(header)
+    chunks = []
+    remaining = length
+    while remaining:
+        chunk = conn.recv(min(remaining, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Hot restart payload truncated")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    
+    return fds, b"".join(chunks)
+
+
+def connect_to_predecessor(path: str) -> Tuple[List[socket.socket], dict]:
+    """
+    Connect to the old process and take over its sockets and state.
+    
+    Returns the inherited listening sockets and the decoded state payload.
+    """
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(path)
+        fds, payload = receive_handoff(conn)
+    finally:
+        conn.close()
+    
+    sockets = [socket.socket(fileno=fd) for fd in fds]
+    return sockets, decode_handoff(payload)
+
+
+def parse_resume_token(path: str) -> Optional[str]:
+    """Extract the resume token from a connection path like '/?resume=abc'."""
+    values = parse_qs(urlsplit(path or "").query).get("resume")
+    return values[0] if values else None
\ No newline at end of file
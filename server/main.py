@@ -1,24 +1,67 @@
 import asyncio
 import websockets
 import time
+from http import HTTPStatus
 import os
+import secrets
+import signal
+import socket
+import sys
+from functools import partial
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
-from server.game_state import GameState
+from server.game_state import GameState, PlayerState
 from server.game_logic import (
     update_player_positions,
     set_player_velocity,
-    resolve_coin_collisions,
-    spawn_coin,
     add_player,
     remove_player
 )
 from server.protocol import (
     encode_message,
     decode_message,
-    create_state_message,
-    create_welcome_message
+    create_welcome_message,
+    create_restart_message,
+    create_redirect_message,
+    create_peer_ghosts_message,
+    create_peer_handoff_message,
+    create_peer_handoff_ack_message,
+    create_peer_score_message,
+    create_sync_message,
+    create_datagram_state_header,
+    create_coin_collected_event,
+    create_coin_despawned_event,
+    create_player_joined_event,
+    create_player_left_event,
+    create_score_event,
+    create_ghost_manifest_event,
+    create_stats_message
 )
 from server.network import NetworkManager
+from server.coins import CoinTimers
+from server.encoder import StateEncoder
+from server.events import EventLog
+from server.overload import OverloadController
+from server.priority import SnapshotPacker
+from server.datagram import DatagramEndpoint
+from server.sleep import SleepGrid
+from server.gc_control import GcController
+from server.persistence import ScoreStore, parse_player_name
+from server.rooms import RoomConfig, RoomManager, parse_room_path
+from server.tracing import InputTracer
+from server.native import compiled_modules
+from server.scheduler import TimingWheel
+from server.partition import GhostManifests, RegionMap, ghosts_for, resolve_ghost_collisions
+from server.peers import PeerLink
+from server.admission import AdmissionStats, ClientRateLimiter
+from server.hot_restart import (
+    listen_for_successor,
+    spawn_successor,
+    send_handoff,
+    connect_to_predecessor,
+    encode_handoff,
+    parse_resume_token
+)
 
 # Load environment variables
 load_dotenv()
@@ -28,51 +71,466 @@ SERVER_HOST = os.getenv("SERVER_HOST", "localhost")
 SERVER_PORT = int(os.getenv("SERVER_PORT", "8765"))
 TICK_RATE = int(os.getenv("TICK_RATE", "30"))
 COIN_SPAWN_INTERVAL = float(os.getenv("COIN_SPAWN_INTERVAL", "3.0"))
+COIN_WAVE_SIZE = int(os.getenv("COIN_WAVE_SIZE", "1"))
+COIN_TTL = float(os.getenv("COIN_TTL", "60"))  # 0 keeps coins forever
+MAX_COINS = int(os.getenv("MAX_COINS", "50"))  # Per region node
 ARTIFICIAL_LATENCY = float(os.getenv("ARTIFICIAL_LATENCY", "0.2"))
 WORLD_WIDTH = float(os.getenv("WORLD_WIDTH", "800"))
 WORLD_HEIGHT = float(os.getenv("WORLD_HEIGHT", "600"))
+HOT_RESTART_PATH = os.getenv("HOT_RESTART_PATH", "/tmp/krafton-hot-restart.sock")
+HOT_RESTART_SOCKET = os.getenv("HOT_RESTART_SOCKET")  # Set only in a successor
+RESUME_GRACE = float(os.getenv("RESUME_GRACE", "10.0"))
+
+# Multi-node world partitioning: REGION_GRID splits the world into COLSxROWS
+# regions, REGION_NODES lists each region's server URL (row-major) and
+# REGION_INDEX selects the region this process owns
+REGION_GRID = os.getenv("REGION_GRID", "1x1")
+REGION_NODES = os.getenv("REGION_NODES", "")
+REGION_INDEX = int(os.getenv("REGION_INDEX", "0"))
+GHOST_MARGIN = float(os.getenv("GHOST_MARGIN", "400"))
+HANDOFF_HYSTERESIS = float(os.getenv("HANDOFF_HYSTERESIS", "20"))
+GHOST_TIMEOUT = 1.0
+HANDOFF_TIMEOUT = 2.0  # Unacknowledged handoffs are sent again after this
+
+# Nodes talk to each other on an internal listener at PEER_HOST:PEER_PORT,
+# never the client port; REGION_PEERS lists each region's peer URL
+# (row-major) and links must present the nodes' shared PEER_SECRET
+PEER_HOST = os.getenv("PEER_HOST", SERVER_HOST)
+PEER_PORT = int(os.getenv("PEER_PORT", "0"))
+REGION_PEERS = os.getenv("REGION_PEERS", "")
+PEER_SECRET = os.getenv("PEER_SECRET", "")
+
+# Admission control: global connection cap, max inbound message size and
+# per-connection token buckets for inbound messages and bytes
+MAX_CONNECTIONS = int(os.getenv("MAX_CONNECTIONS", "500"))
+MAX_SPECTATORS = int(os.getenv("MAX_SPECTATORS", "50"))  # Large audiences go through relays
+MAX_MESSAGE_SIZE = int(os.getenv("MAX_MESSAGE_SIZE", "4096"))
+INPUT_RATE = float(os.getenv("INPUT_RATE", "30"))
+INPUT_BURST = float(os.getenv("INPUT_BURST", "60"))
+INPUT_BYTES_RATE = float(os.getenv("INPUT_BYTES_RATE", "16384"))
+INPUT_BYTES_BURST = float(os.getenv("INPUT_BYTES_BURST", "32768"))
+PEER_MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+STATS_INTERVAL = 30.0
+
+# State broadcasts are encoded on ENCODE_WORKERS worker threads, or worker
+# processes if ENCODE_PROCESSES is set; 0 workers encodes on the event loop
+ENCODE_WORKERS = int(os.getenv("ENCODE_WORKERS", "1"))
+ENCODE_PROCESSES = os.getenv("ENCODE_PROCESSES", "0") == "1"
+
+# Overload control: degrade once smoothed tick time stays above
+# OVERLOAD_HIGH of the tick budget, recover once it stays below OVERLOAD_LOW
+OVERLOAD_HIGH = float(os.getenv("OVERLOAD_HIGH", "0.9"))
+OVERLOAD_LOW = float(os.getenv("OVERLOAD_LOW", "0.5"))
+
+# Per-client snapshot budget in bytes (0 sends everyone the whole state);
+# players nearer than PRIORITY_FALLOFF pixels get most of it
+SNAPSHOT_BUDGET = int(os.getenv("SNAPSHOT_BUDGET", "0"))
+PRIORITY_FALLOFF = float(os.getenv("PRIORITY_FALLOFF", "400"))
+
+# Optional UDP transport for state and input on DATAGRAM_PORT (0 disables);
+# state datagrams are packed to DATAGRAM_MTU bytes
+DATAGRAM_PORT = int(os.getenv("DATAGRAM_PORT", "0"))
+DATAGRAM_MTU = int(os.getenv("DATAGRAM_MTU", "1200"))
+
+# Sleeping cells: with SLEEP_CELL_SIZE set the world is divided into cells of
+# that many pixels, simulated only while a player is within SLEEP_MARGIN
+SLEEP_CELL_SIZE = float(os.getenv("SLEEP_CELL_SIZE", "0"))
+SLEEP_MARGIN = float(os.getenv("SLEEP_MARGIN", "200"))
+
+# Lightweight rooms alongside the main world, joined on /room/<name>: up to
+# MAX_ROOMS of ROOM_MAX_PLAYERS each (0 rooms disables them). Rooms where
+# nobody moves tick at ROOM_IDLE_TICK_RATE, and empty rooms are closed after
+# ROOM_EMPTY_TIMEOUT seconds
+MAX_ROOMS = int(os.getenv("MAX_ROOMS", "0"))
+ROOM_MAX_PLAYERS = int(os.getenv("ROOM_MAX_PLAYERS", "16"))
+ROOM_IDLE_TICK_RATE = float(os.getenv("ROOM_IDLE_TICK_RATE", "5"))
+ROOM_EMPTY_TIMEOUT = float(os.getenv("ROOM_EMPTY_TIMEOUT", "30"))
+
+# Garbage collection: GC_FREEZE exempts everything alive once the server has
+# started from collections; GC_DEFER runs collections in the slack after a
+# tick instead of whenever allocations cross the threshold mid-tick
+GC_FREEZE = os.getenv("GC_FREEZE", "0") == "1"
+GC_DEFER = os.getenv("GC_DEFER", "0") == "1"
+
+# Player stats: with STATS_DB set, named players' scores and finished matches
+# are kept in that SQLite file, written in batches every STATS_FLUSH_MS with
+# at most STATS_MAX_PENDING finished matches waiting
+STATS_DB = os.getenv("STATS_DB", "")
+STATS_FLUSH_MS = float(os.getenv("STATS_FLUSH_MS", "250"))
+STATS_MAX_PENDING = int(os.getenv("STATS_MAX_PENDING", "1000"))
 
 # Global game state
 game_state = GameState(world_width=WORLD_WIDTH, world_height=WORLD_HEIGHT)
 network_manager = NetworkManager(artificial_latency=ARTIFICIAL_LATENCY)
+admission_stats = AdmissionStats()
+state_encoder = StateEncoder(ENCODE_WORKERS, ENCODE_PROCESSES)
+event_log = EventLog()
+overload = OverloadController(1.0 / TICK_RATE, OVERLOAD_HIGH, OVERLOAD_LOW)
+input_tracer = InputTracer()
+gc_control = GcController(defer=GC_DEFER)
+snapshot_packer = SnapshotPacker(SNAPSHOT_BUDGET, PRIORITY_FALLOFF)
+datagram_packer = SnapshotPacker(DATAGRAM_MTU, PRIORITY_FALLOFF)
+datagram_endpoint: Optional[DatagramEndpoint] = None  # Set up in main()
+score_store: Optional[ScoreStore] = None  # Opened in main()
+
+# Timed simulation events (coin waves and despawns) run off a timing wheel
+# advanced once per tick
+scheduler = TimingWheel(1.0 / TICK_RATE, time.time())
+coin_timers = CoinTimers(scheduler, event_log, COIN_TTL, COIN_SPAWN_INTERVAL, COIN_WAVE_SIZE, MAX_COINS)
+region_map = RegionMap.from_config(WORLD_WIDTH, WORLD_HEIGHT, REGION_GRID, REGION_NODES, REGION_PEERS)
+own_region = region_map.regions[REGION_INDEX]
+sleep_grid = SleepGrid(WORLD_WIDTH, WORLD_HEIGHT, SLEEP_CELL_SIZE, SLEEP_MARGIN) if SLEEP_CELL_SIZE > 0 else None
+room_manager = RoomManager(
+    RoomConfig(
+        world_width=WORLD_WIDTH,
+        world_height=WORLD_HEIGHT,
+        tick_rate=TICK_RATE,
+        max_players=ROOM_MAX_PLAYERS,
+        coin_spawn_interval=COIN_SPAWN_INTERVAL,
+        coin_wave_size=COIN_WAVE_SIZE,
+        coin_ttl=COIN_TTL,
+        max_coins=MAX_COINS,
+        artificial_latency=ARTIFICIAL_LATENCY
+    ),
+    max_rooms=MAX_ROOMS,
+    idle_every=max(1, round(TICK_RATE / ROOM_IDLE_TICK_RATE)),
+    empty_timeout=ROOM_EMPTY_TIMEOUT
+) if MAX_ROOMS > 0 else None
 
 # Player ID to WebSocket mapping
 player_connections = {}
 
+# Player and room connections admitted but not yet registered; they count
+# toward MAX_CONNECTIONS while their handshake is in flight
+admitting = 0
+
+# Read-only viewers (including relays) connected to /spectate
+spectators = set()
+
+# Resume token to player ID, so clients can reclaim their player after a
+# hot restart
+resume_tokens: Dict[str, str] = {}
+
+# Players restored from a hot restart whose client has not resumed yet,
+# mapped to the time after which they are removed
+awaiting_resume: Dict[str, float] = {}
+
+# Named players whose stats are kept: player ID to name and when their match
+# started
+player_matches: Dict[str, Tuple[str, float]] = {}
+
+# Outbound links to neighbouring region nodes, and the ghost entities they
+# last mirrored to us, keyed by region index; clients are sent the ghosts'
+# static fields through ghost_manifests
+peer_links: Dict[int, PeerLink] = {}
+ghosts: Dict[int, dict] = {}
+ghost_manifests = GhostManifests()
 
-async def handle_client_message(websocket, player_id: str):
+# Players handed off to a neighbour that hasn't acknowledged yet, mapped to
+# the time after which the handoff is sent again; they stay ours until then
+pending_handoffs: Dict[str, float] = {}
+
+ticking = True
+restarting = False
+
+
+def create_rate_limiter() -> ClientRateLimiter:
+    """Inbound limits for one client connection or datagram session."""
+    return ClientRateLimiter(
+        admission_stats,
+        messages_per_second=INPUT_RATE,
+        message_burst=INPUT_BURST,
+        bytes_per_second=INPUT_BYTES_RATE,
+        byte_burst=INPUT_BYTES_BURST,
+        max_message_size=MAX_MESSAGE_SIZE
+    )
+
+
+def apply_input(player_id: Optional[str], message: dict) -> None:
+    """Apply a player's input message, from the WebSocket or a datagram."""
+    if player_id in game_state.players:
+        set_player_velocity(game_state.players[player_id], message.get("move"))
+        trace_id = message.get("trace")
+        if isinstance(trace_id, int):
+            input_tracer.receive(player_id, trace_id, time.time())
+
+
+async def handle_client_message(websocket, player_id: Optional[str]):
     """Handle incoming messages from a client."""
+    async for message in network_manager.client_messages(websocket, create_rate_limiter()):
+        if message.get("type") == "input":
+            apply_input(player_id, message)
+        elif message.get("type") == "sync_request":
+            # The client missed events; send it the whole world again
+            asyncio.create_task(send_sync(websocket))
+
+
+def note_score(player_id: str, score: int) -> None:
+    """Pass a named player's new score on to the stats store."""
+    match = player_matches.get(player_id)
+    if match is not None and score_store is not None:
+        score_store.update_score(match[0], score)
+
+
+async def finish_match(player_id: str, score: int) -> None:
+    """Record a named player's finished match, waiting if the store is behind."""
+    match = player_matches.pop(player_id, None)
+    if match is not None and score_store is not None:
+        await score_store.record_result(match[0], score, match[1], time.time())
+
+
+async def send_stats(websocket, name: str) -> None:
+    """Send a named player their stats once the store has read them."""
+    stats = await score_store.load(name)
+    await network_manager.send_message(websocket, encode_message(create_stats_message(name, stats)))
+
+
+async def send_sync(websocket) -> None:
+    """Send a client the full world as of the newest event."""
+    sync = create_sync_message(game_state, event_log.seq, ghost_manifests.sync())
+    await network_manager.send_message(websocket, encode_message(sync))
+
+
+def admit_connection(path: str, request_headers):
+    """
+    Reject connections over the global cap during the HTTP handshake, before
+    any WebSocket or game state is set up for them.
+    """
+    if path.startswith("/status"):
+        status = {
+            "players": len(game_state.players),
+            "connections": len(player_connections),
+            "admitting": admitting,
+            "spectators": len(spectators),
+            "overload": overload.status(),
+            "gc": gc_control.status(),
+            "admission": admission_stats.as_dict()
+        }
+        if datagram_endpoint is not None:
+            status["datagram"] = datagram_endpoint.status()
+        if score_store is not None:
+            status["stats"] = score_store.status()
+        if sleep_grid is not None:
+            status["sleep"] = sleep_grid.status()
+        if room_manager is not None:
+            status["rooms"] = room_manager.status()
+        return HTTPStatus.OK, [("Content-Type", "application/json")], encode_message(status).encode()
+    if path.startswith("/spectate"):
+        if len(spectators) >= MAX_SPECTATORS or not overload.policy.accept_joins:
+            admission_stats.rejected_connections += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, [("Retry-After", "10")], b"No spectator slots, use a relay\n"
+        admission_stats.accepted_connections += 1
+        return None
+    connections = len(player_connections) + admitting
+    if room_manager is not None:
+        connections += room_manager.status()["players"]
+    if connections >= MAX_CONNECTIONS:
+        admission_stats.rejected_connections += 1
+        return HTTPStatus.SERVICE_UNAVAILABLE, [("Retry-After", "5")], b"Server full\n"
+    if path.startswith("/room/"):
+        room_id = parse_room_path(path)
+        if room_manager is None or room_id is None:
+            return HTTPStatus.NOT_FOUND, [], b"No such room\n"
+        if not room_manager.admits(room_id) or not overload.policy.accept_joins:
+            admission_stats.rejected_connections += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, [("Retry-After", "5")], b"Room full\n"
+        admission_stats.accepted_connections += 1
+        return None
+    if not overload.policy.accept_joins and parse_resume_token(path) is None:
+        # Overloaded: existing players may still resume, nobody new joins
+        admission_stats.rejected_connections += 1
+        return HTTPStatus.SERVICE_UNAVAILABLE, [("Retry-After", "10")], b"Server overloaded\n"
+    admission_stats.accepted_connections += 1
+    return None
+
+
+async def report_admission_stats():
+    """Periodically log admission counters when traffic was dropped."""
+    last = admission_stats.as_dict()
+    while True:
+        await asyncio.sleep(STATS_INTERVAL)
+        current = admission_stats.as_dict()
+        if current != last:
+            print(f"Admission: {current}")
+            last = current
+
+
+class AdmittingProtocol(websockets.WebSocketServerProtocol):
+    """
+    Holds a connection slot from admission until the handler has registered
+    the player, or the handshake has failed, so a burst of handshakes can't
+    overshoot MAX_CONNECTIONS.
+    """
+    
+    holds_slot = False
+    
+    async def process_request(self, path, request_headers):
+        global admitting
+        response = admit_connection(path, request_headers)
+        if response is None and not path.startswith("/spectate"):
+            self.holds_slot = True
+            admitting += 1
+        return response
+    
+    def release_slot(self) -> None:
+        """Hand the slot back, once the connection is counted elsewhere."""
+        global admitting
+        if self.holds_slot:
+            self.holds_slot = False
+            admitting -= 1
+    
+    async def handler(self) -> None:
+        try:
+            await super().handler()
+        finally:
+            self.release_slot()
+
+
+def authenticate_peer(path: str, request_headers):
+    """Only let nodes presenting the shared secret open a peer link."""
+    given = request_headers.get("Authorization", "").encode("utf-8", "replace")
+    if secrets.compare_digest(given, f"Bearer {PEER_SECRET}".encode()):
+        return None
+    admission_stats.rejected_peers += 1
+    return HTTPStatus.FORBIDDEN, [], b"Forbidden\n"
+
+
+async def handle_peer(websocket, path=None):
+    """Handle messages from a neighbouring region node."""
     try:
-        while True:
-            message_str = await network_manager.receive_message(websocket)
-            message = decode_message(message_str)
-            
-            # Only process input messages
-            if message.get("type") == "input":
-                move = message.get("move")
-                if player_id in game_state.players:
-                    set_player_velocity(game_state.players[player_id], move)
-                    
+        async for message_str in websocket:
+            try:
+                await handle_peer_message(websocket, decode_message(message_str))
+            except (ValueError, KeyError, TypeError):
+                # Malformed; the link stays up for the rest
+                admission_stats.peer_errors += 1
     except websockets.exceptions.ConnectionClosed:
         pass
 
 
+async def handle_peer_message(websocket, message: dict) -> None:
+    """Apply one message from a neighbouring region node."""
+    message_type = message.get("type")
+    
+    if message_type == "peer_ghosts":
+        message["received"] = time.time()
+        ghosts[message["region"]] = message
+    
+    elif message_type == "peer_handoff":
+        if not ticking:
+            return  # Our state is already with a successor; the sender retries there
+        
+        # A player crossed into our region; their client follows. A handoff
+        # sent again because our ack was late replaces the earlier copy.
+        player = PlayerState.from_record(message["player"])
+        if player.id not in game_state.players:
+            event_log.emit(create_player_joined_event(player))
+        game_state.players[player.id] = player
+        if message.get("resume_token"):
+            resume_tokens[message["resume_token"]] = player.id
+        if message.get("match") and score_store is not None:
+            name, started = message["match"]
+            player_matches[player.id] = (str(name), float(started))
+        awaiting_resume[player.id] = time.time() + RESUME_GRACE
+        await websocket.send(encode_message(create_peer_handoff_ack_message(player.id)))
+    
+    elif message_type == "peer_score":
+        # One of our players collected a coin owned by a neighbour
+        collector = game_state.players.get(message["player_id"])
+        if collector is not None:
+            collector.score += int(message["value"])
+            event_log.emit(create_score_event(collector.id, collector.score))
+            note_score(collector.id, collector.score)
+
+
+async def wait_for_resume(resume_token: str, timeout: float = 1.0) -> Optional[str]:
+    """Wait briefly for a handed-off player whose client arrived first."""
+    deadline = time.time() + timeout
+    while resume_token not in resume_tokens and time.time() < deadline:
+        await asyncio.sleep(0.02)
+    return resume_tokens.get(resume_token)
+
+
+async def handle_spectator(websocket) -> None:
+    """Stream the game to a read-only viewer, such as a relay; no player is added."""
+    network_manager.register_client(websocket)
+    spectators.add(websocket)
+    try:
+        welcome_msg = create_welcome_message(None, game_state.world_width, game_state.world_height)
+        await network_manager.send_message(websocket, encode_message(welcome_msg))
+        await send_sync(websocket)
+        
+        # Inputs are ignored; only sync requests are answered
+        await handle_client_message(websocket, None)
+    finally:
+        network_manager.unregister_client(websocket)
+        spectators.discard(websocket)
+
+
+async def handle_room_client(websocket, path: str) -> None:
+    """Play a client in the room its path names."""
+    room = room_manager.room(parse_room_path(path))
+    if room is None:
+        await websocket.close(1013, "No room available")
+        return
+    player_id = f"player_{secrets.token_hex(6)}"
+    print(f"Player {player_id} joined room {room.room_id}")
+    # The room counts the player from here on
+    websocket.release_slot()
+    await room.serve(websocket, player_id, create_rate_limiter())
+    print(f"Player {player_id} left room {room.room_id}")
+
+
 async def handle_client(websocket, path):
     """Handle a new client connection."""
-    player_id = f"player_{id(websocket)}"
+    if path.startswith("/spectate"):
+        await handle_spectator(websocket)
+        return
+    if path.startswith("/room/"):
+        await handle_room_client(websocket, path)
+        return
+    
+    resume_token = parse_resume_token(path)
+    player_id = resume_tokens.get(resume_token) if resume_token else None
+    if resume_token and player_id is None and region_map.partitioned:
+        player_id = await wait_for_resume(resume_token)
+    
+    if player_id is not None and player_id in game_state.players and player_id not in player_connections:
+        # Fast resume after a hot restart or region handoff: reclaim the
+        # existing player
+        awaiting_resume.pop(player_id, None)
+        print(f"Player {player_id} resumed")
+    else:
+        player_id = f"player_{secrets.token_hex(6)}"
+        resume_token = secrets.token_urlsafe(16)
+        resume_tokens[resume_token] = player_id
+        
+        # Add player to game
+        player = add_player(game_state, player_id, own_region.bounds)
+        event_log.emit(create_player_joined_event(player))
+        name = parse_player_name(path)
+        if name is not None and score_store is not None:
+            player_matches[player_id] = (name, time.time())
+        print(f"Player {player_id} connected")
     
     # Register client
     network_manager.register_client(websocket)
     player_connections[player_id] = websocket
+    websocket.release_slot()
     
-    # Add player to game
-    add_player(game_state, player_id)
+    # Offer the datagram transport for state and input
+    session = datagram_endpoint.open_session(player_id) if datagram_endpoint is not None else None
     
     # Send welcome message
-    welcome_msg = create_welcome_message(player_id)
+    welcome_msg = create_welcome_message(
+        player_id, game_state.world_width, game_state.world_height, resume_token,
+        DATAGRAM_PORT if session is not None else None, session.token if session is not None else None
+    )
     await network_manager.send_message(websocket, encode_message(welcome_msg))
-    
-    print(f"Player {player_id} connected")
+    await send_sync(websocket)
+    if player_id in player_matches:
+        # Read from disk in the background; the game starts meanwhile
+        asyncio.create_task(send_stats(websocket, player_matches[player_id][0]))
     
     try:
         # Handle client messages
@@ -80,55 +538,487 @@ async def handle_client(websocket, path):
     finally:
         # Cleanup on disconnect
         network_manager.unregister_client(websocket)
-        remove_player(game_state, player_id)
-        if player_id in player_connections:
+        if session is not None:
+            datagram_endpoint.close_session(session)
+        if player_connections.get(player_id) is websocket:
             del player_connections[player_id]
+            # During a hot restart the successor owns the player now
+            if not restarting:
+                player = game_state.players.get(player_id)
+                remove_player(game_state, player_id)
+                event_log.emit(create_player_left_event(player_id))
+                resume_tokens.pop(resume_token, None)
+                if pending_handoffs.pop(player_id, None) is not None:
+                    # The neighbour we were handing them to records the match
+                    player_matches.pop(player_id, None)
+                elif player is not None:
+                    await finish_match(player_id, player.score)
         print(f"Player {player_id} disconnected")
 
 
+def expire_abandoned_players(current_time: float) -> None:
+    """Remove restored players whose client never resumed."""
+    for player_id, deadline in list(awaiting_resume.items()):
+        if current_time >= deadline:
+            del awaiting_resume[player_id]
+            player = game_state.players.get(player_id)
+            if player is not None:
+                asyncio.create_task(finish_match(player_id, player.score))
+            remove_player(game_state, player_id)
+            event_log.emit(create_player_left_event(player_id))
+            for token, owner in list(resume_tokens.items()):
+                if owner == player_id:
+                    del resume_tokens[token]
+
+
+def token_for(player_id: str) -> Optional[str]:
+    """Resume token issued to a player, if any."""
+    return next((token for token, owner in resume_tokens.items() if owner == player_id), None)
+
+
+def hand_off_departed_players(current_time: float) -> None:
+    """
+    Offer players that left our region to the node that owns it now.
+    
+    They stay ours, and keep being simulated, until that node acknowledges
+    (see complete_handoff); an offer lost with a dropped link is sent again
+    after HANDOFF_TIMEOUT.
+    """
+    for player in list(game_state.players.values()):
+        target = region_map.owner(own_region, player.x, player.y, HANDOFF_HYSTERESIS)
+        link = peer_links.get(target.index)
+        if target is own_region or link is None:
+            continue
+        if pending_handoffs.get(player.id, 0.0) > current_time:
+            continue  # Waiting for the neighbour to acknowledge
+        
+        match = player_matches.get(player.id)
+        message = create_peer_handoff_message(player.to_record(), token_for(player.id), match and list(match))
+        if link.send(message):
+            pending_handoffs[player.id] = current_time + HANDOFF_TIMEOUT
+        # Otherwise the neighbour is unreachable; keep simulating the player here
+
+
+def complete_handoff(region_index: int, message: dict) -> None:
+    """A neighbour acknowledged taking over a player: let go of them and redirect their client."""
+    if message.get("type") != "peer_handoff_ack":
+        return
+    player_id = message.get("player_id")
+    if not isinstance(player_id, str) or pending_handoffs.pop(player_id, None) is None:
+        return  # Already completed, or the player left meanwhile
+    target = region_map.regions[region_index]
+    resume_token = token_for(player_id)
+    player_matches.pop(player_id, None)  # The match goes on over there
+    
+    remove_player(game_state, player_id)
+    event_log.emit(create_player_left_event(player_id))
+    resume_tokens.pop(resume_token, None)
+    awaiting_resume.pop(player_id, None)
+    
+    websocket = player_connections.pop(player_id, None)
+    if websocket is not None:
+        network_manager.unregister_client(websocket)
+        redirect = create_redirect_message(target.url, resume_token)
+        asyncio.create_task(network_manager.send_message(websocket, encode_message(redirect)))
+    print(f"Player {player_id} handed off to region {target.index}")
+
+
+def exchange_ghosts(view, current_time: float) -> List[dict]:
+    """
+    Mirror our border entities to neighbours, and collect the ghosts they
+    mirrored to us for the state we broadcast.
+    
+    Ghosts' static fields go out as a ghost_manifest event when they change,
+    so only ghost players' positions are returned for the state message.
+    """
+    for index, link in peer_links.items():
+        margin = GHOST_MARGIN * overload.policy.interest_scale
+        players, coins = ghosts_for(view, region_map.regions[index], margin)
+        link.send(create_peer_ghosts_message(REGION_INDEX, players, coins))
+    
+    ghost_players: List[dict] = []
+    ghost_coins: List[dict] = []
+    for index, ghost_set in list(ghosts.items()):
+        if current_time - ghost_set["received"] > GHOST_TIMEOUT:
+            del ghosts[index]
+            continue
+        ghost_players.extend(ghost_set["players"])
+        ghost_coins.extend(ghost_set["coins"])
+    
+    players, coins, removed_players, removed_coins = ghost_manifests.update(ghost_players, ghost_coins)
+    if players or coins or removed_players or removed_coins:
+        event_log.emit(create_ghost_manifest_event(players, coins, removed_players, removed_coins))
+    return [{"id": p["id"], "x": p["x"], "y": p["y"], "vx": p["vx"], "vy": p["vy"]} for p in ghost_players]
+
+
+def resolve_ghost_coin_collisions() -> None:
+    """Let neighbours' ghost players collect our coins and credit their nodes."""
+    for index, ghost_set in ghosts.items():
+        link = peer_links.get(index)
+        for player_id, coin_id, value in resolve_ghost_collisions(game_state, ghost_set["players"]):
+            coin_timers.forget(coin_id)
+            event_log.emit(create_coin_collected_event(coin_id, player_id))
+            if link is not None:
+                link.send(create_peer_score_message(player_id, value))
+
+
+def place_coin() -> None:
+    """Spawn a coin in our region (near players if cells sleep) and schedule its despawn."""
+    bounds = own_region.bounds
+    if sleep_grid is not None:
+        bounds = sleep_grid.spawn_bounds(own_region.bounds)
+        if bounds is None:
+            return  # Nobody around to collect it
+    coin_timers.place(game_state, bounds)
+
+
+def update_sleeping_cells(current_time: float) -> None:
+    """
+    Put cells nobody is near to sleep, wake those players approach, and
+    despawn sleeping coins whose time is up.
+    """
+    points = [(player.x, player.y) for player in game_state.players.values()]
+    for ghost_set in ghosts.values():
+        # Neighbours' players can collect our coins too
+        points.extend((ghost["x"], ghost["y"]) for ghost in ghost_set["players"])
+    
+    for coin_id in sleep_grid.expire(game_state, current_time):
+        event_log.emit(create_coin_despawned_event(coin_id))
+    woken, slept = sleep_grid.update(points)
+    sleep_grid.put_to_sleep(game_state, slept, coin_timers.pause, current_time)
+    for coin, ttl in sleep_grid.wake_up(game_state, woken, current_time):
+        coin_timers.resume(game_state, coin, ttl)
+
+
+def spawn_coin_wave() -> None:
+    """Top our region up with a wave of coins, unless overloaded."""
+    if overload.policy.spawn_coins:
+        # Sleeping coins count too, or they would pile up far from players
+        coins = len(game_state.coins) + (sleep_grid.dormant_count() if sleep_grid is not None else 0)
+        for _ in range(coin_timers.wave_count(coins)):
+            place_coin()
+
+
+async def broadcast_state(encoding: asyncio.Future) -> None:
+    """Broadcast a state message once its worker has encoded it."""
+    network_manager.publish_state(await encoding)
+
+
+def pack_snapshots(players, parts, datagram_header: str, viewers, sessions, interest_scale: float) -> tuple:
+    """Pack the budgeted WebSocket messages and the datagrams of a tick."""
+    messages = {}
+    if SNAPSHOT_BUDGET > 0:
+        messages = snapshot_packer.pack(players, parts.header, parts.fragments, viewers, interest_scale)
+    packets = {}
+    if datagram_endpoint is not None:
+        packets = datagram_packer.pack(players, datagram_header, parts.fragments, sessions, interest_scale)
+    return messages, packets
+
+
+async def broadcast_state_parts(encoding: asyncio.Future, view, tick: int) -> None:
+    """
+    Broadcast a state encoded in parts, once its worker is done.
+    
+    Players on the datagram transport get their players in a datagram packed
+    to the MTU, and only the rest of the message (events, ghosts) over their
+    WebSocket. Under a snapshot budget other players get a message packed to
+    the budget. Spectators get the whole state. Packing runs on the
+    encoder's packing thread, off the event loop.
+    """
+    parts = await encoding
+    bound = datagram_endpoint.bound_sessions() if datagram_endpoint is not None else {}
+    viewers = {}
+    if SNAPSHOT_BUDGET > 0:
+        viewers = {
+            websocket: player_id for player_id, websocket in player_connections.items() if player_id not in bound
+        }
+    sessions = {session: player_id for player_id, session in bound.items()}
+    header = encode_message(create_datagram_state_header(view.timestamp, tick)) if bound else ""
+    messages, packets = await state_encoder.pack(
+        pack_snapshots, view.players, parts, header, viewers, sessions, overload.policy.interest_scale
+    )
+    
+    if bound:
+        for session, packet in packets.items():
+            datagram_endpoint.send(session, packet)
+        for player_id in bound:
+            websocket = player_connections.get(player_id)
+            if websocket is not None:
+                messages[websocket] = parts.header
+    
+    network_manager.publish_state(parts.full, messages)
+
+
 async def game_loop():
     """Main game loop that updates game state and broadcasts to clients."""
     last_time = time.time()
-    last_coin_spawn = time.time()
+    tick_budget = 1.0 / TICK_RATE
+    broadcasting: Optional[asyncio.Task] = None
+    encode_parts = SNAPSHOT_BUDGET > 0 or datagram_endpoint is not None
+    tick = 0
     
-    while True:
+    while ticking:
+        tick += 1
+        tick_start = time.perf_counter()
+        gc_control.start_tick()
         current_time = time.time()
         delta_time = current_time - last_time
         last_time = current_time
         
+        # Traced inputs that arrived since the last tick are simulated by this one
+        input_tracer.tick(current_time)
+        
         # Update game state
-        update_player_positions(game_state, delta_time)
-        resolve_coin_collisions(game_state)
+        starts = update_player_positions(game_state, delta_time)
+        if region_map.partitioned:
+            hand_off_departed_players(current_time)
+        if sleep_grid is not None:
+            update_sleeping_cells(current_time)
+        for player_id, _ in coin_timers.collect(game_state, starts):
+            note_score(player_id, game_state.players[player_id].score)
+        if ghosts:
+            resolve_ghost_coin_collisions()
         
-        # Spawn coins periodically
-        if current_time - last_coin_spawn >= COIN_SPAWN_INTERVAL:
-            spawn_coin(game_state)
-            last_coin_spawn = current_time
+        # Fire due timers: coin waves and despawns
+        scheduler.advance(current_time)
+        
+        if awaiting_resume:
+            expire_abandoned_players(current_time)
         
         # Update timestamp
         game_state.timestamp = current_time
         
-        # Broadcast state to all clients
-        state_message = create_state_message(game_state)
-        await network_manager.broadcast_message(encode_message(state_message))
+        # Under load only every Nth tick is broadcast; events wait for the
+        # next broadcast
+        if overload.should_send():
+            # Hand an immutable view and the pending events to the encoder;
+            # they are serialized while we simulate the next tick
+            view = game_state.view()
+            ghost_players = []
+            if region_map.partitioned:
+                ghost_players = exchange_ghosts(view, current_time)
+            encoding = state_encoder.submit(
+                view, event_log.seq, event_log.drain(), ghost_players, [], input_tracer.drain(),
+                parts=encode_parts
+            )
+            
+            # The previous tick's state must be published first, so states
+            # reach the clients' outboxes in tick order; an encoder falling
+            # behind holds up the loop instead of piling up encodings
+            if broadcasting is not None:
+                await broadcasting
+            if encode_parts:
+                broadcasting = asyncio.create_task(broadcast_state_parts(encoding, view, tick))
+            else:
+                broadcasting = asyncio.create_task(broadcast_state(encoding))
         
-        # Sleep to maintain tick rate
-        await asyncio.sleep(1.0 / TICK_RATE)
+        # Tick time includes waiting for the previous tick's encoding
+        elapsed = time.perf_counter() - tick_start
+        if overload.record(elapsed) is not None:
+            print(f"Overload: {overload.status()}")
+        
+        # Collect garbage in the slack rather than mid-tick, then sleep out
+        # the rest of the tick
+        if gc_control.collect_in_slack(tick_budget - elapsed) is not None:
+            elapsed = time.perf_counter() - tick_start
+        await asyncio.sleep(max(0.0, tick_budget - elapsed))
+
+
+def create_handoff_payload() -> dict:
+    """Capture everything a successor needs to continue this game."""
+    coin_ttls = coin_timers.remaining()
+    if sleep_grid is not None:
+        coin_ttls.update(sleep_grid.dormant_ttls())
+    return {
+        "state": game_state.to_snapshot(),
+        "resume_tokens": resume_tokens,
+        "next_coin_wave": coin_timers.next_wave(),
+        "coin_ttls": coin_ttls,
+        "player_matches": player_matches
+    }
+
+
+def restore_from_handoff(payload: dict) -> None:
+    """Adopt the game handed over by a predecessor process."""
+    global game_state
+    game_state = GameState.from_snapshot(payload["state"])
+    resume_tokens.update(payload["resume_tokens"])
+    for player_id, match in payload.get("player_matches", {}).items():
+        player_matches[player_id] = tuple(match)
+    
+    # Carry coin timers over; coins from a build without TTLs get a fresh one
+    coin_timers.schedule_waves(spawn_coin_wave, payload.get("next_coin_wave", COIN_SPAWN_INTERVAL))
+    coin_ttls = payload.get("coin_ttls", {})
+    for coin in game_state.coins:
+        coin_timers.resume(game_state, coin, coin_ttls.get(coin.id, COIN_TTL))
+    
+    # Every player's client has to reconnect to us
+    deadline = time.time() + RESUME_GRACE
+    for player_id in game_state.players:
+        awaiting_resume[player_id] = deadline
+
+
+async def hot_restart(server, stop: asyncio.Event) -> None:
+    """Hand the listening socket and live state over to a new process."""
+    global ticking, restarting
+    if restarting:
+        return
+    restarting = True
+    loop = asyncio.get_running_loop()
+    
+    print("Hot restart: starting successor")
+    unix_server = listen_for_successor(HOT_RESTART_PATH)
+    unix_server.setblocking(False)
+    successor = spawn_successor(HOT_RESTART_PATH)
+    
+    try:
+        conn, _ = await asyncio.wait_for(loop.sock_accept(unix_server), timeout=30.0)
+    except asyncio.TimeoutError:
+        print("Hot restart aborted: successor did not connect")
+        successor.kill()
+        unix_server.close()
+        restarting = False
+        return
+    
+    # Stop accepting before the state is captured, or players who joined us
+    # after it would be lost. Duplicates keep the listening sockets open for
+    # the successor, and connections wait in their backlog meanwhile.
+    handoff_sockets = {"listen": listen_socket.dup()}
+    server.server.close()
+    if peer_server is not None:
+        handoff_sockets["peer"] = peer_socket.dup()
+        peer_server.server.close()
+    
+    # Stop simulating; the successor continues from exactly this state
+    ticking = False
+    state = create_handoff_payload()
+    fds = [handoff_socket.fileno() for handoff_socket in handoff_sockets.values()]
+    state["sockets"] = list(handoff_sockets)
+    if datagram_endpoint is not None:
+        fds.append(datagram_endpoint.transport.get_extra_info("socket").fileno())
+        state["sockets"].append("datagram")
+    payload = encode_handoff(state)
+    conn.setblocking(True)
+    try:
+        await loop.run_in_executor(None, send_handoff, conn, fds, payload)
+    finally:
+        conn.close()
+        for handoff_socket in handoff_sockets.values():
+            handoff_socket.close()
+        unix_server.close()
+        os.unlink(HOT_RESTART_PATH)
+    print(f"Hot restart: handed off {len(game_state.players)} players to pid {successor.pid}")
+    
+    # Point clients at the successor, then close their connections to us
+    if datagram_endpoint is not None:
+        datagram_endpoint.transport.close()
+    await network_manager.broadcast_message(encode_message(create_restart_message()))
+    server.close()
+    await server.wait_closed()
+    if peer_server is not None:
+        # Neighbours' links reconnect to the successor
+        peer_server.close()
+        await peer_server.wait_closed()
+    stop.set()
+
+
+listen_socket: Optional[socket.socket] = None
+peer_socket: Optional[socket.socket] = None
+peer_server = None  # Serves neighbouring nodes on peer_socket
+
+
+async def open_datagram_endpoint(inherited: Optional[socket.socket] = None) -> None:
+    """Serve the datagram transport, on a socket inherited from a predecessor if given."""
+    global datagram_endpoint
+    datagram_socket = inherited
+    if datagram_socket is None:
+        # Same address family and host as the WebSocket listener
+        datagram_socket = socket.socket(listen_socket.family, socket.SOCK_DGRAM)
+        datagram_socket.bind((listen_socket.getsockname()[0], DATAGRAM_PORT))
+    datagram_endpoint = DatagramEndpoint(apply_input, admission_stats, create_rate_limiter, ARTIFICIAL_LATENCY)
+    await asyncio.get_running_loop().create_datagram_endpoint(lambda: datagram_endpoint, sock=datagram_socket)
+    print(f"Serving state datagrams on port {DATAGRAM_PORT}")
 
 
 async def main():
     """Start the game server."""
-    # Spawn a few initial coins
-    for _ in range(5):
-        spawn_coin(game_state)
+    global listen_socket, peer_socket, peer_server, score_store
+    
+    # Catch the wheel up with the time spent starting, before scheduling
+    scheduler.advance(time.time())
+    
+    native = [name for name, compiled in compiled_modules().items() if compiled]
+    if native:
+        print(f"Using compiled modules: {', '.join(native)}")
+    
+    if region_map.partitioned:
+        missing = [region.index for region in region_map.neighbours(own_region, GHOST_MARGIN) if not region.peer_url]
+        if not PEER_PORT or not PEER_SECRET or missing:
+            sys.exit("Partitioned nodes need PEER_PORT, PEER_SECRET and a REGION_PEERS URL for every neighbour")
+    
+    inherited: Dict[str, socket.socket] = {}
+    if HOT_RESTART_SOCKET:
+        # Take over the sockets and game from the process we replace
+        sockets, payload = connect_to_predecessor(HOT_RESTART_SOCKET)
+        inherited = dict(zip(payload.get("sockets", ["listen", "datagram"]), sockets))
+        listen_socket = inherited["listen"]
+        restore_from_handoff(payload)
+        print(f"Resumed hot-restarted game with {len(game_state.players)} players")
+    else:
+        listen_socket = socket.create_server((SERVER_HOST, SERVER_PORT))
+        
+        # Spawn a few initial coins
+        for _ in range(5):
+            place_coin()
+        coin_timers.schedule_waves(spawn_coin_wave)
+    
+    if DATAGRAM_PORT:
+        await open_datagram_endpoint(inherited.get("datagram"))
+    if STATS_DB:
+        score_store = ScoreStore(STATS_DB, STATS_FLUSH_MS / 1000.0, STATS_MAX_PENDING)
+        await score_store.open()
+    
+    # Serve the nodes owning neighbouring regions, and connect to them
+    if region_map.partitioned:
+        print(f"Owning region {REGION_INDEX} of {len(region_map.regions)}: {own_region.bounds}")
+        peer_socket = inherited.get("peer") or socket.create_server((PEER_HOST, PEER_PORT))
+        # Peer links carry whole ghost sets
+        peer_server = await websockets.serve(
+            handle_peer, sock=peer_socket, process_request=authenticate_peer, max_size=PEER_MAX_MESSAGE_SIZE
+        )
+        print(f"Serving peers on {PEER_HOST}:{PEER_PORT}")
+        for neighbour in region_map.neighbours(own_region, GHOST_MARGIN):
+            peer_links[neighbour.index] = PeerLink(
+                neighbour.peer_url, PEER_SECRET, partial(complete_handoff, neighbour.index)
+            )
+            asyncio.create_task(peer_links[neighbour.index].run())
+    
+    if GC_FREEZE:
+        print(f"Froze {gc_control.freeze()} startup objects out of garbage collection")
     
-    # Start game loop
+    # Start game loop, and the rooms' shared one
     game_task = asyncio.create_task(game_loop())
+    if room_manager is not None:
+        asyncio.create_task(room_manager.run())
     
     # Start WebSocket server
     print(f"Starting server on {SERVER_HOST}:{SERVER_PORT}")
-    async with websockets.serve(handle_client, SERVER_HOST, SERVER_PORT):
-        await asyncio.Future()  # Run forever
+    stop = asyncio.Event()
+    asyncio.create_task(report_admission_stats())
+    async with websockets.serve(
+        handle_client,
+        sock=listen_socket,
+        create_protocol=AdmittingProtocol,
+        max_size=MAX_MESSAGE_SIZE
+    ) as server:
+        # SIGUSR2 triggers a zero-downtime restart into the current build
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGUSR2, lambda: asyncio.create_task(hot_restart(server, stop))
+        )
+        await stop.wait()
+    state_encoder.shutdown()
+    if score_store is not None:
+        await score_store.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,92 @@
+"""
+Optional native build of the server's hot modules.
+
+game_logic, game_state and protocol are fully type-annotated so mypyc can
+compile them to C extensions:
+
+    pip install mypy
+    python -m server.native build
+    python -m server.native status
+    python -m server.native clean
+
+Python imports a module's extension in preference to its source, so once
+built the compiled modules are used everywhere without any other change,
+and an unbuilt or cleaned tree transparently runs the pure Python sources.
+Rebuild after editing any of the modules, or the stale extension wins.
+"""
+import glob
+import importlib
+import os
+import shutil
+import sys
+from importlib.machinery import EXTENSION_SUFFIXES
+from typing import Dict, List
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOT_MODULES = ("server.game_logic", "server.game_state", "server.protocol")
+
+
+def source_paths() -> List[str]:
+    """Source files of the hot modules, relative to the repository root."""
+    return [name.replace(".", "/") + ".py" for name in HOT_MODULES]
+
+
+def compiled_modules() -> Dict[str, bool]:
+    """Whether each hot module was imported from a compiled extension."""
+    status = {}
+    for name in HOT_MODULES:
+        module = importlib.import_module(name)
+        path = getattr(module, "__file__", None) or ""
+        status[name] = any(path.endswith(suffix) for suffix in EXTENSION_SUFFIXES)
+    return status
+
+
+def build() -> None:
+    """Compile the hot modules in place with mypyc."""
+    try:
+        from mypyc.build import mypycify
+    except ImportError:
+        sys.exit("mypyc is not installed (pip install mypy)")
+    from setuptools import setup
+    
+    os.chdir(ROOT)
+    setup(
+        name="krafton-native",
+        # The packages have no __init__.py, so module names come from paths
+        ext_modules=mypycify(["--explicit-package-bases", *source_paths()], opt_level="3"),
+        script_args=["build_ext", "--inplace"]
+    )
+
+
+def clean() -> None:
+    """Remove built extensions, falling back to the pure Python modules."""
+    os.chdir(ROOT)
+    removed = []
+    patterns = [name.replace(".", "/") + "*" + suffix for name in HOT_MODULES for suffix in EXTENSION_SUFFIXES]
+    patterns.extend("*__mypyc*" + suffix for suffix in EXTENSION_SUFFIXES)
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            os.remove(path)
+            removed.append(path)
+    shutil.rmtree("build", ignore_errors=True)
+    for path in removed:
+        print(f"Removed {path}")
+
+
+def main() -> None:
+    """Command-line entry point."""
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    if command == "build":
+        build()
+    elif command == "clean":
+        clean()
+    elif command == "status":
+        for name, compiled in compiled_modules().items():
+            print(f"{name}: {'compiled' if compiled else 'pure Python'}")
+    else:
+        sys.exit("usage: python -m server.native [build|clean|status]")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
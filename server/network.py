@@ -1,7 +1,9 @@
 import asyncio
 import websockets
-from typing import Set
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set
 from websockets.server import WebSocketServerProtocol
+from server.admission import ClientRateLimiter
+from server.protocol import decode_message
 
 
 class NetworkManager:
@@ -10,6 +12,11 @@ class NetworkManager:
     def __init__(self, artificial_latency: float = 0.2):
         self.clients: Set[WebSocketServerProtocol] = set()
         self.artificial_latency = artificial_latency
+        # Newest unsent state per client, and the task sending it
+        self._outbox: Dict[WebSocketServerProtocol, str] = {}
+        self._senders: Dict[WebSocketServerProtocol, asyncio.Task] = {}
+        self._delayed: Set[asyncio.Task] = set()
+        self.skipped_states = 0
     
     def register_client(self, websocket: WebSocketServerProtocol) -> None:
         """Register a new client connection."""
@@ -18,6 +25,7 @@ class NetworkManager:
     def unregister_client(self, websocket: WebSocketServerProtocol) -> None:
         """Unregister a client connection."""
         self.clients.discard(websocket)
+        self._outbox.pop(websocket, None)
     
     async def send_message(self, websocket: WebSocketServerProtocol, message: str) -> None:
         """Send a message to a specific client with artificial latency."""
@@ -28,8 +36,15 @@ class NetworkManager:
         except websockets.exceptions.ConnectionClosed:
             pass
     
-    async def broadcast_message(self, message: str) -> None:
-        """Broadcast a message to all connected clients with artificial latency."""
+    async def broadcast_message(
+        self,
+        message: str,
+        overrides: Optional[Dict[WebSocketServerProtocol, str]] = None
+    ) -> None:
+        """
+        Broadcast a message to all connected clients with artificial latency.
+        Clients in overrides are sent their own message instead.
+        """
         if self.clients:
             # Simulate network latency before broadcasting
             await asyncio.sleep(self.artificial_latency)
@@ -37,10 +52,53 @@ class NetworkManager:
             # Send to all clients
             tasks = []
             for websocket in self.clients.copy():
-                tasks.append(self._send_without_latency(websocket, message))
+                own = overrides.get(websocket, message) if overrides else message
+                tasks.append(self._send_without_latency(websocket, own))
             
             await asyncio.gather(*tasks, return_exceptions=True)
     
+    def publish_state(
+        self,
+        message: str,
+        overrides: Optional[Dict[WebSocketServerProtocol, str]] = None
+    ) -> None:
+        """
+        Queue a state message for all clients without waiting for it.
+        Clients in overrides are sent their own message instead.
+        
+        Each client only holds its newest unsent state: one still busy
+        sending an earlier state skips to the newest, and the seq gap makes
+        it ask for a sync. A slow client therefore never holds up the tick or
+        the other clients, and never piles up states in memory.
+        """
+        task = asyncio.create_task(self._publish_after_latency(message, overrides))
+        self._delayed.add(task)
+        task.add_done_callback(self._delayed.discard)
+    
+    async def _publish_after_latency(
+        self,
+        message: str,
+        overrides: Optional[Dict[WebSocketServerProtocol, str]]
+    ) -> None:
+        """Simulate latency, then put the state in every client's outbox."""
+        await asyncio.sleep(self.artificial_latency)
+        for websocket in self.clients.copy():
+            if websocket in self._outbox:
+                self.skipped_states += 1
+            self._outbox[websocket] = overrides.get(websocket, message) if overrides else message
+            if websocket not in self._senders:
+                self._senders[websocket] = asyncio.create_task(self._send_outbox(websocket))
+    
+    async def _send_outbox(self, websocket: WebSocketServerProtocol) -> None:
+        """Send a client's newest state until its outbox is empty."""
+        try:
+            while websocket in self._outbox:
+                await websocket.send(self._outbox.pop(websocket))
+        except websockets.exceptions.ConnectionClosed:
+            self.unregister_client(websocket)
+        finally:
+            del self._senders[websocket]
+    
     async def _send_without_latency(self, websocket: WebSocketServerProtocol, message: str) -> None:
         """Internal method to send without additional latency."""
         try:
@@ -48,9 +106,57 @@ class NetworkManager:
         except websockets.exceptions.ConnectionClosed:
             self.unregister_client(websocket)
     
-    async def receive_message(self, websocket: WebSocketServerProtocol) -> str:
-        """Receive a message from a client with artificial latency."""
+    async def receive_message(
+        self,
+        websocket: WebSocketServerProtocol,
+        admit: Optional[Callable[[str], bool]] = None
+    ) -> Optional[str]:
+        """
+        Receive a message from a client with artificial latency.
+        
+        If admit rejects the raw message it is dropped immediately and None
+        is returned, so throttled traffic never pays for latency or decoding.
+        """
         message = await websocket.recv()
+        if admit is not None and not admit(message):
+            return None
         # Simulate network latency on receive
         await asyncio.sleep(self.artificial_latency)
-        return message
\ No newline at end of file
+        return message
+    
+    async def client_messages(
+        self,
+        websocket: WebSocketServerProtocol,
+        limiter: ClientRateLimiter
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield a client's decoded messages until it disconnects.
+        
+        Messages the limiter rejects are dropped undecoded, and a client that
+        keeps flooding is disconnected.
+        """
+        try:
+            while True:
+                message_str = await self.receive_message(websocket, limiter.allow)
+                if message_str is None:
+                    # Throttled or oversized: dropped without decoding
+                    if limiter.abusive:
+                        # Drop the connection outright: a close handshake would
+                        # have to wait behind everything the client queued
+                        limiter.stats.kicked_clients += 1
+                        self.unregister_client(websocket)
+                        websocket.fail_connection(1008, "Rate limit exceeded")
+                        return
+                    # recv() doesn't yield while messages are buffered, so a
+                    # flooding client would otherwise starve the event loop
+                    await asyncio.sleep(0)
+                    continue
+                
+                try:
+                    message = decode_message(message_str)
+                except ValueError:
+                    limiter.stats.decode_errors += 1
+                    continue
+                yield message
+        except websockets.exceptions.ConnectionClosed:
+            pass
\ No newline at end of file
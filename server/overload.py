@@ -0,0 +1,98 @@
+"""
+Tick-budget overload control.
+
+The controller compares how long each tick's work took with the tick budget
+and, when the server keeps running over, steps up through degradation
+levels that shed work in order of how little players notice it: fewer
+snapshots, a smaller interest radius (for mirrored entities and budgeted
+snapshots), no coin spawns and finally no new joins. Levels change one step
+at a time, and only after load has stayed past a threshold for a while, with
+a lower threshold for recovery than for escalation, so the server doesn't
+flap between levels.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class Degradation:
+    """What a degradation level sheds."""
+    name: str
+    send_interval: int = 1  # Broadcast state every Nth tick
+    interest_scale: float = 1.0  # Multiplier for the ghost margin and snapshot priority falloff
+    spawn_coins: bool = True
+    accept_joins: bool = True
+
+
+LEVELS = (
+    Degradation("normal"),
+    Degradation("reduced-snapshots", send_interval=2),
+    Degradation("reduced-interest", send_interval=2, interest_scale=0.5),
+    Degradation("no-spawns", send_interval=3, interest_scale=0.5, spawn_coins=False),
+    Degradation("no-joins", send_interval=3, interest_scale=0.5, spawn_coins=False, accept_joins=False),
+)
+
+
+class OverloadController:
+    """Tracks tick load and picks a degradation level with hysteresis."""
+    
+    def __init__(
+        self,
+        budget: float,
+        high: float = 0.9,
+        low: float = 0.5,
+        escalate_ticks: int = 15,
+        recover_ticks: int = 90,
+        smoothing: float = 0.05
+    ):
+        self.budget = budget
+        self.high = high
+        self.low = low
+        self.escalate_ticks = escalate_ticks
+        self.recover_ticks = recover_ticks
+        self.smoothing = smoothing
+        
+        self.level = 0
+        self.load = 0.0  # Smoothed tick duration as a fraction of budget
+        self._over = 0
+        self._under = 0
+        self._tick = 0
+    
+    @property
+    def policy(self) -> Degradation:
+        """Shedding policy of the current level."""
+        return LEVELS[self.level]
+    
+    def record(self, duration: float) -> Optional[int]:
+        """Record one tick's duration; returns the new level if it changed."""
+        self._tick += 1
+        self.load += self.smoothing * (duration / self.budget - self.load)
+        
+        if self.load > self.high:
+            self._over += 1
+            self._under = 0
+        elif self.load < self.low:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = self._under = 0
+        
+        if self._over >= self.escalate_ticks and self.level < len(LEVELS) - 1:
+            return self._set_level(self.level + 1)
+        if self._under >= self.recover_ticks and self.level > 0:
+            return self._set_level(self.level - 1)
+        return None
+    
+    def should_send(self) -> bool:
+        """True if this tick's state should be broadcast at the current level."""
+        return self._tick % self.policy.send_interval == 0
+    
+    def status(self) -> dict:
+        """Current level and load, for monitoring."""
+        return {"level": self.level, "policy": self.policy.name, "load": round(self.load, 3)}
+    
+    def _set_level(self, level: int) -> int:
+        """Move to a level and restart the dwell counters."""
+        self.level = level
+        self._over = self._under = 0
+        return level
\ No newline at end of file
@@ -0,0 +1,203 @@
+"""
+Spatial partitioning of the world across several server nodes.
+
+The world rectangle is split into a grid of regions, each owned by one
+server process. A node simulates only the players and coins inside its own
+region; entities near a border are mirrored to neighbours as read-only
+ghosts so collisions and visibility stay correct across the seam.
+
+Clients get a ghost's static fields (color, radius and score for players,
+everything for coins) once, in a ghost_manifest event, when it appears or
+changes; state messages then only carry ghost players' positions.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from server.game_state import GameState, StateView, PLAYER_VIEW_FIELDS, COIN_VIEW_FIELDS
+from server.game_logic import check_collision
+
+
+@dataclass
+class Region:
+    """A rectangular part of the world owned by one server node."""
+    index: int
+    left: float
+    top: float
+    right: float
+    bottom: float
+    url: str = ""  # Where clients connect
+    peer_url: str = ""  # Where neighbouring nodes connect
+    
+    def contains(self, x: float, y: float, margin: float = 0.0) -> bool:
+        """Check if a point lies inside the region grown by margin."""
+        return (
+            self.left - margin <= x < self.right + margin and
+            self.top - margin <= y < self.bottom + margin
+        )
+    
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """(left, top, right, bottom) of the region."""
+        return (self.left, self.top, self.right, self.bottom)
+
+
+class RegionMap:
+    """Grid of regions covering the world, in row-major order."""
+    
+    def __init__(
+        self,
+        world_width: float,
+        world_height: float,
+        cols: int = 1,
+        rows: int = 1,
+        urls: Optional[List[str]] = None,
+        peer_urls: Optional[List[str]] = None
+    ):
+        self.world_width = world_width
+        self.world_height = world_height
+        self.cols = cols
+        self.rows = rows
+        
+        urls = urls or []
+        peer_urls = peer_urls or []
+        cell_width = world_width / cols
+        cell_height = world_height / rows
+        self.regions = [
+            Region(
+                index=row * cols + col,
+                left=col * cell_width,
+                top=row * cell_height,
+                right=(col + 1) * cell_width,
+                bottom=(row + 1) * cell_height,
+                url=urls[row * cols + col] if row * cols + col < len(urls) else "",
+                peer_url=peer_urls[row * cols + col] if row * cols + col < len(peer_urls) else ""
+            )
+            for row in range(rows)
+            for col in range(cols)
+        ]
+    
+    @classmethod
+    def from_config(
+        cls, world_width: float, world_height: float, grid: str, urls: str, peer_urls: str = ""
+    ) -> 'RegionMap':
+        """Build from REGION_GRID ('2x1'), REGION_NODES and REGION_PEERS (comma-separated URLs)."""
+        cols, rows = (int(v) for v in grid.lower().split("x"))
+        node_urls = [url.strip() for url in urls.split(",") if url.strip()]
+        node_peer_urls = [url.strip() for url in peer_urls.split(",") if url.strip()]
+        return cls(world_width, world_height, cols, rows, node_urls, node_peer_urls)
+    
+    @property
+    def partitioned(self) -> bool:
+        """True if the world is split across more than one node."""
+        return len(self.regions) > 1
+    
+    def region_at(self, x: float, y: float) -> Region:
+        """Region owning a world position; positions outside are clamped."""
+        col = min(self.cols - 1, max(0, int(x / self.world_width * self.cols)))
+        row = min(self.rows - 1, max(0, int(y / self.world_height * self.rows)))
+        return self.regions[row * self.cols + col]
+    
+    def owner(self, current: Region, x: float, y: float, hysteresis: float = 0.0) -> Region:
+        """
+        Region that should own an entity currently owned by current.
+        
+        The entity stays put until it is more than hysteresis past the
+        border, so a player hovering on a seam is not handed back and forth.
+        """
+        if current.contains(x, y, hysteresis):
+            return current
+        return self.region_at(x, y)
+    
+    def neighbours(self, region: Region, margin: float) -> List[Region]:
+        """Other regions within margin of region."""
+        return [
+            other for other in self.regions
+            if other.index != region.index and
+            other.left - margin < region.right and region.left < other.right + margin and
+            other.top - margin < region.bottom and region.top < other.bottom + margin
+        ]
+
+
+def ghosts_for(view: StateView, neighbour: Region, margin: float) -> Tuple[List[dict], List[dict]]:
+    """
+    Players and coins a neighbour should mirror as ghosts.
+    
+    Returns the (players, coins) of the view within margin of the
+    neighbour's region, as state message dictionaries.
+    """
+    players = [
+        dict(zip(PLAYER_VIEW_FIELDS, p)) for p in view.players
+        if neighbour.contains(p[1], p[2], margin)
+    ]
+    coins = [
+        dict(zip(COIN_VIEW_FIELDS, c)) for c in view.coins
+        if neighbour.contains(c[1], c[2], margin)
+    ]
+    return players, coins
+
+
+def resolve_ghost_collisions(game_state: GameState, ghost_players: List[dict]) -> List[Tuple[str, str, int]]:
+    """
+    Let ghost players collect coins owned by this node.
+    
+    Collected coins are removed here, the owning node of each coin being the
+    only one allowed to decide its fate. Returns (player_id, coin_id, value)
+    credits to forward to the ghosts' own nodes.
+    """
+    credits = []
+    coins_to_remove = []
+    
+    for coin in game_state.coins:
+        for ghost in ghost_players:
+            if check_collision(ghost["x"], ghost["y"], ghost["radius"], coin.x, coin.y, coin.radius):
+                coins_to_remove.append(coin)
+                credits.append((ghost["id"], coin.id, coin.value))
+                break
+    
+    for coin in coins_to_remove:
+        game_state.coins.remove(coin)
+    
+    return credits
+
+
+class GhostManifests:
+    """The static fields of ghost entities, as last announced to clients."""
+    
+    def __init__(self):
+        self.players: Dict[str, Dict[str, Any]] = {}
+        self.coins: Dict[str, Dict[str, Any]] = {}
+    
+    def update(
+        self,
+        ghost_players: List[dict],
+        ghost_coins: List[dict]
+    ) -> Tuple[List[dict], List[dict], List[str], List[str]]:
+        """
+        Take the current ghosts and work out what clients need to be told.
+        
+        Returns the player and coin manifests that are new or changed, and
+        the ids of the players and coins that are no longer ghosts.
+        """
+        players = []
+        current = {}
+        for ghost in ghost_players:
+            manifest = {"id": ghost["id"], "color": ghost["color"], "radius": ghost["radius"], "score": ghost["score"]}
+            current[ghost["id"]] = manifest
+            if self.players.get(ghost["id"]) != manifest:
+                players.append(manifest)
+        removed_players = [player_id for player_id in self.players if player_id not in current]
+        self.players = current
+        
+        coins = []
+        current = {}
+        for coin in ghost_coins:
+            current[coin["id"]] = coin
+            if coin["id"] not in self.coins:
+                coins.append(coin)  # Coins never change
+        removed_coins = [coin_id for coin_id in self.coins if coin_id not in current]
+        self.coins = current
+        
+        return players, coins, removed_players, removed_coins
+    
+    def sync(self) -> Dict[str, List[dict]]:
+        """Every manifest, for a full-world sync."""
+        return {"players": list(self.players.values()), "coins": list(self.coins.values())}
\ No newline at end of file
@@ -0,0 +1,107 @@
+import asyncio
+import websockets
+from typing import Any, Callable, Dict, List, Optional
+from server.protocol import encode_message, decode_message
+
+
+class PeerLink:
+    """
+    Outbound connection to a neighbouring region's server node.
+    
+    Links authenticate with the nodes' shared secret. The peer answers on the
+    same connection (handoff acknowledgements), which is passed to
+    on_message.
+    """
+    
+    def __init__(
+        self,
+        url: str,
+        secret: str,
+        on_message: Optional[Callable[[Dict[str, Any]], None]] = None,
+        reconnect_delay: float = 1.0,
+        max_queue: int = 256
+    ):
+        self.url = url
+        self.headers = {"Authorization": f"Bearer {secret}"}
+        self.on_message = on_message
+        self.reconnect_delay = reconnect_delay
+        self.connected = False
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.dropped = 0
+        self._in_flight: Optional[Dict[str, Any]] = None
+    
+    def send(self, message: Dict[str, Any]) -> bool:
+        """
+        Queue a message for the peer without blocking.
+        Returns False (and drops the message) while the link is down or full.
+        """
+        if not self.connected:
+            return False
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        return True
+    
+    async def run(self) -> None:
+        """Keep the link connected and drain queued messages into it."""
+        while True:
+            try:
+                async with websockets.connect(self.url, extra_headers=self.headers) as websocket:
+                    self.connected = True
+                    print(f"Peer link to {self.url} up")
+                    # Either side failing takes the link down
+                    tasks = [
+                        asyncio.create_task(self._send_queued(websocket)),
+                        asyncio.create_task(self._receive(websocket))
+                    ]
+                    try:
+                        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        for task in tasks:
+                            task.cancel()
+                        await asyncio.gather(*tasks, return_exceptions=True)
+            except (OSError, websockets.exceptions.WebSocketException):
+                pass
+            
+            if self.connected:
+                print(f"Peer link to {self.url} down")
+            self.connected = False
+            self._requeue_unsent()
+            await asyncio.sleep(self.reconnect_delay)
+    
+    async def _send_queued(self, websocket) -> None:
+        """Send queued messages in order until the connection fails."""
+        while True:
+            message = await self.queue.get()
+            self._in_flight = message
+            await websocket.send(encode_message(message))
+            self._in_flight = None
+    
+    async def _receive(self, websocket) -> None:
+        """Pass the peer's replies on until the connection closes."""
+        async for message_str in websocket:
+            try:
+                message = decode_message(message_str)
+            except ValueError:
+                continue
+            if self.on_message is not None:
+                self.on_message(message)
+    
+    def _requeue_unsent(self) -> None:
+        """
+        Keep what the dead connection didn't deliver for the next one. Ghost
+        sets are dropped, as the next tick sends fresh ones.
+        """
+        unsent: List[Dict[str, Any]] = [self._in_flight] if self._in_flight is not None else []
+        self._in_flight = None
+        while not self.queue.empty():
+            unsent.append(self.queue.get_nowait())
+        for message in unsent:
+            if message.get("type") == "peer_ghosts":
+                continue
+            if self.queue.full():
+                self.dropped += 1
+            else:
+                self.queue.put_nowait(message)
\ No newline at end of file
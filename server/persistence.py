@@ -0,0 +1,254 @@
+"""
+Durable player stats and match results in SQLite.
+
+Players who connect with a name (?name=... on the connection path) get
+their live score, and each finished match, recorded in a local SQLite
+database in WAL mode. Names are not authenticated; they only pick which
+stats a player sees.
+
+None of the writing happens on the tick loop. The tick only notes each
+player's newest score in a dict, which overwrites older updates and so
+stays as small as the number of players. Finished matches go into a
+bounded queue. Every flush_interval a flusher task takes everything
+pending and writes it in one transaction on a dedicated writer thread, one
+batch at a time. When the disk falls behind, the queue fills up and
+record_result waits, so backpressure lands on the disconnecting client's
+handler rather than the tick. Stats of returning players are read on the
+same thread, so handlers never wait on the disk either.
+
+A batch that fails to write is kept for the next flush: its scores are
+merged back under any newer ones, and its results go first next time,
+counting against the same bound. Flushes back off while writes keep
+failing. Closing lets a write already under way finish before the final
+flush, and closes the database even if that flush fails.
+"""
+import asyncio
+import contextlib
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+
+MAX_NAME_LENGTH = 32
+
+# Longest wait between flushes while writes keep failing
+MAX_RETRY_DELAY = 10.0
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS players (
+        name TEXT PRIMARY KEY,
+        matches INTEGER NOT NULL DEFAULT 0,
+        total_score INTEGER NOT NULL DEFAULT 0,
+        best_score INTEGER NOT NULL DEFAULT 0,
+        last_score INTEGER NOT NULL DEFAULT 0,
+        last_seen REAL NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS results (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        score INTEGER NOT NULL,
+        started REAL NOT NULL,
+        ended REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS results_by_name ON results (name)"
+)
+
+UPDATE_SCORE = """
+    INSERT INTO players (name, best_score, last_score, last_seen) VALUES (?, ?, ?, ?)
+    ON CONFLICT (name) DO UPDATE SET
+        best_score = MAX(best_score, excluded.best_score),
+        last_score = excluded.last_score,
+        last_seen = excluded.last_seen
+"""
+
+INSERT_RESULT = "INSERT INTO results (name, score, started, ended) VALUES (?, ?, ?, ?)"
+
+COUNT_RESULT = """
+    INSERT INTO players (name, matches, total_score, best_score, last_score, last_seen) VALUES (?, 1, ?, ?, ?, ?)
+    ON CONFLICT (name) DO UPDATE SET
+        matches = matches + 1,
+        total_score = total_score + excluded.total_score,
+        best_score = MAX(best_score, excluded.best_score),
+        last_score = excluded.last_score,
+        last_seen = excluded.last_seen
+"""
+
+# A finished match: name, score, start and end time
+Result = Tuple[str, int, float, float]
+
+
+def parse_player_name(path: str) -> Optional[str]:
+    """Extract the player name from a connection path like '/?name=alice'."""
+    values = parse_qs(urlsplit(path or "").query).get("name")
+    name = values[0].strip() if values else ""
+    return name[:MAX_NAME_LENGTH] or None
+
+
+class ScoreStore:
+    """Batches score updates and match results into a SQLite database."""
+    
+    def __init__(self, path: str, flush_interval: float = 0.25, max_pending: int = 1000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.scores: Dict[str, int] = {}  # Newest live score per name since the last flush
+        self.results: asyncio.Queue = asyncio.Queue(max_pending)
+        self.unwritten: List[Result] = []  # Results of a failed batch, retried first
+        
+        # The connection is only ever used on the writer thread
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stats")
+        self.connection: Optional[sqlite3.Connection] = None
+        self.flushes = 0
+        self.written = 0
+        self.failed = 0
+        self._flusher: Optional[asyncio.Task] = None
+    
+    async def open(self) -> None:
+        """Open the database and start flushing."""
+        await asyncio.get_running_loop().run_in_executor(self.executor, self._open)
+        self._flusher = asyncio.create_task(self._flush_periodically())
+    
+    def update_score(self, name: str, score: int) -> None:
+        """Note a player's new live score; never blocks."""
+        self.scores[name] = score
+    
+    async def record_result(self, name: str, score: int, started: float, ended: float) -> None:
+        """Queue a finished match, waiting while the queue is full."""
+        await self.results.put((name, score, started, ended))
+    
+    async def load(self, name: str) -> Optional[Dict[str, Any]]:
+        """A player's stats, or None if they have never played."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self._load, name)
+    
+    async def flush(self) -> int:
+        """
+        Write everything pending in one transaction; returns how many updates
+        it held. If the write fails the batch stays pending and the error is
+        raised. Cancelling waits for a write already under way, which the
+        writer thread finishes regardless.
+        """
+        scores, self.scores = self.scores, {}
+        results, self.unwritten = self.unwritten, []
+        # Unwritten results count against the queue's bound
+        while not self.results.empty() and len(results) < self.results.maxsize:
+            results.append(self.results.get_nowait())
+        if not scores and not results:
+            return 0
+        write = asyncio.get_running_loop().run_in_executor(self.executor, self._write, scores, results, time.time())
+        try:
+            # Waiting doesn't cancel the write, nor raise its error
+            await asyncio.wait([write])
+        except asyncio.CancelledError:
+            # Account for the batch before stopping, so it is neither lost
+            # nor written twice
+            await asyncio.wait([write])
+            try:
+                self._settle(write, scores, results)
+            except sqlite3.Error as e:
+                print(f"Stats flush failed while stopping: {e}")
+            raise
+        return self._settle(write, scores, results)
+    
+    async def close(self) -> None:
+        """Stop flushing, write what is left and close the database."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flusher
+            self._flusher = None
+        try:
+            await self.flush()
+        finally:
+            await asyncio.get_running_loop().run_in_executor(self.executor, self._close)
+            self.executor.shutdown()
+    
+    def status(self) -> Dict[str, int]:
+        """Write counters and backlog, for monitoring."""
+        return {
+            "flushes": self.flushes,
+            "written": self.written,
+            "failed": self.failed,
+            "pending_scores": len(self.scores),
+            "pending_results": self.results.qsize() + len(self.unwritten)
+        }
+    
+    async def _flush_periodically(self) -> None:
+        """Flush every flush_interval, one batch at a time, backing off while writes fail."""
+        delay = self.flush_interval
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.flush()
+            except sqlite3.Error as e:
+                delay = min(delay * 2, max(MAX_RETRY_DELAY, self.flush_interval))
+                print(f"Stats flush failed, retrying in {delay:.2f}s: {e}")
+            else:
+                delay = self.flush_interval
+    
+    def _settle(self, write: asyncio.Future, scores: Dict[str, int], results: List[Result]) -> int:
+        """Count a finished write, or keep its batch pending and raise if it failed."""
+        try:
+            write.result()
+        except sqlite3.Error:
+            # Scores noted since are newer than the failed batch's
+            self.scores = {**scores, **self.scores}
+            self.unwritten = results + self.unwritten
+            self.failed += 1
+            raise
+        self.flushes += 1
+        self.written += len(scores) + len(results)
+        return len(scores) + len(results)
+    
+    def _open(self) -> None:
+        """Connect and set up the schema (writer thread)."""
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode this survives a crash of the server, only a power loss
+        # can take the last commits with it
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+    
+    def _write(self, scores: Dict[str, int], results: List[Result], now: float) -> None:
+        """Write one batch in a single transaction (writer thread)."""
+        connection = self._connection()
+        with connection:
+            connection.executemany(UPDATE_SCORE, [(name, score, score, now) for name, score in scores.items()])
+            connection.executemany(INSERT_RESULT, results)
+            connection.executemany(
+                COUNT_RESULT, [(name, score, score, score, ended) for name, score, _, ended in results]
+            )
+    
+    def _load(self, name: str) -> Optional[Dict[str, Any]]:
+        """Read a player's stats (writer thread)."""
+        row = self._connection().execute(
+            "SELECT matches, total_score, best_score, last_score, last_seen FROM players WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            return None
+        matches, total_score, best_score, last_score, last_seen = row
+        return {
+            "matches": matches,
+            "total_score": total_score,
+            "best_score": best_score,
+            "last_score": last_score,
+            "last_seen": last_seen
+        }
+    
+    def _connection(self) -> sqlite3.Connection:
+        """The open connection (writer thread)."""
+        if self.connection is None:
+            raise sqlite3.ProgrammingError("Stats store is not open")
+        return self.connection
+    
+    def _close(self) -> None:
+        """Close the connection (writer thread)."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""
+Bandwidth-budgeted snapshot contents.
+
+With a snapshot budget each client gets its own state message of at most
+that many bytes. Every tick each other player's priority for that client
+grows by a weight that is higher the closer and faster they are; the
+client's own player always goes first, then the highest priorities are
+packed until the budget is used up, and the priorities of the players
+packed are reset. Nearby action is sent nearly every tick, while distant or
+idle players still come round, just less often.
+
+Player entries are encoded once per tick (see encoder.encode_state_parts)
+and only spliced together per client. Choosing them still costs each client
+a pass over every player to accumulate priority, plus a partial sort of the
+few that can fit the budget, so packing runs off the event loop (see
+encoder.StateEncoder.pack).
+"""
+import heapq
+import math
+from typing import Dict, Hashable, List, Optional, Sequence
+
+
+# Spliced between the header and the chosen player entries
+PARTIAL_PREFIX = ', "partial": true, "players": ['
+PARTIAL_SUFFIX = "]}"
+
+
+class PriorityAccumulator:
+    """One client's accumulated priority for each player it could be sent."""
+    
+    def __init__(self, falloff: float = 400.0, speed_scale: float = 200.0):
+        self.falloff = falloff  # Distance at which the weight halves
+        self.speed_scale = speed_scale  # Speed at which the weight doubles
+        self.priority: Dict[str, float] = {}
+    
+    def select(self, players: Sequence[tuple], sizes: Sequence[int], viewer_id: Optional[str], budget: int) -> List[int]:
+        """
+        Accumulate one tick of priority and pick the entries to send.
+        
+        players are StateView rows and sizes their encoded lengths; returns
+        the indices of the rows to send, the viewer's own player first.
+        """
+        own = None
+        origin_x = origin_y = 0.0
+        for i, row in enumerate(players):
+            if row[0] == viewer_id:
+                own = i
+                origin_x, origin_y = row[1], row[2]
+                break
+        
+        previous = self.priority
+        priority: Dict[str, float] = {}
+        for i, row in enumerate(players):
+            if i == own:
+                continue
+            distance = math.hypot(row[1] - origin_x, row[2] - origin_y)
+            speed = math.hypot(row[3], row[4])
+            weight = (1.0 + speed / self.speed_scale) / (1.0 + distance / self.falloff)
+            priority[row[0]] = previous.get(row[0], 0.0) + weight
+        # Players who left are dropped along with the old dictionary
+        self.priority = priority
+        
+        chosen = []
+        used = 0
+        if own is not None:
+            chosen.append(own)
+            used = sizes[own]
+        
+        # Only the highest priorities can fit: no more entries than the
+        # smallest one fits into the rest of the budget
+        smallest = min(sizes) + 1 if sizes else 1
+        fits = max(0, (budget - used) // smallest)
+        candidates = heapq.nlargest(
+            fits,
+            (i for i in range(len(players)) if i != own),
+            key=lambda i: priority[players[i][0]]
+        )
+        for i in candidates:
+            cost = sizes[i] + 1  # Separating comma
+            if used + cost > budget:
+                break
+            used += cost
+            chosen.append(i)
+            priority[players[i][0]] = 0.0
+        return chosen
+
+
+class SnapshotPacker:
+    """Builds each client's budgeted state message from shared parts."""
+    
+    def __init__(self, budget: int, falloff: float = 400.0):
+        self.budget = budget
+        self.falloff = falloff
+        self.accumulators: Dict[Hashable, PriorityAccumulator] = {}
+    
+    def pack(
+        self,
+        players: Sequence[tuple],
+        header: str,
+        fragments: Sequence[str],
+        viewers: Dict[Hashable, Optional[str]],
+        interest_scale: float = 1.0
+    ) -> Dict[Hashable, str]:
+        """
+        Build a state message for each viewer (a connection mapped to the
+        id of the player it controls).
+        
+        header is the encoded state message without its players; the bytes
+        it takes, events included, count against the budget. Only the
+        viewer's own player is sent even if it doesn't fit. interest_scale
+        shrinks the falloff distance under overload, so distant players come
+        round less often.
+        """
+        sizes = [len(fragment) for fragment in fragments]
+        entry_budget = self.budget - len(header) - len(PARTIAL_PREFIX) - len(PARTIAL_SUFFIX)
+        opening = header[:-1] + PARTIAL_PREFIX
+        
+        accumulators = {}
+        messages = {}
+        for viewer, player_id in viewers.items():
+            accumulator = self.accumulators.get(viewer)
+            if accumulator is None:
+                accumulator = PriorityAccumulator(self.falloff)
+            accumulator.falloff = self.falloff * interest_scale
+            accumulators[viewer] = accumulator
+            
+            chosen = accumulator.select(players, sizes, player_id, entry_budget)
+            messages[viewer] = opening + ",".join([fragments[i] for i in chosen]) + PARTIAL_SUFFIX
+        # Disconnected viewers are dropped with the old dictionary
+        self.accumulators = accumulators
+        return messages
\ No newline at end of file
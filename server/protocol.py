@@ -1,5 +1,6 @@
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Sequence
+from server.game_state import Coin, GameState, PlayerState, StateView
 
 
 def encode_message(message: Dict[str, Any]) -> str:
@@ -8,30 +9,190 @@ def encode_message(message: Dict[str, Any]) -> str:
 
 
 def decode_message(data: str) -> Dict[str, Any]:
-    """Decode a JSON string to message dictionary."""
-    return json.loads(data)
+    """
+    Decode a JSON string to message dictionary.
+    Raises ValueError for invalid JSON or JSON that isn't an object.
+    """
+    message = json.loads(data)
+    if not isinstance(message, dict):
+        raise ValueError("message is not a JSON object")
+    return message
 
 
-def create_input_message(player_id: str, move: str) -> Dict[str, Any]:
-    """Create a client input message."""
-    return {
+def create_input_message(player_id: str, move: str, trace_id: Optional[int] = None) -> Dict[str, Any]:
+    """Create a client input message, tagged with a trace id when tracing."""
+    message: Dict[str, Any] = {
         "type": "input",
         "id": player_id,
         "move": move
     }
+    if trace_id is not None:
+        message["trace"] = trace_id
+    return message
+
+
+def create_player_entry(row: tuple) -> Dict[str, Any]:
+    """A player's entry in a state message, from its StateView row."""
+    return {"id": row[0], "x": row[1], "y": row[2], "vx": row[3], "vy": row[4]}
+
+
+def create_state_message(
+    view: StateView,
+    seq: int,
+    events: List[Dict[str, Any]],
+    ghost_players: Sequence[Dict[str, Any]] = (),
+    ghost_coins: Sequence[Dict[str, Any]] = (),
+    traces: Sequence[Dict[str, Any]] = ()
+) -> Dict[str, Any]:
+    """
+    Create a per-tick state broadcast from a StateView.
+    
+    Only fast-changing player fields are included; everything else reaches
+    clients through the events, which run up to event sequence number seq.
+    Ghost players mirrored from neighbouring nodes are normally given as
+    positions only, their static fields travelling in ghost_manifest events,
+    and traced inputs this state first reflects are listed under traces.
+    """
+    message: Dict[str, Any] = {
+        "type": "state",
+        "timestamp": view.timestamp,
+        "seq": seq,
+        "events": events,
+        "players": [create_player_entry(row) for row in view.players]
+    }
+    if ghost_players or ghost_coins:
+        message["ghosts"] = {"players": list(ghost_players), "coins": list(ghost_coins)}
+    if traces:
+        message["traces"] = list(traces)
+    return message
+
+
+def create_datagram_state_header(timestamp: float, tick: int) -> Dict[str, Any]:
+    """
+    Create the start of a state datagram; the players chosen for the client
+    are spliced in, and tick orders datagrams so stale ones are dropped.
+    """
+    return {
+        "type": "state",
+        "timestamp": timestamp,
+        "tick": tick
+    }
+
+
+def create_sync_message(
+    game_state: GameState,
+    seq: int,
+    ghosts: Optional[Dict[str, List[Dict[str, Any]]]] = None
+) -> Dict[str, Any]:
+    """
+    Create a full-world sync, as of event sequence number seq, with the
+    manifests of any ghosts from neighbouring nodes.
+    """
+    message = game_state.to_dict()
+    message["type"] = "sync"
+    message["seq"] = seq
+    if ghosts:
+        message["ghosts"] = ghosts
+    return message
+
+
+def create_coin_spawned_event(coin: Coin) -> Dict[str, Any]:
+    """Create an event announcing a new coin."""
+    return {
+        "type": "coin_spawned",
+        "coin": {"id": coin.id, "x": coin.x, "y": coin.y, "value": coin.value, "radius": coin.radius}
+    }
+
+
+def create_coin_collected_event(coin_id: str, player_id: str) -> Dict[str, Any]:
+    """Create an event for a coin collected by a player."""
+    return {
+        "type": "coin_collected",
+        "coin_id": coin_id,
+        "by": player_id
+    }
 
 
-def create_state_message(game_state) -> Dict[str, Any]:
-    """Create a state broadcast message from game state."""
-    return game_state.to_dict()
+def create_coin_despawned_event(coin_id: str) -> Dict[str, Any]:
+    """Create an event for a coin that expired uncollected."""
+    return {
+        "type": "coin_despawned",
+        "coin_id": coin_id
+    }
+
+
+def create_player_joined_event(player: PlayerState) -> Dict[str, Any]:
+    """Create an event carrying a new player's static fields."""
+    return {
+        "type": "player_joined",
+        "player": {"id": player.id, "color": player.color, "radius": player.radius, "score": player.score}
+    }
 
 
-def create_welcome_message(player_id: str) -> Dict[str, Any]:
-    """Create a welcome message for new players."""
+def create_player_left_event(player_id: str) -> Dict[str, Any]:
+    """Create an event for a player leaving the world."""
     return {
+        "type": "player_left",
+        "player_id": player_id
+    }
+
+
+def create_score_event(player_id: str, score: int) -> Dict[str, Any]:
+    """Create an event for a player's new score."""
+    return {
+        "type": "score",
+        "player_id": player_id,
+        "score": score
+    }
+
+
+def create_ghost_manifest_event(
+    players: List[Dict[str, Any]],
+    coins: List[Dict[str, Any]],
+    removed_players: List[str],
+    removed_coins: List[str]
+) -> Dict[str, Any]:
+    """Create an event with the static fields of new or changed ghosts, and the ghosts gone."""
+    return {
+        "type": "ghost_manifest",
+        "players": players,
+        "coins": coins,
+        "removed_players": removed_players,
+        "removed_coins": removed_coins
+    }
+
+
+def create_welcome_message(
+    player_id: Optional[str],
+    world_width: float = 800.0,
+    world_height: float = 600.0,
+    resume_token: Optional[str] = None,
+    datagram_port: Optional[int] = None,
+    datagram_token: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Create a welcome message for new players (player_id is None for spectators).
+    If the server offers the datagram transport, its port and the session
+    token to use on it are included.
+    """
+    message: Dict[str, Any] = {
         "type": "welcome",
         "player_id": player_id,
-        "message": "Connected to game server"
+        "message": "Connected to game server",
+        "world_width": world_width,
+        "world_height": world_height,
+        "resume_token": resume_token
+    }
+    if datagram_port is not None:
+        message["datagram"] = {"port": datagram_port, "token": datagram_token}
+    return message
+
+
+def create_restart_message() -> Dict[str, Any]:
+    """Create a message telling clients to resume against the new server."""
+    return {
+        "type": "restart",
+        "message": "Server restarting, resume your session"
     }
 
 
@@ -40,4 +201,68 @@ def create_error_message(error: str) -> Dict[str, Any]:
     return {
         "type": "error",
         "message": error
+    }
+
+
+def create_redirect_message(url: str, resume_token: Optional[str]) -> Dict[str, Any]:
+    """Create a message moving a client to the node owning its new region."""
+    return {
+        "type": "redirect",
+        "url": url,
+        "resume_token": resume_token
+    }
+
+
+def create_stats_message(name: str, stats: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Create a message with a named player's stored stats (None for a first-timer)."""
+    return {
+        "type": "stats",
+        "name": name,
+        "stats": stats
+    }
+
+
+def create_peer_ghosts_message(
+    region_index: int, players: List[Dict[str, Any]], coins: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Create a message mirroring border entities to a neighbouring node."""
+    return {
+        "type": "peer_ghosts",
+        "region": region_index,
+        "players": players,
+        "coins": coins
+    }
+
+
+def create_peer_handoff_message(
+    player_record: List[Any],
+    resume_token: Optional[str],
+    match: Optional[List[Any]] = None
+) -> Dict[str, Any]:
+    """
+    Create a message transferring ownership of a player to another node,
+    with the player's name and match start time if their stats are kept.
+    """
+    return {
+        "type": "peer_handoff",
+        "player": player_record,
+        "resume_token": resume_token,
+        "match": match
+    }
+
+
+def create_peer_handoff_ack_message(player_id: str) -> Dict[str, Any]:
+    """Create a reply confirming that a handed-off player was taken over."""
+    return {
+        "type": "peer_handoff_ack",
+        "player_id": player_id
+    }
+
+
+def create_peer_score_message(player_id: str, value: int) -> Dict[str, Any]:
+    """Create a message crediting a coin collected by a ghost player."""
+    return {
+        "type": "peer_score",
+        "player_id": player_id,
+        "value": value
     }
\ No newline at end of file
@@ -0,0 +1,298 @@
+"""
+Lightweight game rooms hosted side by side in one process.
+
+A Room is a self-contained match: it owns its GameState, event log, coin
+timers, its players' connections and its config, and nothing in it is
+global, so a process can host many small matches and tests can run one
+without a server. Rooms are simpler than the node's main world: no region
+partitioning, hot restart or datagram transport. The parts they have in
+common, coin timers and pickups (coins.CoinTimers) and reading client
+messages (NetworkManager.client_messages), are the same code.
+
+RoomManager ticks every room from a single task on the event loop. Each
+room gets a phase within the tick interval, spread so that rooms tick one
+after another through the interval rather than all at once at its start:
+load is smooth instead of a spike every tick. Rooms where nobody is moving
+only tick every idle_every intervals, since only coin timers can change
+anything there, and rooms left empty for empty_timeout seconds are
+reclaimed.
+"""
+import asyncio
+import re
+import time
+from websockets.server import WebSocketServerProtocol
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from server.admission import ClientRateLimiter
+from server.coins import CoinTimers
+from server.events import EventLog
+from server.game_logic import update_player_positions, set_player_velocity, add_player, remove_player
+from server.game_state import GameState, PlayerState
+from server.network import NetworkManager
+from server.protocol import (
+    encode_message,
+    create_welcome_message,
+    create_state_message,
+    create_sync_message,
+    create_player_joined_event,
+    create_player_left_event
+)
+from server.scheduler import TimingWheel
+
+
+ROOM_PATH = re.compile(r"^/room/([A-Za-z0-9_-]{1,32})/?(?:\?.*)?$")
+
+
+def parse_room_path(path: str) -> Optional[str]:
+    """Extract the room id from a connection path like '/room/lobby'."""
+    match = ROOM_PATH.match(path or "")
+    return match.group(1) if match else None
+
+
+def phase_of(slot: int) -> float:
+    """
+    Fraction of the tick interval at which the room in a slot ticks.
+    
+    Slots are spread by bit reversal (0, 1/2, 1/4, 3/4, 1/8, ...), so however
+    many rooms there are their phases stay roughly evenly spaced, and rooms
+    coming and going never require the others to move.
+    """
+    phase = 0.0
+    scale = 0.5
+    while slot:
+        if slot & 1:
+            phase += scale
+        slot >>= 1
+        scale /= 2
+    return phase
+
+
+@dataclass(frozen=True)
+class RoomConfig:
+    """Settings of one room."""
+    world_width: float = 800.0
+    world_height: float = 600.0
+    tick_rate: int = 30
+    max_players: int = 16
+    initial_coins: int = 5
+    coin_spawn_interval: float = 3.0
+    coin_wave_size: int = 1
+    coin_ttl: float = 60.0  # 0 keeps coins forever
+    max_coins: int = 50
+    artificial_latency: float = 0.0
+
+
+class Room:
+    """One match: its world, timers and connected players."""
+    
+    def __init__(self, room_id: str, config: RoomConfig, now: Optional[float] = None):
+        if now is None:
+            now = time.time()
+        self.room_id = room_id
+        self.config = config
+        self.game_state = GameState(world_width=config.world_width, world_height=config.world_height)
+        self.event_log = EventLog()
+        self.scheduler = TimingWheel(1.0 / config.tick_rate, now)
+        self.network_manager = NetworkManager(artificial_latency=config.artificial_latency)
+        self.connections: Dict[str, WebSocketServerProtocol] = {}
+        self.coins = CoinTimers(
+            self.scheduler, self.event_log, config.coin_ttl, config.coin_spawn_interval, config.coin_wave_size,
+            config.max_coins
+        )
+        
+        self.phase = 0.0  # Set by the manager
+        self.last_tick = now
+        self.empty_since: Optional[float] = now
+        self.ticks = 0
+        self.skipped = 0  # Intervals skipped in a row while idle
+        
+        for _ in range(config.initial_coins):
+            self.coins.place(self.game_state)
+        self.coins.schedule_waves(self.spawn_coin_wave)
+    
+    @property
+    def full(self) -> bool:
+        """True once the room has as many players as it takes."""
+        return len(self.game_state.players) >= self.config.max_players
+    
+    @property
+    def idle(self) -> bool:
+        """True while nobody is moving, so only timers can change the world."""
+        return not any(player.vx or player.vy for player in self.game_state.players.values())
+    
+    def join(self, player_id: str) -> Optional[PlayerState]:
+        """Add a player, or return None if the room is full."""
+        if self.full:
+            return None
+        player = add_player(self.game_state, player_id)
+        self.event_log.emit(create_player_joined_event(player))
+        self.empty_since = None
+        return player
+    
+    def leave(self, player_id: str, now: Optional[float] = None) -> None:
+        """Remove a player; the room starts counting down once it is empty."""
+        self.connections.pop(player_id, None)
+        if player_id in self.game_state.players:
+            remove_player(self.game_state, player_id)
+            self.event_log.emit(create_player_left_event(player_id))
+        if not self.game_state.players:
+            self.empty_since = time.time() if now is None else now
+    
+    def apply_input(self, player_id: str, message: dict, now: Optional[float] = None) -> None:
+        """Apply a player's input message."""
+        player = self.game_state.players.get(player_id)
+        if player is None:
+            return
+        if self.idle:
+            # Nothing moved since the last tick, however long ago it was, so
+            # the next tick must only move players from now
+            self.last_tick = max(self.last_tick, time.time() if now is None else now)
+        set_player_velocity(player, message.get("move"))
+    
+    def sync_message(self) -> dict:
+        """The full world, as of the newest event."""
+        return create_sync_message(self.game_state, self.event_log.seq)
+    
+    def spawn_coin_wave(self) -> None:
+        """Top the room up with a wave of coins."""
+        for _ in range(self.coins.wave_count(len(self.game_state.coins))):
+            self.coins.place(self.game_state)
+    
+    def tick(self, now: Optional[float] = None) -> None:
+        """Simulate up to now and broadcast the state to the room's players."""
+        if now is None:
+            now = time.time()
+        delta_time = now - self.last_tick
+        self.last_tick = now
+        self.ticks += 1
+        self.skipped = 0
+        
+        starts = update_player_positions(self.game_state, delta_time)
+        self.coins.collect(self.game_state, starts)
+        self.scheduler.advance(now)
+        self.game_state.timestamp = now
+        
+        events = self.event_log.drain()
+        if self.connections:
+            message = encode_message(create_state_message(self.game_state.view(), self.event_log.seq, events))
+            self.network_manager.publish_state(message)
+    
+    async def serve(self, websocket: WebSocketServerProtocol, player_id: str, limiter: ClientRateLimiter) -> None:
+        """Play one client's connection in this room until it closes."""
+        if self.join(player_id) is None:
+            await websocket.close(1013, "Room full")
+            return
+        self.network_manager.register_client(websocket)
+        self.connections[player_id] = websocket
+        try:
+            welcome = create_welcome_message(player_id, self.config.world_width, self.config.world_height)
+            await self.network_manager.send_message(websocket, encode_message(welcome))
+            await self.network_manager.send_message(websocket, encode_message(self.sync_message()))
+            
+            async for message in self.network_manager.client_messages(websocket, limiter):
+                if message.get("type") == "input":
+                    self.apply_input(player_id, message)
+                elif message.get("type") == "sync_request":
+                    await self.network_manager.send_message(websocket, encode_message(self.sync_message()))
+        finally:
+            self.network_manager.unregister_client(websocket)
+            self.leave(player_id)
+
+
+class RoomManager:
+    """Creates rooms on demand, ticks them on staggered phases and reclaims empty ones."""
+    
+    def __init__(
+        self,
+        config: RoomConfig,
+        max_rooms: int = 100,
+        idle_every: int = 6,
+        empty_timeout: float = 30.0
+    ):
+        self.config = config
+        self.max_rooms = max_rooms
+        self.idle_every = idle_every
+        self.empty_timeout = empty_timeout
+        self.interval = 1.0 / config.tick_rate
+        self.rooms: Dict[str, Room] = {}
+        self.slots: Dict[str, int] = {}
+        self.running = True
+        self.reclaimed = 0
+    
+    def room(self, room_id: str, now: Optional[float] = None) -> Optional[Room]:
+        """The room with this id, created if needed; None if there is no space for it."""
+        room = self.rooms.get(room_id)
+        if room is None:
+            if len(self.rooms) >= self.max_rooms:
+                return None
+            room = Room(room_id, self.config, now)
+            taken = set(self.slots.values())
+            slot = next(slot for slot in range(len(taken) + 1) if slot not in taken)
+            self.slots[room_id] = slot
+            room.phase = phase_of(slot)
+            self.rooms[room_id] = room
+            print(f"Room {room_id} opened")
+        return room
+    
+    def admits(self, room_id: str) -> bool:
+        """Whether a new player could join this room now."""
+        room = self.rooms.get(room_id)
+        if room is None:
+            return len(self.rooms) < self.max_rooms
+        return not room.full
+    
+    def tick_order(self) -> List[Room]:
+        """Rooms in the order they tick within an interval."""
+        return sorted(self.rooms.values(), key=lambda room: room.phase)
+    
+    def tick_room(self, room: Room, now: float) -> bool:
+        """Tick a room, unless it is idle and not due yet; returns whether it ticked."""
+        if room.idle and room.skipped + 1 < self.idle_every:
+            room.skipped += 1
+            return False
+        room.tick(now)
+        return True
+    
+    def reclaim(self, now: float) -> List[str]:
+        """Close rooms that have been empty for empty_timeout; returns their ids."""
+        reclaimed = [
+            room_id for room_id, room in self.rooms.items()
+            if room.empty_since is not None and now - room.empty_since >= self.empty_timeout
+        ]
+        for room_id in reclaimed:
+            del self.rooms[room_id]
+            del self.slots[room_id]
+            self.reclaimed += 1
+            print(f"Room {room_id} reclaimed")
+        return reclaimed
+    
+    async def run(self) -> None:
+        """Tick every room on its phase, each tick interval."""
+        loop = asyncio.get_running_loop()
+        frame = loop.time()
+        while self.running:
+            for room in self.tick_order():
+                delay = frame + room.phase * self.interval - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if room.room_id in self.rooms:
+                    self.tick_room(room, time.time())
+            self.reclaim(time.time())
+            
+            frame += self.interval
+            delay = frame - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                # Running behind: start the next interval now rather than
+                # ticking everything back to back to catch up
+                frame = loop.time()
+    
+    def status(self) -> Dict[str, int]:
+        """Room and player counts, for monitoring."""
+        return {
+            "rooms": len(self.rooms),
+            "idle": sum(1 for room in self.rooms.values() if room.idle),
+            "players": sum(len(room.game_state.players) for room in self.rooms.values()),
+            "reclaimed": self.reclaimed
+        }
\ No newline at end of file
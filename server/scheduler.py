@@ -0,0 +1,123 @@
+"""
+Hierarchical timing wheel for in-simulation timers.
+
+Time is quantized into ticks of a fixed resolution. Level 0 holds one
+bucket per tick for the next `slots` ticks; each higher level's buckets
+cover `slots` times as many ticks as the level below, and are cascaded
+down a level when the wheel reaches them. Scheduling and cancelling are
+O(1), and advancing costs one bucket per tick plus the timers that fire, no
+matter how many are pending.
+"""
+import math
+from typing import Any, Callable, Dict, List
+
+
+class Timer:
+    """Handle for a scheduled callback."""
+    __slots__ = ("deadline", "callback", "args", "bucket")
+    
+    def __init__(self, deadline: int, callback: Callable[..., Any], args: tuple):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.bucket = None
+    
+    @property
+    def active(self) -> bool:
+        """True until the timer fires or is cancelled."""
+        return self.bucket is not None
+
+
+class TimingWheel:
+    """Schedules callbacks against simulation time and fires them in batches."""
+    
+    def __init__(self, resolution: float, now: float = 0.0, slot_bits: int = 8, levels: int = 4):
+        self.resolution = resolution
+        self.origin = now
+        self.current = 0  # Last tick processed
+        self.slot_bits = slot_bits
+        self.slots = 1 << slot_bits
+        self.mask = self.slots - 1
+        self.levels = levels
+        # Buckets are dicts used as insertion-ordered sets of timers
+        self.wheels: List[List[Dict[Timer, None]]] = [
+            [{} for _ in range(self.slots)] for _ in range(levels)
+        ]
+        self.pending = 0
+    
+    def __len__(self) -> int:
+        return self.pending
+    
+    def schedule(self, delay: float, callback: Callable[..., Any], *args) -> Timer:
+        """
+        Call callback(*args) once delay seconds of simulation time pass.
+        
+        Timers fire on the first advance at or after their deadline, rounded
+        up to the wheel's resolution and never in the current tick.
+        """
+        ticks = max(1, math.ceil(delay / self.resolution - 1e-9))
+        timer = Timer(self.current + ticks, callback, args)
+        self._insert(timer)
+        self.pending += 1
+        return timer
+    
+    def cancel(self, timer: Timer) -> bool:
+        """Cancel a pending timer; returns False if it already fired."""
+        if timer.bucket is None:
+            return False
+        del timer.bucket[timer]
+        timer.bucket = None
+        self.pending -= 1
+        return True
+    
+    def remaining(self, timer: Timer) -> float:
+        """Seconds of simulation time until a pending timer fires."""
+        return (timer.deadline - self.current) * self.resolution
+    
+    def advance(self, now: float) -> int:
+        """Fire every timer due by now; returns how many fired."""
+        target = int((now - self.origin) / self.resolution)
+        fired = 0
+        while self.current < target:
+            self.current += 1
+            self._cascade()
+            
+            bucket = self.wheels[0][self.current & self.mask]
+            if not bucket:
+                continue
+            # Swap the bucket out so callbacks can schedule into this slot
+            self.wheels[0][self.current & self.mask] = {}
+            for timer in list(bucket):
+                if timer.bucket is not bucket:
+                    continue  # Cancelled by an earlier callback
+                timer.bucket = None
+                self.pending -= 1
+                fired += 1
+                timer.callback(*timer.args)
+        return fired
+    
+    def _insert(self, timer: Timer) -> None:
+        """File a timer on the lowest level whose range covers its deadline."""
+        deadline = min(timer.deadline, self.current + (1 << (self.slot_bits * self.levels)) - 1)
+        for level in range(self.levels):
+            shift = self.slot_bits * level
+            if (deadline >> shift) - (self.current >> shift) < self.slots:
+                bucket = self.wheels[level][(deadline >> shift) & self.mask]
+                break
+        bucket[timer] = None
+        timer.bucket = bucket
+    
+    def _cascade(self) -> None:
+        """Move the buckets the wheel just reached down a level, top first."""
+        top = 0
+        while top + 1 < self.levels and self.current & ((1 << (self.slot_bits * (top + 1))) - 1) == 0:
+            top += 1
+        
+        for level in range(top, 0, -1):
+            index = (self.current >> (self.slot_bits * level)) & self.mask
+            bucket = self.wheels[level][index]
+            if not bucket:
+                continue
+            self.wheels[level][index] = {}
+            for timer in bucket:
+                self._insert(timer)
\ No newline at end of file
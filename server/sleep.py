@@ -0,0 +1,206 @@
+"""
+Sleeping cells: skip simulating the parts of the world nobody is near.
+
+The world is divided into square cells. A cell is awake while a player (or
+a neighbour node's ghost player) is within margin of it, and asleep
+otherwise. When a cell falls asleep its coins leave the simulation: they
+are packed into plain rows, their despawn timers are swapped for deadlines
+on one heap, and no coin waves land there. Collision checks, timers and
+spawns therefore scale with the area players occupy rather than the size of
+the world, while sleeping coins still expire on time and count toward the
+coin cap.
+
+Sleeping coins are still part of the world clients see. GameState keeps
+their rows in dormant_coins, so views, syncs and hot-restart snapshots
+include them without any per-tick work. A cell wakes on the same tick a
+player comes within margin, before collisions are checked. The margin must
+therefore cover the distance a player travels in a tick plus the player
+and coin radii.
+"""
+import heapq
+import math
+import random
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from server.game_state import Coin, CoinRow, GameState
+
+
+Bounds = Tuple[float, float, float, float]
+
+
+class SleepGrid:
+    """Which cells of the world are awake, and the coins of those that aren't."""
+    
+    def __init__(self, world_width: float, world_height: float, cell_size: float, margin: float = 200.0):
+        self.world_width = world_width
+        self.world_height = world_height
+        self.cell_size = cell_size
+        self.margin = margin
+        self.columns = max(1, math.ceil(world_width / cell_size))
+        self.rows = max(1, math.ceil(world_height / cell_size))
+        
+        # Everything starts awake; the first update puts empty cells to sleep
+        self.awake: Set[int] = set(range(self.columns * self.rows))
+        # Packed coin rows of sleeping cells, with each coin's despawn
+        # deadline (0 for none)
+        self.dormant: Dict[int, List[Tuple[CoinRow, float]]] = {}
+        # (deadline, coin id, cell) of sleeping coins that expire; entries of
+        # coins woken (or put back to sleep) since match nothing when they
+        # come up
+        self.deadlines: List[Tuple[float, str, int]] = []
+    
+    def cell_of(self, x: float, y: float) -> int:
+        """Index of the cell containing a point, clamped to the world."""
+        column = min(self.columns - 1, max(0, int(x // self.cell_size)))
+        row = min(self.rows - 1, max(0, int(y // self.cell_size)))
+        return row * self.columns + column
+    
+    def cell_bounds(self, cell: int) -> Bounds:
+        """(left, top, right, bottom) of a cell, cut to the world."""
+        row, column = divmod(cell, self.columns)
+        left = column * self.cell_size
+        top = row * self.cell_size
+        return (left, top, min(self.world_width, left + self.cell_size), min(self.world_height, top + self.cell_size))
+    
+    def update(self, points: Iterable[Tuple[float, float]]) -> Tuple[List[int], List[int]]:
+        """
+        Wake the cells within margin of any point and let the rest sleep.
+        Returns the cells that woke up and those that fell asleep.
+        """
+        awake: Set[int] = set()
+        size = self.cell_size
+        for x, y in points:
+            first_column = max(0, int((x - self.margin) // size))
+            last_column = min(self.columns - 1, int((x + self.margin) // size))
+            first_row = max(0, int((y - self.margin) // size))
+            last_row = min(self.rows - 1, int((y + self.margin) // size))
+            for row in range(first_row, last_row + 1):
+                for column in range(first_column, last_column + 1):
+                    awake.add(row * self.columns + column)
+        
+        woken = sorted(awake - self.awake)
+        slept = sorted(self.awake - awake)
+        self.awake = awake
+        return woken, slept
+    
+    def put_to_sleep(
+        self,
+        game_state: GameState,
+        cells: Iterable[int],
+        pause: Callable[[Coin], float],
+        now: Optional[float] = None
+    ) -> int:
+        """
+        Pack the coins of cells that fell asleep out of the simulation.
+        
+        pause(coin) stops the coin's despawn timer and returns its remaining
+        time to live (0 if it has none). Returns how many coins were packed.
+        """
+        asleep = set(cells)
+        if not asleep:
+            return 0
+        if now is None:
+            now = time.time()
+        live = []
+        packed = 0
+        for coin in game_state.coins:
+            cell = self.cell_of(coin.x, coin.y)
+            if cell in asleep:
+                row = (coin.id, coin.x, coin.y, coin.value, coin.radius)
+                ttl = pause(coin)
+                deadline = now + ttl if ttl > 0 else 0.0
+                self.dormant.setdefault(cell, []).append((row, deadline))
+                if deadline:
+                    heapq.heappush(self.deadlines, (deadline, coin.id, cell))
+                packed += 1
+            else:
+                live.append(coin)
+        if packed:
+            game_state.coins = live
+            game_state.dormant_coins = self.dormant_rows()
+        return packed
+    
+    def wake_up(
+        self,
+        game_state: GameState,
+        cells: Iterable[int],
+        now: Optional[float] = None
+    ) -> List[Tuple[Coin, float]]:
+        """
+        Return the coins of cells that woke up to the simulation.
+        Returns each coin with its remaining time to live (0 for none), to
+        resume its despawn timer; call expire first so none is overdue.
+        """
+        if now is None:
+            now = time.time()
+        woken = []
+        for cell in cells:
+            for row, deadline in self.dormant.pop(cell, ()):
+                coin_id, x, y, value, radius = row
+                coin = Coin(id=coin_id, x=x, y=y, value=value, radius=radius)
+                game_state.coins.append(coin)
+                woken.append((coin, max(deadline - now, 1e-3) if deadline else 0.0))
+        if woken:
+            game_state.dormant_coins = self.dormant_rows()
+        return woken
+    
+    def expire(self, game_state: GameState, now: Optional[float] = None) -> List[str]:
+        """Drop sleeping coins whose deadline has passed; returns their ids."""
+        if now is None:
+            now = time.time()
+        expired = []
+        while self.deadlines and self.deadlines[0][0] <= now:
+            deadline, coin_id, cell = heapq.heappop(self.deadlines)
+            coins = self.dormant.get(cell)
+            if not coins:
+                continue  # Woken since
+            kept = [entry for entry in coins if entry[0][0] != coin_id or entry[1] != deadline]
+            if len(kept) == len(coins):
+                continue
+            if kept:
+                self.dormant[cell] = kept
+            else:
+                del self.dormant[cell]
+            expired.append(coin_id)
+        if expired:
+            game_state.dormant_coins = self.dormant_rows()
+        return expired
+    
+    def dormant_rows(self) -> Tuple[CoinRow, ...]:
+        """Rows of every sleeping coin, as they appear in a StateView."""
+        return tuple(row for coins in self.dormant.values() for row, _ in coins)
+    
+    def dormant_count(self) -> int:
+        """How many coins are asleep."""
+        return sum(len(coins) for coins in self.dormant.values())
+    
+    def dormant_ttls(self, now: Optional[float] = None) -> Dict[str, float]:
+        """Remaining time to live of each sleeping coin that has one."""
+        if now is None:
+            now = time.time()
+        return {
+            row[0]: max(deadline - now, 1e-3) for coins in self.dormant.values() for row, deadline in coins if deadline
+        }
+    
+    def spawn_bounds(self, region: Bounds) -> Optional[Bounds]:
+        """
+        Bounds for a new coin: a random awake cell, cut to region.
+        None if no awake cell overlaps the region.
+        """
+        left, top, right, bottom = region
+        candidates = []
+        for cell in self.awake:
+            cell_left, cell_top, cell_right, cell_bottom = self.cell_bounds(cell)
+            if cell_left < right and left < cell_right and cell_top < bottom and top < cell_bottom:
+                candidates.append((
+                    max(left, cell_left), max(top, cell_top), min(right, cell_right), min(bottom, cell_bottom)
+                ))
+        return random.choice(candidates) if candidates else None
+    
+    def status(self) -> Dict[str, int]:
+        """Cell and coin counts, for monitoring."""
+        return {
+            "cells": self.columns * self.rows,
+            "awake": len(self.awake),
+            "dormant_coins": self.dormant_count()
+        }
\ No newline at end of file
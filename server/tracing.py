@@ -0,0 +1,36 @@
+"""
+Server side of input-to-photon latency tracing.
+
+A tracing client tags some of its inputs with a trace id. The server notes
+when each tagged input arrived and the tick that first simulated it, and
+echoes both times in the next state broadcast, where the client adds its own
+receive and render times. Untagged inputs cost nothing.
+"""
+from typing import Any, Dict, List
+
+
+class InputTracer:
+    """Follows tagged inputs from receipt to the snapshot that carries them."""
+    
+    def __init__(self, max_pending: int = 1000):
+        self.max_pending = max_pending
+        self.received: List[Dict[str, Any]] = []  # Arrived, not yet simulated
+        self.applied: List[Dict[str, Any]] = []  # Simulated, not yet broadcast
+    
+    def receive(self, player_id: str, trace_id: Any, now: float) -> None:
+        """Note a tagged input as it arrives."""
+        if len(self.received) < self.max_pending:
+            self.received.append({"player": player_id, "trace": trace_id, "received": now})
+    
+    def tick(self, now: float) -> None:
+        """Stamp inputs received so far with the tick that simulates them."""
+        if self.received:
+            for entry in self.received:
+                entry["tick"] = now
+            self.applied.extend(self.received)
+            self.received = []
+    
+    def drain(self) -> List[Dict[str, Any]]:
+        """Take the simulated inputs for the next state broadcast."""
+        traces, self.applied = self.applied, []
+        return traces
\ No newline at end of file
@@ -0,0 +1,82 @@
+import pytest
+from server.admission import TokenBucket, AdmissionStats, ClientRateLimiter
+
+
+def test_token_bucket_burst_and_refill():
+    """Test that a bucket allows a burst, then refills at its rate."""
+    bucket = TokenBucket(rate=10, burst=3)
+    now = bucket.updated
+    
+    assert all(bucket.consume(1, now) for _ in range(3))
+    assert not bucket.consume(1, now)
+    assert bucket.consume(1, now + 0.15)
+    assert not bucket.consume(1, now + 0.15)
+
+
+def test_token_bucket_caps_at_burst():
+    """Test that idle time never accumulates more than burst tokens."""
+    bucket = TokenBucket(rate=10, burst=2)
+    now = bucket.updated + 60
+    
+    assert bucket.consume(2, now)
+    assert not bucket.consume(1, now)
+
+
+def test_rate_limiter_throttles_message_count():
+    """Test that messages beyond the burst are dropped and counted."""
+    stats = AdmissionStats()
+    limiter = ClientRateLimiter(stats, messages_per_second=1, message_burst=2)
+    now = limiter.messages.updated
+    
+    results = [limiter.allow("{}", now) for _ in range(5)]
+    
+    assert results == [True, True, False, False, False]
+    assert stats.throttled_messages == 3
+
+
+def test_rate_limiter_throttles_bytes():
+    """Test that the byte budget is enforced separately from message count."""
+    stats = AdmissionStats()
+    limiter = ClientRateLimiter(stats, bytes_per_second=1, byte_burst=100)
+    now = limiter.bytes.updated
+    
+    assert limiter.allow("x" * 80, now)
+    assert not limiter.allow("x" * 80, now)
+    assert stats.throttled_bytes == 80
+
+
+def test_rate_limiter_rejects_oversized():
+    """Test that oversized messages are dropped before touching the buckets."""
+    stats = AdmissionStats()
+    limiter = ClientRateLimiter(stats, max_message_size=10)
+    
+    assert not limiter.allow("x" * 11)
+    assert stats.oversized_messages == 1
+    assert limiter.messages.tokens == limiter.messages.burst
+
+
+def test_rate_limiter_marks_abusive_clients():
+    """Test that sustained violations mark a client abusive, good traffic repays them."""
+    stats = AdmissionStats()
+    limiter = ClientRateLimiter(stats, messages_per_second=1, message_burst=1, max_violations=3)
+    now = limiter.messages.updated
+    
+    limiter.allow("{}", now)
+    limiter.allow("{}", now)
+    limiter.allow("{}", now)
+    assert not limiter.abusive
+    
+    assert limiter.allow("{}", now + 1)
+    assert limiter.violations == 1
+    
+    for _ in range(2):
+        limiter.allow("{}", now + 1)
+    assert limiter.abusive
+
+
+def test_admission_stats_as_dict():
+    """Test that stats serialize to a plain dictionary."""
+    stats = AdmissionStats(rejected_connections=2)
+    
+    assert stats.as_dict()["rejected_connections"] == 2
+    assert stats.as_dict()["kicked_clients"] == 0
\ No newline at end of file
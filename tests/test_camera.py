@@ -0,0 +1,66 @@
+import pytest
+from client.camera import Camera, SpatialGrid
+
+
+def test_camera_follow_centers_target():
+    """Test that the camera centers on the followed position."""
+    camera = Camera(800, 600, world_width=4000, world_height=3000)
+    
+    camera.follow(2000, 1500)
+    
+    assert camera.world_to_screen(2000, 1500) == (400, 300)
+    assert camera.view_rect() == (1600, 1200, 2400, 1800)
+
+
+def test_camera_clamps_to_world_edges():
+    """Test that the view never leaves the world."""
+    camera = Camera(800, 600, world_width=4000, world_height=3000)
+    
+    camera.follow(10, 10)
+    assert (camera.x, camera.y) == (0, 0)
+    
+    camera.follow(3990, 2990)
+    assert (camera.x, camera.y) == (3200, 2400)
+
+
+def test_camera_world_matching_view_is_identity():
+    """Test that a world the size of the window maps coordinates unchanged."""
+    camera = Camera(800, 600)
+    
+    camera.follow(123, 456)
+    
+    assert camera.world_to_screen(123, 456) == (123, 456)
+
+
+def test_camera_is_visible():
+    """Test circle visibility against the view."""
+    camera = Camera(800, 600, world_width=4000, world_height=3000)
+    camera.follow(2000, 1500)
+    
+    assert camera.is_visible(2000, 1500, 10)
+    assert not camera.is_visible(100, 100, 10)
+    
+    # Partially overlapping the left edge
+    assert camera.is_visible(1595, 1500, 10)
+
+
+def test_spatial_grid_query():
+    """Test that only points in overlapping cells are returned."""
+    grid = SpatialGrid(cell_size=100)
+    grid.rebuild([("a", 50, 50), ("b", 150, 50), ("c", 950, 950)])
+    
+    assert sorted(grid.query((0, 0, 99, 99))) == ["a"]
+    assert sorted(grid.query((0, 0, 199, 99))) == ["a", "b"]
+    assert grid.query((500, 500, 600, 600)) == []
+    
+    # A query larger than the occupied cells walks the cells instead
+    assert sorted(grid.query((-10000, -10000, 10000, 10000))) == ["a", "b", "c"]
+
+
+def test_spatial_grid_rebuild_replaces_contents():
+    """Test that rebuilding drops points from the previous snapshot."""
+    grid = SpatialGrid(cell_size=100)
+    grid.rebuild([("a", 50, 50)])
+    grid.rebuild([("b", 60, 60)])
+    
+    assert grid.query((0, 0, 99, 99)) == ["b"]
\ No newline at end of file
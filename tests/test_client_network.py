@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import websockets
+from client.network import NetworkThread, SnapshotMailbox
+
+
+def test_mailbox_drain_returns_in_order():
+    """Test that drained snapshots come out oldest first."""
+    mailbox = SnapshotMailbox()
+    
+    mailbox.put(1.0, {"players": []})
+    mailbox.put(2.0, {"players": []})
+    
+    assert [t for t, _ in mailbox.drain()] == [1.0, 2.0]
+    assert mailbox.drain() == []
+
+
+def test_mailbox_latest_wins():
+    """Test that a slow consumer only loses the oldest snapshots."""
+    mailbox = SnapshotMailbox(max_pending=3)
+    
+    for i in range(10):
+        mailbox.put(float(i), {})
+    
+    assert [t for t, _ in mailbox.drain()] == [7.0, 8.0, 9.0]
+
+
+def test_mailbox_concurrent_producer():
+    """Test draining while another thread publishes."""
+    mailbox = SnapshotMailbox(max_pending=100000)
+    count = 20000
+    
+    def produce():
+        for i in range(count):
+            mailbox.put(float(i), {})
+    
+    producer = threading.Thread(target=produce)
+    producer.start()
+    
+    received = []
+    while producer.is_alive():
+        received.extend(mailbox.drain())
+    producer.join()
+    received.extend(mailbox.drain())
+    
+    assert [t for t, _ in received] == [float(i) for i in range(count)]
+
+
+def test_stop_before_the_welcome():
+    """Test stopping while still waiting for the server's welcome."""
+    loop = asyncio.new_event_loop()
+    
+    async def silent(websocket, path):
+        await websocket.wait_closed()
+    
+    async def serve():
+        return await websockets.serve(silent, "127.0.0.1", 0)
+    
+    server = loop.run_until_complete(serve())
+    port = server.sockets[0].getsockname()[1]
+    serving = threading.Thread(target=loop.run_forever, daemon=True)
+    serving.start()
+    
+    network = NetworkThread(f"ws://127.0.0.1:{port}", SnapshotMailbox())
+    network.start()
+    try:
+        assert network.ready.wait(0.3) is False
+        network.stop()
+        assert not network.is_alive()
+    finally:
+        loop.call_soon_threadsafe(server.close)
+        asyncio.run_coroutine_threadsafe(server.wait_closed(), loop).result(5.0)
+        loop.call_soon_threadsafe(loop.stop)
+        serving.join()
+        loop.close()
\ No newline at end of file
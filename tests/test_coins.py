@@ -0,0 +1,58 @@
+from server.coins import CoinTimers
+from server.events import EventLog
+from server.game_state import Coin, GameState, PlayerState
+from server.scheduler import TimingWheel
+
+
+def make_timers(**kwargs):
+    game_state = GameState()
+    event_log = EventLog()
+    return game_state, event_log, CoinTimers(TimingWheel(0.1, 0.0), event_log, **kwargs)
+
+
+def test_coins_despawn_unless_collected():
+    """Test despawn timers, and that a collected coin's timer is cancelled."""
+    game_state, event_log, coins = make_timers(ttl=1.0)
+    kept = coins.place(game_state, (0.0, 0.0, 10.0, 10.0))
+    taken = coins.place(game_state, (700.0, 500.0, 710.0, 510.0))
+    game_state.players["p1"] = PlayerState(id="p1", x=taken.x, y=taken.y)
+    
+    assert coins.collect(game_state) == [("p1", taken.id)]
+    coins.scheduler.advance(1.0)
+    
+    assert game_state.coins == []
+    assert [event["type"] for event in event_log.drain()] == [
+        "coin_spawned", "coin_spawned", "coin_collected", "score", "coin_despawned"
+    ]
+    assert event_log.seq == 5 and kept.id not in coins.expiry
+
+
+def test_paused_coins_resume_with_the_time_they_had_left():
+    """Test pausing and resuming a despawn timer."""
+    game_state, _, coins = make_timers(ttl=2.0)
+    coin = coins.place(game_state)
+    coins.scheduler.advance(0.5)
+    
+    assert coins.pause(coin) == 1.5
+    assert coins.pause(coin) == 0.0
+    coins.scheduler.advance(3.0)
+    assert game_state.coins == [coin]
+    
+    coins.resume(game_state, coin, 1.5)
+    assert coins.remaining() == {coin.id: 1.5}
+    coins.scheduler.advance(4.5)
+    assert game_state.coins == []
+
+
+def test_waves_top_up_to_max_coins():
+    """Test that waves repeat and never take a world past max_coins."""
+    game_state, _, coins = make_timers(ttl=0.0, spawn_interval=1.0, wave_size=2, max_coins=3)
+    game_state.coins.append(Coin(id="c0", x=10.0, y=10.0))
+    coins.schedule_waves(lambda: [coins.place(game_state) for _ in range(coins.wave_count(len(game_state.coins)))])
+    
+    assert coins.next_wave() == 1.0
+    coins.scheduler.advance(1.0)
+    assert len(game_state.coins) == 3
+    coins.scheduler.advance(5.0)
+    assert len(game_state.coins) == 3
+    assert coins.expiry == {}
\ No newline at end of file
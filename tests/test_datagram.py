@@ -0,0 +1,212 @@
+import asyncio
+import json
+from benchmarks.loss_model import run_benchmark
+from client.datagram import DatagramClient, open_datagram_client
+from client.world import WorldModel
+from server.admission import AdmissionStats, ClientRateLimiter
+from server.datagram import DatagramEndpoint
+from server.encoder import encode_state_parts
+from server.game_state import GameState, PlayerState
+from server.priority import SnapshotPacker
+from server.protocol import create_datagram_state_header, create_sync_message, encode_message
+
+
+class FakeTransport:
+    def __init__(self):
+        self.sent = []
+    
+    def sendto(self, data, address=None):
+        self.sent.append((json.loads(data), address))
+    
+    def is_closing(self):
+        return False
+    
+    def close(self):
+        pass
+
+
+def make_endpoint(applied):
+    stats = AdmissionStats()
+    endpoint = DatagramEndpoint(
+        lambda player_id, message: applied.append((player_id, message["move"])),
+        stats,
+        lambda: ClientRateLimiter(stats)
+    )
+    endpoint.connection_made(FakeTransport())
+    return endpoint
+
+
+def datagram(**fields):
+    return json.dumps(fields).encode()
+
+
+def test_endpoint_applies_only_newer_input():
+    """Test that input older than the last applied is dropped on arrival."""
+    applied = []
+    endpoint = make_endpoint(applied)
+    session = endpoint.open_session("p1")
+    address = ("127.0.0.1", 5000)
+    
+    endpoint.datagram_received(datagram(type="input", token=session.token, seq=2, move="up"), address)
+    endpoint.datagram_received(datagram(type="input", token=session.token, seq=1, move="down"), address)
+    endpoint.datagram_received(datagram(type="input", token=session.token, seq=2, move="down"), address)
+    endpoint.datagram_received(datagram(type="input", token=session.token, seq=3, move="left"), address)
+    
+    assert applied == [("p1", "up"), ("p1", "left")]
+    assert session.stale == 2
+    assert endpoint.status()["stale"] == 2
+
+
+def test_endpoint_ignores_unknown_tokens_and_garbage():
+    """Test that only datagrams for an open session do anything."""
+    applied = []
+    endpoint = make_endpoint(applied)
+    session = endpoint.open_session("p1")
+    
+    endpoint.datagram_received(b"not json", ("127.0.0.1", 5000))
+    endpoint.datagram_received(datagram(type="input", seq=1, move="up"), ("127.0.0.1", 5000))
+    endpoint.datagram_received(datagram(type="input", token="guess", seq=1, move="up"), ("127.0.0.1", 5000))
+    endpoint.close_session(session)
+    endpoint.datagram_received(datagram(type="input", token=session.token, seq=1, move="up"), ("127.0.0.1", 5000))
+    
+    assert applied == []
+    assert endpoint.stats.decode_errors == 2
+    assert endpoint.bound_sessions() == {}
+
+
+def test_sessions_bind_follow_address_and_expire():
+    """Test binding on first datagram, rebinding on newer input, and unbinding when quiet."""
+    endpoint = make_endpoint([])
+    session = endpoint.open_session("p1")
+    assert endpoint.bound_sessions(now=0.0) == {}
+    
+    endpoint.datagram_received(datagram(type="hello", token=session.token), ("127.0.0.1", 5000), now=10.0)
+    assert endpoint.bound_sessions(now=10.0) == {"p1": session}
+    endpoint.datagram_received(datagram(type="hello", token=session.token), ("127.0.0.1", 6000), now=10.5)
+    assert session.address == ("127.0.0.1", 5000)
+    endpoint.datagram_received(datagram(type="input", token=session.token, seq=1, move="up"), ("127.0.0.1", 6000), now=11.0)
+    assert session.address == ("127.0.0.1", 6000)
+    
+    endpoint.send(session, '{"type": "state", "tick": 1}')
+    assert endpoint.transport.sent == [({"type": "state", "tick": 1}, ("127.0.0.1", 6000))]
+    assert endpoint.bound_sessions(now=11.0 + endpoint.timeout + 0.1) == {}
+
+
+def test_stale_input_does_not_move_the_session():
+    """Test that a delayed packet from the client's old address leaves the session where it is."""
+    applied = []
+    endpoint = make_endpoint(applied)
+    session = endpoint.open_session("p1")
+    old, new = ("127.0.0.1", 5000), ("127.0.0.1", 6000)
+    
+    endpoint.datagram_received(datagram(type="input", token=session.token, seq=1, move="up"), old)
+    endpoint.datagram_received(datagram(type="input", token=session.token, seq=3, move="left"), new)
+    endpoint.datagram_received(datagram(type="input", token=session.token, seq=2, move="down"), old)
+    endpoint.datagram_received(datagram(type="input", token=session.token, seq=3, move="left"), old)
+    
+    assert session.address == new
+    assert applied == [("p1", "up"), ("p1", "left")]
+    assert session.stale == 2
+
+
+def test_client_drops_stale_state_and_numbers_input():
+    """Test the client side: hello first, then ordered input and state."""
+    async def scenario():
+        states = []
+        transport = FakeTransport()
+        client = DatagramClient("tok", states.append)
+        client.connection_made(transport)
+        hello = [message for message, _ in transport.sent]
+        
+        client.datagram_received(datagram(type="state", tick=5), None)
+        client.datagram_received(datagram(type="state", tick=4), None)
+        client.datagram_received(datagram(type="state", tick=6), None)
+        client.send_input("up", 3)
+        client.send_input("stop")
+        client.connection_lost(None)
+        return client, states, hello, [message for message, _ in transport.sent[1:]]
+    
+    client, states, hello, sent = asyncio.run(scenario())
+    
+    assert hello == [{"type": "hello", "token": "tok"}]
+    assert [state["tick"] for state in states] == [5, 6]
+    assert client.stale == 1 and client.active
+    assert sent == [
+        {"type": "input", "token": "tok", "seq": 1, "move": "up", "trace": 3},
+        {"type": "input", "token": "tok", "seq": 2, "move": "stop"}
+    ]
+
+
+def test_datagram_round_trip_over_loopback():
+    """Test a session bound over a real UDP socket, both ways."""
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        applied = []
+        stats = AdmissionStats()
+        endpoint = DatagramEndpoint(
+            lambda player_id, message: applied.append(message["move"]),
+            stats,
+            lambda: ClientRateLimiter(stats)
+        )
+        transport, _ = await loop.create_datagram_endpoint(lambda: endpoint, local_addr=("127.0.0.1", 0))
+        port = transport.get_extra_info("sockname")[1]
+        session = endpoint.open_session("p1")
+        
+        states = []
+        client = await open_datagram_client("127.0.0.1", port, session.token, states.append)
+        for _ in range(50):
+            if endpoint.bound_sessions():
+                break
+            await asyncio.sleep(0.01)
+        endpoint.send(session, encode_message(create_datagram_state_header(1.0, 1)))
+        for _ in range(50):
+            if states:
+                break
+            await asyncio.sleep(0.01)
+        client.send_input("right")
+        for _ in range(50):
+            if applied:
+                break
+            await asyncio.sleep(0.01)
+        client.close()
+        transport.close()
+        return states, applied
+    
+    states, applied = asyncio.run(scenario())
+    
+    assert states == [{"type": "state", "timestamp": 1.0, "tick": 1}]
+    assert applied == ["right"]
+
+
+def test_state_datagram_fits_mtu_and_expands():
+    """Test that a packed state datagram fits one packet and rebuilds the world."""
+    game_state = GameState()
+    for i in range(200):
+        game_state.players[f"p{i}"] = PlayerState(id=f"p{i}", x=float(i * 4), y=100.0)
+    view = game_state.view()
+    parts = encode_state_parts(view)
+    header = encode_message(create_datagram_state_header(view.timestamp, 7))
+    
+    packer = SnapshotPacker(1200)
+    packet = packer.pack(view.players, header, parts.fragments, {"session": "p0"})["session"]
+    
+    assert len(packet) <= 1200
+    message = json.loads(packet)
+    assert message["tick"] == 7 and message["partial"]
+    assert message["players"][0]["id"] == "p0"
+    assert 1 < len(message["players"]) < 200
+    
+    world = WorldModel()
+    world.load_sync(create_sync_message(game_state, 0))
+    expanded = world.expand(message)
+    assert len(expanded["players"]) == len(message["players"])
+
+
+def test_loss_model_shows_head_of_line_blocking():
+    """Test that loss ages stream snapshots far more than datagrams."""
+    results = run_benchmark([0.0, 0.05], duration=20.0)["results"]
+    
+    lossless, lossy = results
+    assert lossless["stream"] == lossless["datagram"]
+    assert lossy["stream"]["p99_ms"] > 2 * lossy["datagram"]["p99_ms"]
+    assert lossy["stream"]["max_ms"] > lossy["datagram"]["max_ms"]
\ No newline at end of file
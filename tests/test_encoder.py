@@ -0,0 +1,65 @@
+import asyncio
+import json
+import pytest
+from server.game_state import GameState, PlayerState, Coin
+from server.encoder import StateEncoder, encode_state
+
+
+def make_state() -> GameState:
+    game_state = GameState(timestamp=12.5)
+    game_state.players["p1"] = PlayerState(id="p1", x=10, y=20, vx=1, score=3)
+    game_state.coins.append(Coin(id="c1", x=5, y=6, value=2))
+    return game_state
+
+
+def test_view_is_a_copy():
+    """Test that a view doesn't follow later changes to the game state."""
+    game_state = make_state()
+    view = game_state.view()
+    
+    game_state.players["p1"].x = 999
+    game_state.coins.clear()
+    
+    assert view.players[0][1] == 10
+    assert len(view.coins) == 1
+    with pytest.raises(AttributeError):
+        view.timestamp = 0
+
+
+def test_encode_state_sends_dynamic_fields_and_events():
+    """Test that state messages carry positions, velocities and the tick's events."""
+    events = [{"type": "score", "player_id": "p1", "score": 3}]
+    
+    decoded = json.loads(encode_state(make_state().view(), 7, events))
+    
+    assert decoded["type"] == "state"
+    assert decoded["timestamp"] == 12.5
+    assert decoded["seq"] == 7
+    assert decoded["events"] == events
+    assert decoded["players"] == [{"id": "p1", "x": 10, "y": 20, "vx": 1, "vy": 0.0}]
+    assert "coins" not in decoded and "ghosts" not in decoded
+
+
+def test_encode_state_appends_ghosts():
+    """Test that ghost entities are sent in full alongside the local ones."""
+    ghost = {"id": "g1", "x": 0, "y": 0, "vx": 0, "vy": 0, "score": 0, "color": [1, 2, 3], "radius": 20}
+    
+    decoded = json.loads(encode_state(make_state().view(), 0, [], [ghost], []))
+    
+    assert [p["id"] for p in decoded["players"]] == ["p1"]
+    assert decoded["ghosts"] == {"players": [ghost], "coins": []}
+
+
+@pytest.mark.parametrize("workers,use_processes", [(0, False), (2, False), (1, True)])
+def test_state_encoder_pools(workers, use_processes):
+    """Test that inline, thread and process encoding agree."""
+    view = make_state().view()
+    encoder = StateEncoder(workers, use_processes)
+    
+    async def encode():
+        return await encoder.submit(view)
+    
+    try:
+        assert asyncio.run(encode()) == encode_state(view)
+    finally:
+        encoder.shutdown()
\ No newline at end of file
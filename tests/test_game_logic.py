@@ -5,6 +5,7 @@ from server.game_logic import (
     set_player_velocity,
     check_collision,
     resolve_coin_collisions,
+    sweep_contact,
     spawn_coin,
     add_player,
     remove_player
@@ -181,4 +182,62 @@ def test_multiple_players_coin_collision():
     
     # Check that only one player's score increased
     total_score = player1.score + player2.score
-    assert total_score == 10
\ No newline at end of file
+    assert total_score == 10
+
+
+def test_spawn_within_bounds():
+    """Test that coins and players can be confined to part of the world."""
+    game_state = GameState(world_width=800, world_height=600)
+    bounds = (400, 0, 800, 300)
+    
+    for i in range(50):
+        coin = spawn_coin(game_state, bounds)
+        assert 400 <= coin.x <= 750
+        assert 50 <= coin.y <= 300
+        
+        player = add_player(game_state, f"p{i}", bounds)
+        assert 400 <= player.x <= 700
+        assert 100 <= player.y <= 300
+
+
+def test_sweep_contact():
+    """Test the time of first contact along a straight move."""
+    # Already touching at the start
+    assert sweep_contact(0, 0, 100, 0, 10, 5, 0, 10) == 0.0
+    # Reaches the coin (reach 20) after 30 of the 100 pixels
+    assert sweep_contact(0, 0, 100, 0, 10, 50, 0, 10) == pytest.approx(0.3)
+    # Passes wide, moves away, stops short, or stands still
+    assert sweep_contact(0, 0, 100, 0, 10, 50, 25, 10) == -1.0
+    assert sweep_contact(0, 0, -100, 0, 10, 50, 0, 10) == -1.0
+    assert sweep_contact(0, 0, 20, 0, 10, 50, 0, 10) == -1.0
+    assert sweep_contact(0, 0, 0, 0, 10, 50, 0, 10) == -1.0
+
+
+def test_fast_player_does_not_tunnel_through_coins():
+    """Test that a coin passed over during a long tick is still collected."""
+    game_state = GameState(world_width=800, world_height=600)
+    player = PlayerState(id="fast", x=100, y=100, vx=200, vy=0, radius=20)
+    idle = PlayerState(id="idle", x=400, y=400, radius=20)
+    game_state.players["fast"] = player
+    game_state.players["idle"] = idle
+    game_state.coins.append(Coin(id="passed", x=150, y=100, radius=10, value=2))
+    
+    # 100 pixels in one tick: the coin is only touched midway
+    starts = update_player_positions(game_state, 0.5)
+    assert starts == {"fast": (100, 100)}
+    assert not check_collision(player.x, player.y, player.radius, 150, 100, 10)
+    
+    assert resolve_coin_collisions(game_state, starts) == [("fast", "passed")]
+    assert player.score == 2
+
+
+def test_coin_goes_to_first_player_along_their_paths():
+    """Test that the earlier arrival wins when two paths cross a coin."""
+    game_state = GameState(world_width=800, world_height=600)
+    game_state.players["late"] = PlayerState(id="late", x=100, y=300, vx=200, vy=0)
+    game_state.players["early"] = PlayerState(id="early", x=300, y=160, vx=0, vy=200)
+    game_state.coins.append(Coin(id="coin1", x=280, y=300, radius=10))
+    
+    starts = update_player_positions(game_state, 1.0)
+    
+    assert resolve_coin_collisions(game_state, starts) == [("early", "coin1")]
\ No newline at end of file
@@ -0,0 +1,97 @@
+import gc
+import pytest
+from server.gc_control import GcController
+
+
+@pytest.fixture
+def controller_factory():
+    controllers = []
+    
+    def create(**kwargs):
+        controller = GcController(**kwargs)
+        controllers.append(controller)
+        return controller
+    
+    yield create
+    for controller in controllers:
+        controller.close()
+
+
+def test_counts_objects_allocated_per_tick(controller_factory):
+    """Test that a tick's allocations are counted, even across a collection."""
+    controller = controller_factory()
+    controller.start_tick()
+    kept = [[i] for i in range(500)]
+    gc.collect(0)
+    kept.extend([i] for i in range(500))
+    controller.start_tick()
+    
+    # Net of objects freed meanwhile, so only roughly the 1000 lists
+    assert 900 <= controller.tick_objects[-1] <= 1100
+    assert controller.status()["unscheduled"]["collections"] >= 1
+    assert controller.status()["tick_objects"]["max"] == controller.tick_objects[-1]
+
+
+def test_deferred_collections_run_in_slack(controller_factory):
+    """Test that deferring raises the threshold and collects between ticks."""
+    threshold = gc.get_threshold()
+    controller = controller_factory(defer=True, min_slack=0.001)
+    assert gc.get_threshold()[0] == threshold[0] * controller.headroom
+    
+    kept = [[i] for i in range(threshold[0] + 100)]
+    assert controller.due() is not None
+    assert controller.collect_in_slack(0.0005) is None
+    assert controller.collect_in_slack(0.05) is not None
+    assert controller.scheduled_collections == 1
+    assert gc.get_count()[0] < threshold[0]
+    
+    controller.close()
+    assert gc.get_threshold() == threshold
+    assert len(kept) > threshold[0]
+
+
+def test_slow_generations_wait_for_enough_slack(controller_factory):
+    """Test that a generation whose last pause doesn't fit is skipped."""
+    controller = controller_factory(defer=True)
+    controller.pauses = [0.0, 0.5, 0.5]
+    kept = [[i] for i in range(gc.get_threshold()[0] // controller.headroom + 100)]
+    
+    assert controller.due(0.01) == 0
+    assert len(kept) > 0
+
+
+def test_survivors_are_tallied_without_walking_the_heap(controller_factory, monkeypatch):
+    """Test that deciding on a full collection never counts the oldest generation."""
+    controller = controller_factory(defer=True)
+    kept = []
+    for _ in range(5):
+        kept.append([[i] for i in range(2000)])
+        gc.collect(1)
+    gc.collect(2)
+    actual = len(gc.get_objects(generation=2))
+    assert abs(controller._long_lived - actual) < actual * 0.05
+    
+    get_objects = gc.get_objects
+    
+    def young_only(generation=None):
+        assert generation in (0, 1)
+        return get_objects(generation=generation)
+    
+    monkeypatch.setattr(gc, "get_objects", young_only)
+    for _ in range(12):
+        kept.append([[i] for i in range(2000)])
+        gc.collect(1)
+    assert controller._pending > 12 * 2000 * 0.9
+    assert controller.due() == 2
+    assert len(kept) == 17
+
+
+def test_freeze_exempts_startup_objects(controller_factory):
+    """Test that freezing moves live objects out of the collector's reach."""
+    controller = controller_factory()
+    try:
+        assert controller.freeze() > 0
+        assert gc.get_count()[2] == 0
+        assert controller.status()["scheduled"]["collections"] == 1
+    finally:
+        gc.unfreeze()
\ No newline at end of file
@@ -0,0 +1,86 @@
+import os
+import socket
+import threading
+from server.game_state import GameState, PlayerState, Coin
+from server.hot_restart import (
+    encode_handoff,
+    decode_handoff,
+    send_handoff,
+    receive_handoff,
+    listen_for_successor,
+    connect_to_predecessor,
+    parse_resume_token
+)
+
+
+def make_state():
+    game_state = GameState(world_width=1600, world_height=1200, timestamp=123.5)
+    game_state.players["p1"] = PlayerState(
+        id="p1", x=10.5, y=20.25, vx=200, vy=0, score=7, color=(1, 2, 3), speed=250
+    )
+    game_state.coins.append(Coin(id="c1", x=300, y=400, value=5))
+    return game_state
+
+
+def test_game_state_snapshot_round_trip():
+    """Test that a snapshot restores every server-side field."""
+    restored = GameState.from_snapshot(decode_handoff(encode_handoff(make_state().to_snapshot())))
+    
+    assert restored.timestamp == 123.5
+    assert (restored.world_width, restored.world_height) == (1600, 1200)
+    assert restored.players["p1"] == make_state().players["p1"]
+    assert restored.coins == make_state().coins
+
+
+def test_send_and_receive_handoff_passes_fds():
+    """Test that file descriptors and a large payload cross a Unix socket."""
+    left, right = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener = socket.create_server(("127.0.0.1", 0))
+    payload = b"x" * (3 * 1024 * 1024)
+    
+    sender = threading.Thread(target=send_handoff, args=(left, [listener.fileno()], payload))
+    sender.start()
+    fds, received = receive_handoff(right)
+    sender.join()
+    
+    assert received == payload
+    assert len(fds) == 1
+    
+    # The received fd is the same listening socket
+    inherited = socket.socket(fileno=fds[0])
+    assert inherited.getsockname() == listener.getsockname()
+    
+    for sock in (inherited, listener, left, right):
+        sock.close()
+
+
+def test_connect_to_predecessor(tmp_path):
+    """Test the successor side of the handoff end to end."""
+    path = str(tmp_path / "handoff.sock")
+    server = listen_for_successor(path)
+    listener = socket.create_server(("127.0.0.1", 0))
+    
+    def old_process():
+        conn, _ = server.accept()
+        send_handoff(conn, [listener.fileno()], encode_handoff({"state": make_state().to_snapshot()}))
+        conn.close()
+    
+    thread = threading.Thread(target=old_process)
+    thread.start()
+    sockets, payload = connect_to_predecessor(path)
+    thread.join()
+    
+    assert sockets[0].getsockname() == listener.getsockname()
+    assert GameState.from_snapshot(payload["state"]).players["p1"].score == 7
+    
+    for sock in sockets + [listener, server]:
+        sock.close()
+    os.unlink(path)
+
+
+def test_parse_resume_token():
+    """Test extracting resume tokens from connection paths."""
+    assert parse_resume_token("/?resume=abc123") == "abc123"
+    assert parse_resume_token("/") is None
+    assert parse_resume_token("") is None
+    assert parse_resume_token("/?other=1") is None
\ No newline at end of file
@@ -1,6 +1,6 @@
 import pytest
 import time
-from client.interpolation import StateBuffer, lerp, interpolate_states
+from client.interpolation import StateBuffer, lerp, hermite, interpolate_states, extrapolate_state
 
 
 def test_lerp():
@@ -228,4 +228,201 @@ def test_interpolate_multiple_players():
     # Check p2 interpolation (0.25 between 100 and 200)
     assert p2["x"] == 125
     assert p2["y"] == 125
-    assert p2["score"] == 7
\ No newline at end of file
+    assert p2["score"] == 7
+
+
+def test_hermite_endpoints_and_linear_motion():
+    """Test Hermite interpolation hits endpoints and matches constant velocity."""
+    assert hermite(0, 100, 100, 100, 0.0, 1.0) == 0
+    assert hermite(0, 100, 100, 100, 1.0, 1.0) == 100
+    
+    # Constant velocity consistent with the endpoints is a straight line
+    assert hermite(0, 100, 100, 100, 0.5, 1.0) == pytest.approx(50)
+
+
+def test_interpolate_states_hermite():
+    """Test velocity-aware interpolation between two states."""
+    state1 = {
+        "players": [
+            {"id": "p1", "x": 0, "y": 0, "vx": 0, "vy": 0, "score": 0, "color": [255, 0, 0], "radius": 20}
+        ],
+        "coins": []
+    }
+    
+    state2 = {
+        "players": [
+            {"id": "p1", "x": 100, "y": 0, "vx": 0, "vy": 0, "score": 0, "color": [255, 0, 0], "radius": 20}
+        ],
+        "coins": []
+    }
+    
+    # Starting and ending at rest eases in, so the quarter point lags lerp
+    result = interpolate_states((1.0, state1), (2.0, state2), 1.25, use_hermite=True)
+    assert result["players"][0]["x"] < 25
+    
+    result = interpolate_states((1.0, state1), (2.0, state2), 1.5, use_hermite=True)
+    assert result["players"][0]["x"] == pytest.approx(50)
+
+
+def test_extrapolate_state():
+    """Test projecting players forward from their last velocity."""
+    state = {
+        "players": [
+            {"id": "p1", "x": 100, "y": 100, "vx": 200, "vy": -100, "score": 0, "color": [255, 0, 0], "radius": 20}
+        ],
+        "coins": [
+            {"id": "c1", "x": 50, "y": 50, "value": 1, "radius": 10}
+        ]
+    }
+    
+    result = extrapolate_state((1.0, state), 1.1, 0.25)
+    assert result["players"][0]["x"] == pytest.approx(120)
+    assert result["players"][0]["y"] == pytest.approx(90)
+    assert len(result["coins"]) == 1
+    
+    # Projection is capped at the extrapolation limit
+    result = extrapolate_state((1.0, state), 2.0, 0.25)
+    assert result["players"][0]["x"] == pytest.approx(150)
+    
+    # Source snapshot is left untouched
+    assert state["players"][0]["x"] == 100
+
+
+def test_state_buffer_extrapolates_when_snapshots_late():
+    """Test that the buffer keeps players moving past the newest snapshot."""
+    buffer = StateBuffer(interpolation_delay=0.1, extrapolation_limit=0.25)
+    
+    state1 = {
+        "players": [
+            {"id": "p1", "x": 100, "y": 100, "vx": 100, "vy": 0, "score": 0, "color": [255, 0, 0], "radius": 20}
+        ],
+        "coins": []
+    }
+    state2 = {
+        "players": [
+            {"id": "p1", "x": 110, "y": 100, "vx": 100, "vy": 0, "score": 0, "color": [255, 0, 0], "radius": 20}
+        ],
+        "coins": []
+    }
+    
+    buffer.add_snapshot(1.0, state1)
+    buffer.add_snapshot(1.1, state2)
+    
+    # Render time 1.2 is 0.1s past the newest snapshot
+    result = buffer.get_interpolated_state(now=1.3)
+    assert buffer.extrapolating
+    assert result["players"][0]["x"] == pytest.approx(120)
+    
+    # Without extrapolation the player freezes on the last snapshot
+    frozen = StateBuffer(interpolation_delay=0.1)
+    frozen.add_snapshot(1.0, state1)
+    frozen.add_snapshot(1.1, state2)
+    assert frozen.get_interpolated_state(now=1.3)["players"][0]["x"] == 110
+
+
+def test_state_buffer_blends_back_after_extrapolation():
+    """Test that corrections blend in smoothly when real data arrives."""
+    buffer = StateBuffer(interpolation_delay=0.0, extrapolation_limit=0.5, blend_time=0.2)
+    
+    def make_state(x, vx):
+        return {
+            "players": [
+                {"id": "p1", "x": x, "y": 0, "vx": vx, "vy": 0, "score": 0, "color": [255, 0, 0], "radius": 20}
+            ],
+            "coins": []
+        }
+    
+    buffer.add_snapshot(1.0, make_state(0, 100))
+    buffer.add_snapshot(1.1, make_state(10, 100))
+    
+    # Extrapolated guess assumes the player kept moving
+    guess = buffer.get_interpolated_state(now=1.2)
+    assert guess["players"][0]["x"] == pytest.approx(20)
+    
+    # In reality the player stopped at x=10
+    buffer.add_snapshot(1.2, make_state(10, 0))
+    
+    blended = buffer.get_interpolated_state(now=1.2)
+    assert not buffer.extrapolating
+    assert blended["players"][0]["x"] == pytest.approx(20)
+    
+    halfway = buffer.get_interpolated_state(now=1.3)
+    assert 10 < halfway["players"][0]["x"] < 20
+    
+    settled = buffer.get_interpolated_state(now=1.45)
+    assert settled["players"][0]["x"] == pytest.approx(10)
+
+
+def test_state_buffer_culls_to_view():
+    """Test that only entities near the view are interpolated."""
+    buffer = StateBuffer(interpolation_delay=0.0, cell_size=100)
+    
+    def make_state(offset):
+        return {
+            "players": [
+                {"id": "near", "x": 100 + offset, "y": 100, "vx": 0, "vy": 0, "score": 1, "color": [255, 0, 0], "radius": 20},
+                {"id": "far", "x": 3000 + offset, "y": 3000, "vx": 0, "vy": 0, "score": 9, "color": [0, 255, 0], "radius": 20}
+            ],
+            "coins": [
+                {"id": "c1", "x": 150, "y": 150, "value": 1, "radius": 10},
+                {"id": "c2", "x": 2500, "y": 2500, "value": 1, "radius": 10}
+            ]
+        }
+    
+    buffer.add_snapshot(1.0, make_state(0))
+    buffer.add_snapshot(2.0, make_state(10))
+    
+    result = buffer.get_interpolated_state(now=1.5, view=(0, 0, 800, 600))
+    
+    assert [p["id"] for p in result["players"]] == ["near"]
+    assert result["players"][0]["x"] == pytest.approx(105)
+    assert [c["id"] for c in result["coins"]] == ["c1"]
+    
+    # Off-screen leaders are still available to the scoreboard
+    assert [p["id"] for p in result["leaders"]] == ["far", "near"]
+    
+    # Without a view everything is interpolated as before
+    assert len(buffer.get_interpolated_state(now=1.5)["players"]) == 2
+
+
+def test_state_buffer_latest_position():
+    """Test looking up a player in the newest snapshot."""
+    state = {
+        "players": [
+            {"id": "p1", "x": 10, "y": 20, "vx": 0, "vy": 0, "score": 0, "color": [255, 0, 0], "radius": 20}
+        ],
+        "coins": []
+    }
+    
+    for cell_size in (0.0, 100.0):
+        buffer = StateBuffer(cell_size=cell_size)
+        assert buffer.latest_position("p1") is None
+        buffer.add_snapshot(1.0, state)
+        assert buffer.latest_position("p1") == (10, 20)
+        assert buffer.latest_position("missing") is None
+
+def test_index_reuses_coin_grid_for_shared_coins():
+    """Test that snapshots sharing a coin list share the coin grid."""
+    coins = [{"id": "c1", "x": 10, "y": 10, "value": 1, "radius": 10}]
+    buffer = StateBuffer(cell_size=64.0)
+    
+    buffer.add_snapshot(1.0, {"players": [], "coins": coins})
+    buffer.add_snapshot(2.0, {"players": [], "coins": coins})
+    buffer.add_snapshot(3.0, {"players": [], "coins": list(coins)})
+    
+    assert buffer.indices[1].coin_grid is buffer.indices[0].coin_grid
+    assert buffer.indices[2].coin_grid is not buffer.indices[1].coin_grid
+
+
+def test_interpolate_states_reuses_players_standing_still():
+    """Test that only moving players are copied."""
+    still = {"id": "p1", "x": 100, "y": 100, "vx": 0, "vy": 0, "score": 5, "color": [255, 0, 0], "radius": 20}
+    moving = {"id": "p2", "x": 200, "y": 100, "vx": 10, "vy": 0, "score": 1, "color": [0, 255, 0], "radius": 20}
+    state1 = {"players": [still, dict(moving, x=100)], "coins": []}
+    state2 = {"players": [still, moving], "coins": []}
+    
+    result = interpolate_states((1.0, state1), (2.0, state2), 1.5)
+    
+    assert result["players"][0] is still
+    assert result["players"][1] == dict(moving, x=150)
+    assert moving["x"] == 200
\ No newline at end of file
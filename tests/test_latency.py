@@ -0,0 +1,118 @@
+import json
+import pytest
+from client.latency import STAGES, LatencyTracer, percentile, percentiles
+from server.game_state import GameState
+from server.protocol import create_input_message, create_state_message
+from server.tracing import InputTracer
+
+
+def test_input_tracer_stamps_tick_and_drains_once():
+    """Test that traced inputs get the next tick's time and are sent once."""
+    tracer = InputTracer()
+    tracer.receive("p1", 7, now=10.00)
+    assert tracer.drain() == []
+    
+    tracer.tick(10.02)
+    tracer.receive("p1", 8, now=10.03)
+    
+    assert tracer.drain() == [{"player": "p1", "trace": 7, "received": 10.00, "tick": 10.02}]
+    assert tracer.drain() == []
+    tracer.tick(10.05)
+    assert [trace["trace"] for trace in tracer.drain()] == [8]
+
+
+def test_input_tracer_caps_pending():
+    """Test that a client can't grow the pending list without bound."""
+    tracer = InputTracer(max_pending=3)
+    for i in range(10):
+        tracer.receive("p1", i, now=0.0)
+    tracer.tick(1.0)
+    
+    assert len(tracer.drain()) == 3
+
+
+def test_latency_tracer_keeps_newest_samples():
+    """Test that only the newest max_samples traced inputs are kept."""
+    tracer = LatencyTracer(max_samples=3)
+    for i in range(5):
+        trace_id = tracer.begin(now=float(i))
+        echo = {"player": "p1", "trace": trace_id, "received": i + 0.01, "tick": i + 0.02}
+        tracer.arrived([echo], timestamp=i + 0.02, now=i + 0.03)
+        tracer.frame(render_time=i + 0.02, now=i + 0.04 + i / 1000)
+    
+    assert [round(record["total"], 3) for record in tracer.records] == [0.042, 0.043, 0.044]
+
+
+def test_traces_only_in_messages_that_have_them():
+    """Test the trace fields of input and state messages."""
+    view = GameState().view()
+    
+    assert "traces" not in create_state_message(view, 0, [])
+    traces = [{"player": "p1", "trace": 1, "received": 1.0, "tick": 1.1}]
+    assert create_state_message(view, 0, [], traces=traces)["traces"] == traces
+    assert "trace" not in create_input_message("p1", "up")
+    assert create_input_message("p1", "up", 3)["trace"] == 3
+
+
+def test_latency_tracer_splits_stages():
+    """Test one input followed through every stage."""
+    tracer = LatencyTracer()
+    trace_id = tracer.begin(now=100.000)
+    echo = {"player": "p1", "trace": trace_id, "received": 100.010, "tick": 100.025}
+    tracer.arrived([echo], timestamp=100.025, now=100.040)
+    
+    # Not drawn until a frame renders at or past the state's timestamp
+    assert tracer.frame(render_time=100.020, now=100.050) == 0
+    assert tracer.frame(render_time=100.030, now=100.140) == 1
+    
+    record = tracer.records[0]
+    assert record["uplink"] == pytest.approx(0.010)
+    assert record["queue"] == pytest.approx(0.015)
+    assert record["snapshot"] == pytest.approx(0.0)
+    assert record["downlink"] == pytest.approx(0.015)
+    assert record["render"] == pytest.approx(0.100)
+    assert record["total"] == pytest.approx(0.140)
+    assert sum(record[stage] for stage in STAGES[:-1]) == pytest.approx(record["total"])
+
+
+def test_latency_tracer_ignores_unknown_and_stale_inputs():
+    """Test echoes of forgotten inputs and inputs that never come back."""
+    tracer = LatencyTracer(timeout=1.0)
+    tracer.begin(now=0.0)
+    tracer.arrived([{"player": "p1", "trace": 99, "received": 0.1, "tick": 0.2}], timestamp=0.2, now=0.3)
+    
+    assert tracer.frame(render_time=0.5, now=0.6) == 0
+    tracer.frame(render_time=1.5, now=2.0)
+    assert tracer.inputs == {}
+    assert tracer.waiting == []
+
+
+def test_latency_summary_and_dump(tmp_path):
+    """Test percentiles per stage and the trace file."""
+    tracer = LatencyTracer()
+    for i in range(100):
+        start = float(i)
+        trace_id = tracer.begin(now=start)
+        echo = {"player": "p1", "trace": trace_id, "received": start, "tick": start}
+        tracer.arrived([echo], timestamp=start, now=start)
+        tracer.frame(render_time=start, now=start + (i + 1) / 1000)
+    
+    summary = tracer.summary()
+    assert summary["total"]["p50_ms"] == pytest.approx(50)
+    assert summary["total"]["p99_ms"] == pytest.approx(99)
+    assert len(tracer.overlay_lines()) == len(STAGES) + 1
+    
+    path = tmp_path / "trace.json"
+    tracer.dump(str(path))
+    data = json.loads(path.read_text())
+    assert set(data["summary"]) == set(STAGES)
+    assert len(data["traces"]) == 100
+
+
+def test_percentiles_match_single_ranks():
+    """Test that percentiles from one sort match percentile rank by rank."""
+    values = [float((i * 37) % 101) for i in range(101)]
+    
+    assert percentiles(values, (50, 90, 99)) == [percentile(values, pct) for pct in (50, 90, 99)]
+    assert percentiles(values, (0, 100)) == [0.0, 100.0]
+    assert percentiles([], (50, 99)) == [0.0, 0.0]
\ No newline at end of file
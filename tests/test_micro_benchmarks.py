@@ -0,0 +1,26 @@
+from benchmarks.micro import compare, run_suite
+
+
+def test_compare_flags_regressions():
+    """Test that only cases slower than the threshold count as regressed."""
+    baseline = {"results": {"a[n=10]": {"min_us": 100.0}, "b[n=10]": {"min_us": 100.0}}}
+    current = {"results": {
+        "a[n=10]": {"min_us": 120.0},
+        "b[n=10]": {"min_us": 130.0},
+        "c[n=10]": {"min_us": 999.0}
+    }}
+    
+    rows = {row["case"]: row for row in compare(baseline, current, threshold=0.25)}
+    
+    assert set(rows) == {"a[n=10]", "b[n=10]"}
+    assert not rows["a[n=10]"]["regressed"]
+    assert rows["b[n=10]"]["regressed"]
+
+
+def test_run_suite_keys_by_size():
+    """Test that scaled cases run once per size and the rest once."""
+    results = run_suite(sizes=[2, 3], name_filter="coin", repeats=1, min_time=0.0)["results"]
+    
+    assert set(results) == {"resolve_coin_collisions[n=2]", "resolve_coin_collisions[n=3]", "spawn_coin"}
+    assert results["spawn_coin"]["n"] is None
+    assert results["resolve_coin_collisions[n=3]"]["min_us"] > 0
\ No newline at end of file
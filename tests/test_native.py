@@ -0,0 +1,53 @@
+import os
+import pickle
+import pytest
+from benchmarks.ticks import run_benchmark
+from server.game_state import GameState, PlayerState
+from server.native import HOT_MODULES, ROOT, compiled_modules, source_paths
+from server.protocol import decode_message
+
+
+def test_hot_module_sources_exist():
+    """Test that every module the build compiles is where the build looks."""
+    for path in source_paths():
+        assert os.path.isfile(os.path.join(ROOT, path))
+    assert set(compiled_modules()) == set(HOT_MODULES)
+
+
+def test_int_fields_accepted_as_floats():
+    """Test that whole-number positions from JSON work in either build."""
+    state = GameState.from_dict({"players": [{"id": "p1", "x": 100, "y": 50, "color": [1, 2, 3]}]})
+    player = state.players["p1"]
+    player.vx = 3
+    
+    assert player.x == 100.0
+    assert player.vx == 3.0
+    assert player.color == (1, 2, 3)
+    assert PlayerState.from_record(player.to_record()) == player
+
+
+def test_state_view_pickles():
+    """Test that views survive the trip to an encoder process."""
+    state = GameState()
+    state.players["p1"] = PlayerState(id="p1", x=1.0, y=2.0)
+    view = state.view()
+    
+    assert pickle.loads(pickle.dumps(view)) == view
+
+
+def test_decode_message_rejects_non_objects():
+    """Test that valid JSON that isn't a message object is a decode error."""
+    assert decode_message('{"type": "input"}') == {"type": "input"}
+    with pytest.raises(ValueError):
+        decode_message("[1, 2]")
+    with pytest.raises(ValueError):
+        decode_message("not json")
+
+
+def test_tick_benchmark_runs():
+    """Test a short run of the ticks/sec benchmark."""
+    results = run_benchmark(players=20, duration=0.05)
+    
+    assert results["ticks"] > 0
+    assert results["ticks_per_second"] > 0
+    assert set(results["compiled"]) == set(HOT_MODULES)
\ No newline at end of file
@@ -0,0 +1,91 @@
+import asyncio
+import websockets
+from server.admission import AdmissionStats, ClientRateLimiter
+from server.network import NetworkManager
+
+
+class SlowClient:
+    """Stands in for a WebSocket whose sends take a while to drain."""
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.received = []
+    
+    async def send(self, message):
+        await asyncio.sleep(self.delay)
+        self.received.append(message)
+
+
+def test_slow_client_skips_to_the_newest_state():
+    """Test that states offered during a slow send coalesce into the newest one."""
+    async def scenario():
+        manager = NetworkManager(artificial_latency=0.0)
+        fast, slow = SlowClient(0.0), SlowClient(0.05)
+        manager.register_client(fast)
+        manager.register_client(slow)
+        for tick in range(5):
+            manager.publish_state(f"state {tick}")
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.2)
+        return manager, fast, slow
+    
+    manager, fast, slow = asyncio.run(scenario())
+    
+    assert fast.received == [f"state {tick}" for tick in range(5)]
+    assert slow.received[0] == "state 0"
+    assert slow.received[-1] == "state 4"
+    assert len(slow.received) < 5
+    assert manager.skipped_states == 5 - len(slow.received)
+    assert not manager._senders
+
+
+def test_overrides_replace_the_shared_state():
+    """Test that a client in overrides gets its own message."""
+    async def scenario():
+        manager = NetworkManager(artificial_latency=0.0)
+        one, other = SlowClient(0.0), SlowClient(0.0)
+        manager.register_client(one)
+        manager.register_client(other)
+        manager.publish_state("full", {other: "packed"})
+        await asyncio.sleep(0.05)
+        return one, other
+    
+    one, other = asyncio.run(scenario())
+    
+    assert one.received == ["full"]
+    assert other.received == ["packed"]
+
+
+class ScriptedClient:
+    """Stands in for a WebSocket that receives a fixed list of messages."""
+    
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.failed = None
+    
+    async def recv(self):
+        if not self.messages:
+            raise websockets.exceptions.ConnectionClosedOK(None, None)
+        return self.messages.pop(0)
+    
+    def fail_connection(self, code, reason):
+        self.failed = code
+
+
+def test_client_messages_decodes_and_drops_bad_ones():
+    """Test that client_messages yields decoded messages and counts undecodable ones."""
+    async def scenario(client, limiter):
+        manager = NetworkManager(artificial_latency=0.0)
+        return [message async for message in manager.client_messages(client, limiter)]
+    
+    stats = AdmissionStats()
+    client = ScriptedClient(['{"type": "input", "move": "up"}', "not json", "x" * 100, '{"type": "sync_request"}'])
+    messages = asyncio.run(scenario(client, ClientRateLimiter(stats, max_message_size=50)))
+    
+    assert [message["type"] for message in messages] == ["input", "sync_request"]
+    assert (stats.decode_errors, stats.oversized_messages) == (1, 1)
+    
+    # A client that keeps flooding is cut off
+    flooder = ScriptedClient(["x" * 100] * 10)
+    assert asyncio.run(scenario(flooder, ClientRateLimiter(stats, max_message_size=50, max_violations=3))) == []
+    assert flooder.failed == 1008 and stats.kicked_clients == 1
\ No newline at end of file
@@ -0,0 +1,70 @@
+import pytest
+from server.overload import OverloadController, LEVELS
+
+
+def run(controller, duration, ticks):
+    """Record the same tick duration repeatedly; returns the level changes."""
+    changes = []
+    for _ in range(ticks):
+        level = controller.record(duration)
+        if level is not None:
+            changes.append(level)
+    return changes
+
+
+def test_stays_normal_within_budget():
+    """Test that ticks inside the budget never degrade the server."""
+    controller = OverloadController(budget=0.033)
+    
+    assert run(controller, 0.02, 500) == []
+    assert controller.policy.name == "normal"
+    assert controller.should_send()
+
+
+def test_escalates_one_level_at_a_time():
+    """Test that sustained overload steps through the levels in order."""
+    controller = OverloadController(budget=0.033, escalate_ticks=10)
+    
+    assert run(controller, 0.1, 100) == [1, 2, 3, 4]
+    assert not controller.policy.accept_joins
+    assert not controller.policy.spawn_coins
+    assert controller.policy.interest_scale < 1.0
+
+
+def test_short_spike_is_ignored():
+    """Test that a brief spike doesn't change the level."""
+    controller = OverloadController(budget=0.033, escalate_ticks=10)
+    
+    run(controller, 0.01, 20)
+    assert run(controller, 0.2, 2) == []
+    assert run(controller, 0.01, 50) == []
+    assert controller.level == 0
+
+
+def test_recovers_with_hysteresis():
+    """Test that recovery needs load well below the escalation threshold."""
+    controller = OverloadController(budget=0.1, high=0.9, low=0.5, escalate_ticks=5, recover_ticks=20)
+    run(controller, 0.2, 200)
+    level = controller.level
+    assert level > 0
+    
+    # Between the thresholds: hold the current level
+    assert run(controller, 0.07, 200) == []
+    assert controller.level == level
+    
+    # Below the low threshold: step back down to normal
+    assert run(controller, 0.01, 500) == list(range(level - 1, -1, -1))
+
+
+def test_send_interval():
+    """Test that degraded levels skip snapshot broadcasts."""
+    controller = OverloadController(budget=0.033)
+    controller.level = 1
+    
+    sent = 0
+    for _ in range(10):
+        controller.record(0.02)
+        sent += controller.should_send()
+    
+    assert LEVELS[1].send_interval == 2
+    assert sent == 5
\ No newline at end of file
@@ -0,0 +1,99 @@
+import pytest
+from server.game_state import GameState, PlayerState, Coin
+from server.partition import GhostManifests, RegionMap, ghosts_for, resolve_ghost_collisions
+
+
+def test_region_map_layout():
+    """Test that regions tile the world in row-major order."""
+    region_map = RegionMap(800, 600, cols=2, rows=2, urls=["ws://a", "ws://b", "ws://c", "ws://d"])
+    
+    assert region_map.partitioned
+    assert region_map.regions[1].bounds == (400, 0, 800, 300)
+    assert region_map.regions[2].bounds == (0, 300, 400, 600)
+    assert region_map.regions[3].url == "ws://d"
+
+
+def test_region_map_from_config():
+    """Test parsing REGION_GRID and REGION_NODES values."""
+    region_map = RegionMap.from_config(800, 600, "2x1", "ws://localhost:8765, ws://localhost:8766")
+    
+    assert len(region_map.regions) == 2
+    assert region_map.regions[1].url == "ws://localhost:8766"
+    assert not RegionMap.from_config(800, 600, "1x1", "").partitioned
+
+
+def test_region_at_clamps_outside_points():
+    """Test that positions map to the owning region, clamped to the world."""
+    region_map = RegionMap(800, 600, cols=2, rows=1)
+    
+    assert region_map.region_at(100, 100).index == 0
+    assert region_map.region_at(400, 100).index == 1
+    assert region_map.region_at(-50, 100).index == 0
+    assert region_map.region_at(900, 700).index == 1
+
+
+def test_owner_hysteresis():
+    """Test that ownership only changes once an entity is well past a border."""
+    region_map = RegionMap(800, 600, cols=2, rows=1)
+    left = region_map.regions[0]
+    
+    assert region_map.owner(left, 410, 100, hysteresis=20) is left
+    assert region_map.owner(left, 430, 100, hysteresis=20).index == 1
+
+
+def test_neighbours():
+    """Test that neighbours include diagonal regions within the margin."""
+    region_map = RegionMap(900, 900, cols=3, rows=3)
+    center = region_map.regions[4]
+    corner = region_map.regions[0]
+    
+    assert len(region_map.neighbours(center, 10)) == 8
+    assert sorted(r.index for r in region_map.neighbours(corner, 10)) == [1, 3, 4]
+
+
+def test_ghosts_for_selects_border_entities():
+    """Test that only entities near a neighbour are mirrored to it."""
+    region_map = RegionMap(800, 600, cols=2, rows=1)
+    game_state = GameState()
+    game_state.players["near"] = PlayerState(id="near", x=350, y=100)
+    game_state.players["far"] = PlayerState(id="far", x=50, y=100)
+    game_state.coins.append(Coin(id="c1", x=390, y=300))
+    
+    players, coins = ghosts_for(game_state.view(), region_map.regions[1], margin=100)
+    
+    assert [p["id"] for p in players] == ["near"]
+    assert [c["id"] for c in coins] == ["c1"]
+
+
+def test_resolve_ghost_collisions():
+    """Test that ghost players collect local coins and are credited remotely."""
+    game_state = GameState()
+    game_state.coins.append(Coin(id="c1", x=100, y=100, value=5))
+    game_state.coins.append(Coin(id="c2", x=500, y=500, value=1))
+    ghost = {"id": "g1", "x": 105, "y": 100, "radius": 20}
+    
+    credits = resolve_ghost_collisions(game_state, [ghost])
+    
+    assert credits == [("g1", "c1", 5)]
+    assert [c.id for c in game_state.coins] == ["c2"]
+
+
+def test_ghost_manifests_announce_only_changes():
+    """Test that static ghost fields are announced when new, changed or gone."""
+    manifests = GhostManifests()
+    ghost = {"id": "g1", "x": 1, "y": 2, "vx": 0, "vy": 0, "color": [1, 2, 3], "radius": 20, "score": 0}
+    coin = {"id": "gc1", "x": 5, "y": 6, "value": 1, "radius": 10}
+    
+    players, coins, removed_players, removed_coins = manifests.update([ghost], [coin])
+    assert players == [{"id": "g1", "color": [1, 2, 3], "radius": 20, "score": 0}]
+    assert coins == [coin] and removed_players == [] and removed_coins == []
+    
+    # Moving is not news
+    assert manifests.update([dict(ghost, x=40)], [coin]) == ([], [], [], [])
+    
+    players, _, _, _ = manifests.update([dict(ghost, score=3)], [coin])
+    assert players == [{"id": "g1", "color": [1, 2, 3], "radius": 20, "score": 3}]
+    assert manifests.sync() == {"players": players, "coins": [coin]}
+    
+    assert manifests.update([], []) == ([], [], ["g1"], ["gc1"])
+    assert manifests.sync() == {"players": [], "coins": []}
\ No newline at end of file
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import websockets
+from server.peers import PeerLink
+
+
+def test_link_authenticates_and_passes_replies_on():
+    """Test that the secret is presented and the peer's acks reach on_message."""
+    async def scenario():
+        headers = []
+        replies = []
+        
+        async def peer(websocket, path):
+            headers.append(websocket.request_headers["Authorization"])
+            async for message in websocket:
+                handoff = json.loads(message)
+                await websocket.send(json.dumps({"type": "peer_handoff_ack", "player_id": handoff["player"][0]}))
+        
+        async with websockets.serve(peer, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            link = PeerLink(f"ws://127.0.0.1:{port}", "s3cret", replies.append, reconnect_delay=0.05)
+            task = asyncio.create_task(link.run())
+            while not link.connected:
+                await asyncio.sleep(0.01)
+            assert link.send({"type": "peer_handoff", "player": ["p1"]})
+            while not replies:
+                await asyncio.sleep(0.01)
+            task.cancel()
+        return headers, replies
+    
+    headers, replies = asyncio.run(scenario())
+    
+    assert headers == ["Bearer s3cret"]
+    assert replies == [{"type": "peer_handoff_ack", "player_id": "p1"}]
+
+
+def test_undelivered_messages_survive_a_dropped_link():
+    """Test that handoffs and scores queued for a dead connection go out on the next one."""
+    async def scenario():
+        received = []
+        connections = 0
+        
+        async def peer(websocket, path):
+            nonlocal connections
+            connections += 1
+            if connections == 1:
+                return  # Drop the first connection straight away
+            async for message in websocket:
+                received.append(json.loads(message)["type"])
+        
+        async with websockets.serve(peer, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            link = PeerLink(f"ws://127.0.0.1:{port}", "s3cret", reconnect_delay=0.05)
+            link.connected = True  # Queue before the first connection is up
+            link.send({"type": "peer_ghosts"})
+            link.send({"type": "peer_handoff"})
+            link.send({"type": "peer_score"})
+            task = asyncio.create_task(link.run())
+            for _ in range(200):
+                if len(received) == 2:
+                    break
+                await asyncio.sleep(0.01)
+            task.cancel()
+        return received, connections
+    
+    received, connections = asyncio.run(scenario())
+    
+    assert connections == 2
+    assert received == ["peer_handoff", "peer_score"]  # Stale ghosts are dropped
+
+
+def test_queue_is_bounded():
+    """Test that a full link refuses messages rather than growing."""
+    async def scenario():
+        link = PeerLink("ws://127.0.0.1:1", "s3cret", max_queue=2)
+        link.connected = True
+        return [link.send({"type": "peer_score"}) for _ in range(3)], link.dropped
+    
+    sent, dropped = asyncio.run(scenario())
+    
+    assert sent == [True, True, False]
+    assert dropped == 1
\ No newline at end of file
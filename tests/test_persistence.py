@@ -0,0 +1,203 @@
+import asyncio
+import sqlite3
+import threading
+from server.persistence import ScoreStore, parse_player_name
+
+
+def test_parse_player_name():
+    """Test names from the connection path."""
+    assert parse_player_name("/?name=alice") == "alice"
+    assert parse_player_name("/?resume=abc&name=%20bob%20") == "bob"
+    assert parse_player_name("/?name=") is None
+    assert parse_player_name("/") is None
+    assert len(parse_player_name("/?name=" + "x" * 100)) == 32
+
+
+def test_updates_are_batched_into_one_transaction(tmp_path):
+    """Test coalesced scores and results written together, and read back."""
+    path = str(tmp_path / "stats.db")
+    
+    async def scenario():
+        store = ScoreStore(path, flush_interval=60.0)
+        await store.open()
+        assert await store.load("alice") is None
+        
+        for score in (1, 3, 8):
+            store.update_score("alice", score)
+        store.update_score("bob", 2)
+        await store.record_result("bob", 4, 10.0, 70.0)
+        assert store.status()["pending_scores"] == 2
+        
+        assert await store.flush() == 3
+        assert await store.flush() == 0
+        stats = await store.load("alice"), await store.load("bob")
+        await store.close()
+        return store, stats
+    
+    store, (alice, bob) = asyncio.run(scenario())
+    
+    assert store.flushes == 1
+    assert (alice["matches"], alice["best_score"], alice["last_score"]) == (0, 8, 8)
+    assert (bob["matches"], bob["total_score"], bob["best_score"], bob["last_score"]) == (1, 4, 4, 4)
+    connection = sqlite3.connect(path)
+    assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    assert connection.execute("SELECT name, score, started, ended FROM results").fetchall() == [("bob", 4, 10.0, 70.0)]
+    connection.close()
+
+
+def test_full_queue_holds_back_results_until_flushed(tmp_path):
+    """Test backpressure: recording waits while max_pending results are queued."""
+    async def scenario():
+        store = ScoreStore(str(tmp_path / "stats.db"), flush_interval=60.0, max_pending=2)
+        await store.open()
+        await store.record_result("a", 1, 0.0, 1.0)
+        await store.record_result("b", 1, 0.0, 1.0)
+        
+        blocked = asyncio.create_task(store.record_result("c", 1, 0.0, 1.0))
+        await asyncio.sleep(0.01)
+        waiting = not blocked.done()
+        await store.flush()
+        await asyncio.wait_for(blocked, 1.0)
+        await store.close()
+        return waiting, store.written
+    
+    waiting, written = asyncio.run(scenario())
+    
+    assert waiting
+    assert written == 3
+
+
+def test_flusher_writes_in_the_background(tmp_path):
+    """Test periodic flushing, and that close writes what is left."""
+    path = str(tmp_path / "stats.db")
+    
+    async def scenario():
+        store = ScoreStore(path, flush_interval=0.01)
+        await store.open()
+        store.update_score("alice", 5)
+        await asyncio.sleep(0.1)
+        flushed = store.flushes
+        await store.record_result("alice", 6, 0.0, 1.0)
+        await store.close()
+        return flushed
+    
+    assert asyncio.run(scenario()) >= 1
+    
+    async def reopen():
+        store = ScoreStore(path)
+        await store.open()
+        stats = await store.load("alice")
+        await store.close()
+        return stats
+    
+    stats = asyncio.run(reopen())
+    assert (stats["matches"], stats["best_score"]) == (1, 6)
+
+
+def test_failed_flush_keeps_the_batch(tmp_path, monkeypatch):
+    """Test that a batch whose write fails is retried, under newer scores."""
+    path = str(tmp_path / "stats.db")
+    
+    async def scenario():
+        store = ScoreStore(path, flush_interval=60.0, max_pending=2)
+        await store.open()
+        store.update_score("alice", 3)
+        store.update_score("bob", 1)
+        await store.record_result("bob", 1, 0.0, 1.0)
+        await store.record_result("carol", 2, 0.0, 1.0)
+        
+        write = store._write
+        
+        def failing_write(*args):
+            raise sqlite3.OperationalError("disk I/O error")
+        
+        monkeypatch.setattr(store, "_write", failing_write)
+        try:
+            await store.flush()
+        except sqlite3.OperationalError:
+            pass
+        else:
+            raise AssertionError("flush should fail")
+        
+        # Newer scores win; the failed results still hold the queue's bound
+        store.update_score("alice", 9)
+        blocked = asyncio.create_task(store.record_result("dave", 3, 0.0, 1.0))
+        await asyncio.sleep(0)
+        assert store.status()["pending_results"] == 3
+        
+        monkeypatch.setattr(store, "_write", write)
+        assert await store.flush() == 4  # alice, bob and the two retried results
+        await asyncio.wait_for(blocked, 1.0)
+        assert await store.flush() == 1
+        stats = {name: await store.load(name) for name in ("alice", "bob", "carol", "dave")}
+        await store.close()
+        return stats
+    
+    stats = asyncio.run(scenario())
+    
+    assert stats["alice"]["last_score"] == 9
+    assert stats["bob"]["matches"] == 1
+    assert stats["carol"]["matches"] == 1
+    assert stats["dave"]["matches"] == 1
+
+
+def test_close_waits_for_a_write_under_way(tmp_path, monkeypatch):
+    """Test that a background write failing during close is kept for the final flush."""
+    path = str(tmp_path / "stats.db")
+    started = threading.Event()
+    release = threading.Event()
+    
+    async def scenario():
+        store = ScoreStore(path, flush_interval=0.01)
+        await store.open()
+        write = store._write
+        
+        def stalled_write(*args):
+            monkeypatch.setattr(store, "_write", write)
+            started.set()
+            release.wait(1.0)
+            raise sqlite3.OperationalError("disk I/O error")
+        
+        monkeypatch.setattr(store, "_write", stalled_write)
+        await store.record_result("alice", 6, 0.0, 1.0)
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        closing = asyncio.create_task(store.close())
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.wait_for(closing, 1.0)
+        return store
+    
+    store = asyncio.run(scenario())
+    
+    assert (store.failed, store.flushes, store.written) == (1, 1, 1)
+    connection = sqlite3.connect(path)
+    assert connection.execute("SELECT matches FROM players WHERE name = 'alice'").fetchone() == (1,)
+    connection.close()
+
+
+def test_close_releases_the_database_when_the_final_flush_fails(tmp_path, monkeypatch):
+    """Test that the connection and writer thread are closed even if the last write fails."""
+    async def scenario():
+        store = ScoreStore(str(tmp_path / "stats.db"), flush_interval=60.0)
+        await store.open()
+        
+        def failing_write(*args):
+            raise sqlite3.OperationalError("disk I/O error")
+        
+        monkeypatch.setattr(store, "_write", failing_write)
+        store.update_score("alice", 3)
+        try:
+            await store.close()
+        except sqlite3.OperationalError:
+            pass
+        else:
+            raise AssertionError("close should fail")
+        return store
+    
+    store = asyncio.run(scenario())
+    
+    assert store.failed == 1
+    assert store.scores == {"alice": 3}
+    assert store.connection is None
+    assert store.executor._shutdown
\ No newline at end of file
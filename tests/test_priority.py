@@ -0,0 +1,169 @@
+import json
+import math
+import random
+from client.world import WorldModel
+from server.encoder import encode_state_parts
+from server.game_state import GameState, PlayerState
+from server.priority import PriorityAccumulator, SnapshotPacker
+from server.protocol import create_sync_message
+
+
+def row(player_id, x, y, vx=0.0, vy=0.0):
+    return (player_id, x, y, vx, vy, 0, (1, 2, 3), 20.0)
+
+
+def test_own_player_first_and_budget_respected():
+    """Test that the viewer's player leads and the rest fit the budget."""
+    players = [row("far", 2000.0, 0.0), row("me", 0.0, 0.0), row("near", 50.0, 0.0)]
+    accumulator = PriorityAccumulator()
+    
+    assert accumulator.select(players, [10, 10, 10], "me", budget=21) == [1, 2]
+    assert accumulator.select(players, [10, 10, 10], "me", budget=5) == [1]
+
+
+def test_nearby_sent_more_often_but_everyone_comes_round():
+    """Test send rates follow distance without starving distant players."""
+    players = [row("me", 0.0, 0.0)] + [row(f"p{i}", i * 200.0, 0.0) for i in range(1, 11)]
+    sizes = [10] * len(players)
+    accumulator = PriorityAccumulator(falloff=400.0)
+    sent = {p[0]: 0 for p in players}
+    
+    for _ in range(300):
+        for i in accumulator.select(players, sizes, "me", budget=33):
+            sent[players[i][0]] += 1
+    
+    assert sent["me"] == 300
+    assert sent["p1"] > sent["p5"] > sent["p10"] > 0
+    assert sum(sent.values()) - sent["me"] == 300 * 2
+
+
+def test_moving_players_outrank_idle_ones():
+    """Test that speed raises priority at equal distance."""
+    players = [row("me", 0.0, 0.0), row("idle", 300.0, 0.0), row("moving", -300.0, 0.0, vx=200.0)]
+    accumulator = PriorityAccumulator()
+    
+    assert accumulator.select(players, [10, 10, 10], "me", budget=21) == [0, 2]
+
+
+def test_partial_sort_picks_what_a_full_sort_would():
+    """Test selection against packing a fully sorted candidate list."""
+    rng = random.Random(3)
+    players = [row("me", 0.0, 0.0)] + [
+        row(f"p{i}", rng.uniform(-2000, 2000), rng.uniform(-2000, 2000), rng.uniform(-300, 300)) for i in range(200)
+    ]
+    sizes = [rng.randint(40, 70) for _ in players]
+    accumulator = PriorityAccumulator()
+    
+    for _ in range(20):
+        previous = dict(accumulator.priority)
+        chosen = accumulator.select(players, sizes, "me", budget=900)
+        
+        expected = [0]
+        used = sizes[0]
+        ranked = sorted(
+            range(1, len(players)),
+            key=lambda i: previous.get(players[i][0], 0.0) + weight_of(players[i]),
+            reverse=True
+        )
+        for i in ranked:
+            if used + sizes[i] + 1 > 900:
+                break
+            used += sizes[i] + 1
+            expected.append(i)
+        assert chosen == expected
+
+
+def weight_of(player, falloff=400.0, speed_scale=200.0):
+    distance = math.hypot(player[1], player[2])
+    speed = math.hypot(player[3], player[4])
+    return (1.0 + speed / speed_scale) / (1.0 + distance / falloff)
+
+
+def test_departed_players_and_viewers_are_forgotten():
+    """Test that accumulators only track current players and viewers."""
+    packer = SnapshotPacker(budget=10000)
+    parts = encode_state_parts(view_of([("a", 0.0), ("b", 10.0)]))
+    
+    packer.pack([row("a", 0.0, 0.0), row("b", 10.0, 0.0)], parts.header, parts.fragments, {"ws1": "a", "ws2": "b"})
+    packer.pack([row("a", 0.0, 0.0)], parts.header, parts.fragments[:1], {"ws1": "a"})
+    
+    assert set(packer.accumulators) == {"ws1"}
+    assert set(packer.accumulators["ws1"].priority) == set()
+
+
+def test_interest_scale_sends_distant_players_less():
+    """Test that a smaller interest scale favours nearby players more."""
+    players = [row("me", 0.0, 0.0), row("near", 100.0, 0.0), row("far", 1600.0, 0.0)]
+    game_state = GameState()
+    for player_id, x, _, _, _, _, _, _ in players:
+        game_state.players[player_id] = PlayerState(id=player_id, x=x, y=0.0)
+    parts = encode_state_parts(game_state.view())
+    budget = len(parts.header) + 40 + len(parts.fragments[0]) + len(parts.fragments[1]) + 1
+    
+    far_sent = {}
+    for scale in (1.0, 0.5):
+        packer = SnapshotPacker(budget, falloff=400.0)
+        far_sent[scale] = sum(
+            '"far"' in packer.pack(players, parts.header, parts.fragments, {"ws": "me"}, scale)["ws"]
+            for _ in range(200)
+        )
+    
+    assert 0 < far_sent[0.5] < far_sent[1.0]
+
+
+def view_of(players):
+    game_state = GameState()
+    for player_id, x in players:
+        game_state.players[player_id] = PlayerState(id=player_id, x=x, y=100.0)
+    return game_state.view()
+
+
+def test_packed_messages_are_valid_and_capped():
+    """Test spliced per-client messages against the budget."""
+    view = view_of([(f"p{i}", i * 10.0) for i in range(50)])
+    events = [{"type": "score", "player_id": "p1", "score": 3}]
+    parts = encode_state_parts(view, seq=7, events=events)
+    packer = SnapshotPacker(budget=600)
+    
+    messages = packer.pack(view.players, parts.header, parts.fragments, {"ws": "p25"})
+    message = json.loads(messages["ws"])
+    
+    assert len(messages["ws"]) <= 600
+    assert message["partial"] is True
+    assert message["seq"] == 7 and message["events"] == events
+    assert message["players"][0]["id"] == "p25"
+    assert 1 < len(message["players"]) < 50
+    assert len(json.loads(parts.full)["players"]) == 50
+
+
+def test_world_carries_forward_players_left_out():
+    """Test that partial states keep unsent players moving."""
+    game_state = GameState()
+    game_state.players["a"] = PlayerState(id="a", x=100.0, y=100.0)
+    game_state.players["b"] = PlayerState(id="b", x=300.0, y=100.0)
+    game_state.players["c"] = PlayerState(id="c", x=700.0, y=100.0)
+    world = WorldModel()
+    world.world_size = (800.0, 600.0)
+    world.load_sync(create_sync_message(game_state, seq=0))
+    
+    def partial(timestamp, players):
+        return {"type": "state", "timestamp": timestamp, "seq": 0, "events": [], "partial": True, "players": players}
+    
+    sent = [
+        {"id": "a", "x": 100.0, "y": 100.0, "vx": 0.0, "vy": 0.0},
+        {"id": "b", "x": 300.0, "y": 100.0, "vx": 200.0, "vy": 0.0},
+        {"id": "c", "x": 700.0, "y": 100.0, "vx": 200.0, "vy": 0.0}
+    ]
+    assert len(world.expand(partial(1.0, sent))["players"]) == 3
+    
+    state = world.expand(partial(1.5, sent[:1]))
+    players = {p["id"]: p for p in state["players"]}
+    assert players["b"]["x"] == 400.0
+    assert players["b"]["color"] == game_state.players["b"].color
+    # Kept in the world
+    assert players["c"]["x"] == 780.0
+    
+    # Carried at most CARRY_LIMIT seconds
+    state = world.expand(partial(5.0, sent[:1]))
+    players = {p["id"]: p for p in state["players"]}
+    assert players["b"]["x"] == 500.0
\ No newline at end of file
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import pytest
+import websockets
+from client.world import WorldModel
+from relay.fanout import DelayBuffer, Viewer
+from relay.main import Relay
+
+
+class SlowWebSocket:
+    """Records sent messages; each send takes a while."""
+    
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = []
+    
+    async def send(self, message):
+        await asyncio.sleep(self.delay)
+        self.sent.append(message)
+
+
+def frame(seq, events=()):
+    return json.dumps({"type": "state", "timestamp": seq, "seq": seq, "events": list(events), "players": []})
+
+
+def test_delay_buffer_releases_in_order():
+    """Test that frames come out in order once their delay has passed."""
+    buffer = DelayBuffer(delay=1.0)
+    buffer.push("a", now=0.0)
+    buffer.push("b", now=0.5)
+    
+    assert buffer.pop_due(0.9) == []
+    assert buffer.next_due() == 1.0
+    assert buffer.pop_due(1.6) == ["a", "b"]
+    assert buffer.next_due() is None
+
+
+def test_viewer_starts_with_sync_and_skips_when_slow():
+    """Test that a busy viewer only gets the newest frame, after a fresh sync."""
+    async def scenario():
+        websocket = SlowWebSocket(delay=0.05)
+        viewer = Viewer(websocket)
+        syncs = iter(["sync-1", "sync-2"])
+        sender = asyncio.create_task(viewer.run(lambda: next(syncs)))
+        
+        viewer.offer("f1")
+        await asyncio.sleep(0.01)  # Sender is now busy with sync-1
+        for name in ("f2", "f3", "f4"):
+            viewer.offer(name)
+        await asyncio.sleep(0.3)
+        sender.cancel()
+        return websocket.sent, viewer
+    
+    sent, viewer = asyncio.run(scenario())
+    
+    assert sent == ["sync-1", "f1", "sync-2", "f4"]
+    assert viewer.skipped == 2
+
+
+def test_viewer_waits_for_a_sync():
+    """Test that frames are held back until the relay has a sync to send."""
+    async def scenario():
+        websocket = SlowWebSocket()
+        viewer = Viewer(websocket)
+        syncs = iter([None, "sync"])
+        sender = asyncio.create_task(viewer.run(lambda: next(syncs)))
+        viewer.offer("f1")
+        await asyncio.sleep(0.01)
+        viewer.offer("f2")
+        await asyncio.sleep(0.01)
+        sender.cancel()
+        return websocket.sent
+    
+    assert asyncio.run(scenario()) == ["sync", "f2"]
+
+
+def test_viewer_stops_when_the_connection_closes():
+    """Test that a send to a closed viewer ends its sender without an error."""
+    class ClosedWebSocket:
+        async def send(self, message):
+            raise websockets.exceptions.ConnectionClosedError(None, None)
+    
+    async def scenario():
+        viewer = Viewer(ClosedWebSocket())
+        sender = asyncio.create_task(viewer.run(lambda: "sync"))
+        viewer.offer("f1")
+        await asyncio.wait_for(sender, 1.0)
+        return sender
+    
+    sender = asyncio.run(scenario())
+    
+    assert sender.exception() is None
+
+
+def test_relay_sync_tracks_released_frames():
+    """Test that the relay's sync lets a late viewer rebuild the world."""
+    async def scenario():
+        relay = Relay("ws://localhost:8765")
+        relay.receive(json.dumps({"type": "sync", "seq": 1, "players": [], "coins": []}))
+        relay.receive(frame(2, [{"type": "coin_spawned", "coin": {"id": "c1", "x": 1, "y": 2, "value": 1, "radius": 10}}]))
+        return relay.sync_text()
+    
+    world = WorldModel()
+    world.load_sync(json.loads(asyncio.run(scenario())))
+    
+    assert world.seq == 2
+    assert list(world.coins) == ["c1"]
\ No newline at end of file
@@ -0,0 +1,84 @@
+import pygame
+import pytest
+from client.render_cache import SpriteCache, TextCache
+
+
+@pytest.fixture
+def font():
+    pygame.font.init()
+    return pygame.font.Font(None, 24)
+
+
+def test_sprite_cache_reuses_sprites():
+    """Test that identical circle keys share one pre-rasterized sprite."""
+    cache = SpriteCache()
+    
+    sprite1 = cache.circle(20, (255, 0, 0))
+    sprite2 = cache.circle(20, (255, 0, 0))
+    outlined = cache.circle(20, (255, 0, 0), ((255, 255, 255), 2, 2))
+    
+    assert sprite1 is sprite2
+    assert outlined is not sprite1
+    assert sprite1.get_width() == 41
+    assert outlined.get_width() == 45
+
+
+def test_sprite_cache_transparent_corners():
+    """Test that pixels outside the circle are transparent."""
+    cache = SpriteCache()
+    sprite = cache.circle(10, (255, 0, 255))
+    
+    # A sprite using the default key color must pick another one
+    assert sprite.get_colorkey()[:3] != (255, 0, 255)
+    assert sprite.get_at((0, 0))[:3] == sprite.get_colorkey()[:3]
+    assert sprite.get_at((10, 10))[:3] == (255, 0, 255)
+
+
+def test_sprite_cache_colors_using_two_keys():
+    """Test a sprite whose fill and outline are both key colors."""
+    cache = SpriteCache()
+    sprite = cache.circle(10, (255, 0, 255), ((0, 255, 0), 2, 2))
+    
+    assert sprite.get_colorkey()[:3] == (0, 0, 255)
+    assert sprite.get_at((12, 12))[:3] == (255, 0, 255)
+    assert sprite.get_at((12, 0))[:3] == (0, 255, 0)
+
+
+def test_text_cache_hits_and_misses(font):
+    """Test that text is only rasterized once per (font, text, color)."""
+    cache = TextCache()
+    
+    surface1 = cache.render(font, "42", (255, 255, 255))
+    surface2 = cache.render(font, "42", (255, 255, 255))
+    cache.render(font, "42", (0, 0, 0))
+    
+    assert surface1 is surface2
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+
+def test_text_cache_evicts_least_recently_used(font):
+    """Test that the cache stays within its entry bound using LRU order."""
+    cache = TextCache(max_entries=2)
+    
+    cache.render(font, "a", (255, 255, 255))
+    cache.render(font, "b", (255, 255, 255))
+    cache.render(font, "a", (255, 255, 255))  # "a" is now most recent
+    cache.render(font, "c", (255, 255, 255))
+    
+    keys = [text for _, text, _ in cache.entries]
+    assert keys == ["a", "c"]
+
+
+def test_text_cache_byte_bound(font):
+    """Test that the cache stays within its memory bound."""
+    cache = TextCache(max_bytes=1)
+    
+    for i in range(10):
+        cache.render(font, f"score {i}", (255, 255, 255))
+    
+    # Always keeps the newest entry, even if it alone exceeds the bound
+    assert len(cache.entries) == 1
+    
+    cache.clear()
+    assert cache.size_bytes == 0
\ No newline at end of file
@@ -0,0 +1,76 @@
+import pygame
+import pytest
+from benchmarks.render import run_benchmark
+from client.renderer import Renderer
+
+
+def make_state(players, coins=()):
+    return {
+        "players": [
+            {"id": pid, "x": x, "y": y, "radius": 20, "color": [255, 0, 0], "score": score}
+            for pid, x, y, score in players
+        ],
+        "coins": [{"id": cid, "x": x, "y": y, "radius": 10, "value": 1} for cid, x, y in coins]
+    }
+
+
+@pytest.fixture
+def renderer(monkeypatch):
+    renderer = Renderer(dirty_rects=True, headless=True)
+    # A steady FPS counter, so only the entities under test change
+    monkeypatch.setattr(renderer, "fps_text", lambda: "FPS: 60")
+    
+    presented = []
+    monkeypatch.setattr(pygame.display, "flip", lambda: presented.append("flip"))
+    monkeypatch.setattr(pygame.display, "update", lambda rects: presented.append(list(rects)))
+    renderer.presented = presented
+    yield renderer
+    renderer.close()
+
+
+def test_dirty_mode_redraws_only_what_moved(renderer):
+    """Test the erase and redraw rects of a moving player."""
+    state = make_state([("p1", 100, 300, 0), ("p2", 500, 300, 0)], [("c1", 300, 100)])
+    renderer.render(state, "p2")
+    renderer.render(state, "p2")
+    assert renderer.presented == ["flip"]  # First frame in full, then nothing changed
+    
+    before = renderer.player_bounds(state["players"][0])
+    moved = make_state([("p1", 110, 300, 0), ("p2", 500, 300, 0)], [("c1", 300, 100)])
+    after = renderer.player_bounds(moved["players"][0])
+    renderer.render(moved, "p2")
+    
+    assert renderer.presented[1] == [before, after]
+    assert renderer.screen.get_at((100 - 18, 300))[:3] == renderer.bg_color
+    assert renderer.screen.get_at((110, 300))[:3] == (255, 0, 0)
+
+
+def test_dirty_mode_falls_back_to_full_flip(renderer):
+    """Test that a frame changing more than the fallback ratio is flipped whole."""
+    renderer.render(make_state([("p1", 100, 100, 0)]), "p1")
+    
+    players = [(f"p{i}", 50 + (i % 10) * 70, 50 + (i // 10) * 70, 0) for i in range(80)]
+    renderer.render(make_state(players), None)
+    renderer.render(make_state([(pid, x + 5, y, 0) for pid, x, y, _ in players]), None)
+    
+    assert renderer.presented == ["flip", "flip", "flip"]
+
+
+def test_scoreboard_bounds_cover_long_lines(renderer):
+    """Test that the scoreboard's dirty rect is measured from its text."""
+    short = renderer.scoreboard_bounds([("1. Score: 5", (255, 255, 255))])
+    long = renderer.scoreboard_bounds([("1. Score: 123456789012345 (You)", (255, 255, 0))])
+    
+    assert short.right <= renderer.width
+    assert long.left < short.left
+    assert long.right <= renderer.width - 10
+
+
+def test_render_benchmark_runs():
+    """Test a short headless run of the render benchmark and its draw call counts."""
+    results = run_benchmark(players=20, coins=10, frames=5)
+    
+    assert results["fps"] > 0
+    assert results["draw_calls"]["flip"]["calls"] == 1.0
+    assert results["draw_calls"]["sprite"]["calls"] > 0
+    assert results["draw_calls"]["blits"]["us_per_call"] > 0
\ No newline at end of file
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import websockets
+from client.world import WorldModel
+from server.admission import AdmissionStats, ClientRateLimiter
+from server.game_state import Coin
+from server.rooms import Room, RoomConfig, RoomManager, parse_room_path, phase_of
+
+
+CONFIG = RoomConfig(initial_coins=0, coin_spawn_interval=1000.0)
+
+
+def test_room_paths_and_phases():
+    """Test room ids in paths and the spread of tick phases."""
+    assert parse_room_path("/room/lobby") == "lobby"
+    assert parse_room_path("/room/lobby/?resume=abc") == "lobby"
+    assert parse_room_path("/room/") is None
+    assert parse_room_path("/room/../etc") is None
+    assert [phase_of(slot) for slot in range(5)] == [0.0, 0.5, 0.25, 0.75, 0.125]
+
+
+def test_room_simulates_its_own_world():
+    """Test that a room moves its players, collects coins and logs events."""
+    room = Room("a", CONFIG, now=0.0)
+    other = Room("b", CONFIG, now=0.0)
+    player = room.join("p1")
+    player.x = 300.0
+    room.game_state.coins.append(Coin(id="c1", x=player.x + 100, y=player.y, value=5))
+    
+    room.apply_input("p1", {"move": "right"}, now=0.0)
+    room.tick(1.0)
+    
+    assert player.score == 5
+    assert room.game_state.coins == []
+    assert room.event_log.seq == 3  # Joined, collected, score
+    assert other.game_state.players == {}
+    
+    room.leave("p1", now=2.0)
+    assert room.empty_since == 2.0
+
+
+def test_input_in_idle_room_moves_players_from_then():
+    """Test that an idle room's next tick doesn't move players for the time it slept."""
+    room = Room("a", CONFIG, now=0.0)
+    player = room.join("p1")
+    player.x = start = 300.0
+    
+    room.apply_input("p1", {"move": "right"}, now=5.0)
+    room.tick(5.5)
+    
+    assert player.x - start == player.vx * 0.5
+
+
+def test_manager_ticks_idle_rooms_less_and_reclaims_empty_ones():
+    """Test idle throttling, phase slots and reclaiming."""
+    manager = RoomManager(CONFIG, max_rooms=2, idle_every=3, empty_timeout=10.0)
+    busy = manager.room("busy", now=0.0)
+    quiet = manager.room("quiet", now=0.0)
+    assert manager.room("third", now=0.0) is None
+    assert (busy.phase, quiet.phase) == (0.0, 0.5)
+    
+    busy.join("p1")
+    busy.apply_input("p1", {"move": "up"}, now=0.0)
+    quiet.join("p2")
+    ticked = {"busy": 0, "quiet": 0}
+    for i in range(1, 10):
+        for room in manager.tick_order():
+            ticked[room.room_id] += manager.tick_room(room, i / 30)
+    assert ticked == {"busy": 9, "quiet": 3}
+    
+    quiet.leave("p2", now=1.0)
+    assert manager.reclaim(10.0) == []
+    assert manager.reclaim(11.0) == ["quiet"]
+    assert manager.status() == {"rooms": 1, "idle": 0, "players": 1, "reclaimed": 1}
+    # The freed slot and phase go to the next room
+    assert manager.room("next", now=11.0).phase == 0.5
+
+
+def test_manager_staggers_room_ticks():
+    """Test that rooms tick spread through the interval, in phase order."""
+    async def scenario():
+        manager = RoomManager(RoomConfig(tick_rate=10, initial_coins=0), idle_every=1)
+        loop = asyncio.get_running_loop()
+        ticks = []
+        for room_id in ("a", "b", "c", "d"):
+            room = manager.room(room_id)
+            tick = room.tick
+            room.tick = lambda now=None, room_id=room_id, tick=tick: (ticks.append((room_id, loop.time())), tick(now))
+        task = asyncio.create_task(manager.run())
+        await asyncio.sleep(0.25)
+        manager.running = False
+        await task
+        return ticks
+    
+    ticks = asyncio.run(scenario())
+    
+    first = ticks[:4]
+    assert [room_id for room_id, _ in first] == ["a", "c", "b", "d"]
+    gaps = [later - earlier for (_, earlier), (_, later) in zip(first, first[1:])]
+    assert all(gap > 0.015 for gap in gaps)
+
+
+def test_room_serves_clients_over_websockets():
+    """Test an embedded room end to end: welcome, sync, input and state."""
+    async def scenario():
+        manager = RoomManager(RoomConfig(initial_coins=2))
+        stats = AdmissionStats()
+        
+        async def handler(websocket, path):
+            await manager.room(parse_room_path(path)).serve(websocket, "p1", ClientRateLimiter(stats))
+        
+        async with websockets.serve(handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            runner = asyncio.create_task(manager.run())
+            async with websockets.connect(f"ws://127.0.0.1:{port}/room/test") as websocket:
+                welcome = json.loads(await websocket.recv())
+                world = WorldModel()
+                world.load_sync(json.loads(await websocket.recv()))
+                await websocket.send(json.dumps({"type": "input", "move": "down"}))
+                while True:
+                    state = json.loads(await websocket.recv())
+                    if state["players"][0]["vy"] > 0:
+                        break
+            for _ in range(50):
+                if not manager.rooms["test"].game_state.players:
+                    break
+                await asyncio.sleep(0.01)
+            manager.running = False
+            await runner
+        return welcome, world, state, manager
+    
+    welcome, world, state, manager = asyncio.run(scenario())
+    
+    assert welcome["player_id"] == "p1"
+    assert len(world.coin_list()) == 2
+    assert world.expand(state)["players"][0]["id"] == "p1"
+    assert manager.rooms["test"].empty_since is not None
\ No newline at end of file
@@ -0,0 +1,117 @@
+import random
+import pytest
+from server.scheduler import TimingWheel
+
+
+def test_timer_fires_once_due():
+    """Test that a timer fires on the first advance past its deadline."""
+    wheel = TimingWheel(resolution=0.1)
+    fired = []
+    wheel.schedule(0.5, fired.append, "coin")
+    
+    wheel.advance(0.4)
+    assert fired == []
+    wheel.advance(0.5)
+    assert fired == ["coin"]
+    wheel.advance(10.0)
+    assert fired == ["coin"]
+    assert len(wheel) == 0
+
+
+def test_cancel():
+    """Test that cancelled timers never fire."""
+    wheel = TimingWheel(resolution=0.1)
+    fired = []
+    timer = wheel.schedule(1.0, fired.append, 1)
+    wheel.schedule(1.0, fired.append, 2)
+    
+    assert wheel.cancel(timer)
+    assert not wheel.cancel(timer)
+    wheel.advance(2.0)
+    
+    assert fired == [2]
+    assert not timer.active
+
+
+def test_batch_firing_in_schedule_order():
+    """Test that timers due in the same tick fire together, in order."""
+    wheel = TimingWheel(resolution=1.0)
+    fired = []
+    for i in range(5):
+        wheel.schedule(3.0, fired.append, i)
+    
+    assert wheel.advance(3.0) == 5
+    assert fired == [0, 1, 2, 3, 4]
+
+
+def test_long_delays_cascade_to_exact_tick():
+    """Test timers spread across every level against a brute-force clock."""
+    rng = random.Random(7)
+    wheel = TimingWheel(resolution=1.0, slot_bits=4, levels=4)
+    fired = {}
+    expected = {}
+    for i in range(2000):
+        delay = rng.randint(1, 40000)
+        expected[i] = delay
+        wheel.schedule(delay, lambda i=i: fired.__setitem__(i, wheel.current))
+    
+    now = 0
+    while len(wheel):
+        now += rng.randint(1, 50)
+        wheel.advance(now)
+    
+    assert fired == expected
+
+
+def test_callback_cancels_timer_in_same_batch():
+    """Test cancelling a timer due in the same tick from a callback."""
+    wheel = TimingWheel(resolution=1.0)
+    fired = []
+    second = None
+    
+    def first():
+        fired.append(1)
+        wheel.cancel(second)
+    
+    wheel.schedule(1.0, first)
+    second = wheel.schedule(1.0, fired.append, 2)
+    
+    assert wheel.advance(1.0) == 1
+    assert fired == [1]
+    assert len(wheel) == 0
+
+
+def test_callbacks_can_reschedule():
+    """Test that a callback can schedule a repeating timer."""
+    wheel = TimingWheel(resolution=0.5)
+    ticks = []
+    
+    def repeat():
+        ticks.append(wheel.current)
+        wheel.schedule(1.0, repeat)
+    
+    wheel.schedule(1.0, repeat)
+    wheel.advance(5.0)
+    
+    assert ticks == [2, 4, 6, 8, 10]
+
+
+def test_remaining_and_origin():
+    """Test remaining time relative to a non-zero start time."""
+    wheel = TimingWheel(resolution=0.25, now=1000.0)
+    timer = wheel.schedule(2.0, lambda: None)
+    
+    wheel.advance(1001.0)
+    
+    assert wheel.remaining(timer) == pytest.approx(1.0)
+
+
+def test_many_pending_timers():
+    """Test that advancing is unaffected by a large number of far timers."""
+    wheel = TimingWheel(resolution=0.1)
+    timers = [wheel.schedule(1000.0 + i * 0.01, lambda: None) for i in range(200000)]
+    for timer in timers[::2]:
+        wheel.cancel(timer)
+    
+    assert wheel.advance(100.0) == 0
+    assert len(wheel) == 100000
\ No newline at end of file
@@ -0,0 +1,111 @@
+from server.game_logic import resolve_coin_collisions
+from server.game_state import Coin, GameState, PlayerState
+from server.sleep import SleepGrid
+
+
+def make_world():
+    game_state = GameState(world_width=4000, world_height=2000)
+    game_state.players["p1"] = PlayerState(id="p1", x=300.0, y=300.0)
+    for i in range(40):
+        game_state.coins.append(Coin(id=f"c{i}", x=50.0 + i * 98, y=1000.0))
+    game_state.coins.append(Coin(id="near", x=320.0, y=300.0, value=5))
+    return game_state
+
+
+def test_cells_wake_within_margin_of_players():
+    """Test the awake set and the transitions reported by update."""
+    grid = SleepGrid(4000, 2000, cell_size=500, margin=100)
+    assert (grid.columns, grid.rows) == (8, 4)
+    
+    woken, slept = grid.update([(450.0, 250.0)])
+    # Within 100 of the cell to the right, but not of the one below
+    assert grid.awake == {0, 1}
+    assert woken == [] and len(slept) == 30
+    
+    woken, slept = grid.update([(450.0, 420.0)])
+    assert woken == [8, 9] and slept == []
+    assert grid.update([]) == ([], [0, 1, 8, 9])
+
+
+def test_sleeping_coins_leave_the_simulation_but_stay_visible():
+    """Test packing coins of sleeping cells and unpacking them on wake."""
+    game_state = make_world()
+    grid = SleepGrid(4000, 2000, cell_size=500, margin=100)
+    paused = []
+    
+    def pause(coin):
+        paused.append(coin.id)
+        return 12.5 if coin.id == "c0" else 0.0
+    
+    _, slept = grid.update([(p.x, p.y) for p in game_state.players.values()])
+    assert grid.put_to_sleep(game_state, slept, pause, now=100.0) == 40
+    
+    assert [coin.id for coin in game_state.coins] == ["near"]
+    assert len(paused) == 40
+    assert len(game_state.view().coins) == 41
+    assert len(game_state.to_dict()["coins"]) == 41
+    assert grid.dormant_ttls(now=102.0) == {"c0": 10.5}
+    assert grid.status() == {"cells": 32, "awake": 1, "dormant_coins": 40}
+    
+    # Collisions only ever see the awake coin
+    assert resolve_coin_collisions(game_state) == [("p1", "near")]
+    
+    # A player walking up to the coins wakes their cells
+    game_state.players["p1"].y = 950.0
+    woken, _ = grid.update([(p.x, p.y) for p in game_state.players.values()])
+    restored = dict((coin.id, ttl) for coin, ttl in grid.wake_up(game_state, woken, now=105.0))
+    assert restored["c0"] == 7.5
+    assert {"c0", "c3", "c4"} <= set(restored)
+    assert len(game_state.coins) == len(restored)
+    assert len(game_state.view().coins) == 40
+
+
+def test_sleeping_coins_expire_on_time():
+    """Test that a sleeping coin's despawn deadline keeps running."""
+    game_state = make_world()
+    grid = SleepGrid(4000, 2000, cell_size=500, margin=100)
+    _, slept = grid.update([(300.0, 300.0)])
+    grid.put_to_sleep(game_state, slept, lambda coin: 10.0 if coin.id in ("c0", "c1") else 0.0, now=0.0)
+    
+    assert grid.expire(game_state, now=9.0) == []
+    assert sorted(grid.expire(game_state, now=10.0)) == ["c0", "c1"]
+    assert grid.dormant_count() == 38
+    assert len(game_state.view().coins) == 39
+    
+    # A coin woken and put back to sleep keeps only its new deadline
+    game_state.coins.append(Coin(id="late", x=3900.0, y=1900.0))
+    grid.put_to_sleep(game_state, [grid.cell_of(3900.0, 1900.0)], lambda coin: 5.0, now=10.0)
+    woken = grid.wake_up(game_state, [grid.cell_of(3900.0, 1900.0)], now=11.0)
+    late = next(coin for coin, ttl in woken if coin.id == "late")
+    game_state.coins = [late]
+    grid.put_to_sleep(game_state, [grid.cell_of(3900.0, 1900.0)], lambda coin: 20.0, now=12.0)
+    
+    assert grid.expire(game_state, now=15.0) == []
+    assert grid.expire(game_state, now=32.0) == ["late"]
+
+
+def test_snapshot_restores_sleeping_coins_awake():
+    """Test that a hot-restart snapshot keeps coins of sleeping cells."""
+    game_state = make_world()
+    grid = SleepGrid(4000, 2000, cell_size=500)
+    _, slept = grid.update([(300.0, 300.0)])
+    grid.put_to_sleep(game_state, slept, lambda coin: 0.0)
+    
+    restored = GameState.from_snapshot(game_state.to_snapshot())
+    
+    assert len(restored.coins) == 41
+    assert restored.dormant_coins == ()
+    assert {coin.id for coin in restored.coins} == {row[0] for row in game_state.view().coins}
+
+
+def test_spawns_only_land_in_awake_cells():
+    """Test spawn bounds follow players and the region."""
+    grid = SleepGrid(4000, 2000, cell_size=500, margin=0)
+    grid.update([(2200.0, 1700.0)])
+    
+    assert grid.spawn_bounds((0, 0, 4000, 2000)) == (2000, 1500, 2500, 2000)
+    assert grid.spawn_bounds((2100, 0, 4000, 1800)) == (2100, 1500, 2500, 1800)
+    assert grid.spawn_bounds((0, 0, 2000, 2000)) is None
+    
+    grid.update([])
+    assert grid.spawn_bounds((0, 0, 4000, 2000)) is None
\ No newline at end of file
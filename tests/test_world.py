@@ -0,0 +1,144 @@
+import pytest
+from client.world import WorldModel
+from server.events import EventLog
+from server.game_state import GameState, PlayerState, Coin
+from server.protocol import (
+    create_sync_message,
+    create_coin_spawned_event,
+    create_coin_collected_event,
+    create_player_joined_event,
+    create_player_left_event,
+    create_score_event,
+    create_ghost_manifest_event
+)
+
+
+def state_message(seq, events, players=()):
+    return {"type": "state", "timestamp": 1.0, "seq": seq, "events": events, "players": list(players)}
+
+
+def synced_world() -> WorldModel:
+    game_state = GameState()
+    game_state.players["p1"] = PlayerState(id="p1", x=10, y=20, color=(1, 2, 3), score=4)
+    game_state.coins.append(Coin(id="c1", x=5, y=6))
+    world = WorldModel()
+    world.load_sync(create_sync_message(game_state, seq=10))
+    return world
+
+
+def test_event_log_numbers_and_drains():
+    """Test that events are numbered in order and drained once."""
+    log = EventLog()
+    log.emit({"type": "a"})
+    log.emit({"type": "b"})
+    
+    assert log.seq == 2
+    assert [e["type"] for e in log.drain()] == ["a", "b"]
+    assert log.drain() == []
+
+
+def test_expand_merges_static_fields():
+    """Test that snapshots are rebuilt with colors, radii, scores and coins."""
+    world = synced_world()
+    
+    assert world.apply(state_message(10, [], [{"id": "p1", "x": 11, "y": 21, "vx": 0, "vy": 0}]))
+    state = world.expand(state_message(10, [], [{"id": "p1", "x": 11, "y": 21, "vx": 0, "vy": 0}]))
+    
+    assert state["players"][0]["x"] == 11
+    assert state["players"][0]["color"] == (1, 2, 3)
+    assert state["players"][0]["score"] == 4
+    assert [c["id"] for c in state["coins"]] == ["c1"]
+
+
+def test_events_update_world():
+    """Test every event type against the world model."""
+    world = synced_world()
+    events = [
+        create_coin_spawned_event(Coin(id="c2", x=1, y=1)),
+        create_coin_collected_event("c1", "p1"),
+        create_score_event("p1", 5),
+        create_player_joined_event(PlayerState(id="p2", x=0, y=0, color=(9, 9, 9))),
+        create_player_left_event("p1")
+    ]
+    
+    assert world.apply(state_message(15, events))
+    
+    assert world.seq == 15
+    assert list(world.coins) == ["c2"]
+    assert list(world.players) == ["p2"]
+    assert world.players["p2"]["color"] == (9, 9, 9)
+
+
+def test_events_covered_by_sync_are_skipped():
+    """Test that a message overlapping the sync only applies newer events."""
+    world = synced_world()
+    events = [create_score_event("p1", 100), create_score_event("p1", 6)]
+    
+    assert world.apply(state_message(11, events))
+    
+    assert world.players["p1"]["score"] == 6
+
+
+def test_gap_requires_resync():
+    """Test that missing events stop the world until the next sync."""
+    world = synced_world()
+    
+    assert not world.apply(state_message(13, [create_score_event("p1", 9)]))
+    assert world.needs_sync
+    assert not world.apply(state_message(14, [create_score_event("p1", 10)]))
+    
+    world.load_sync({"seq": 14, "players": [], "coins": []})
+    assert not world.needs_sync
+    assert world.apply(state_message(15, [create_coin_spawned_event(Coin(id="c3", x=1, y=1))]))
+
+
+def test_coin_list_shared_until_coins_change():
+    """Test that unchanged coins reuse one list across snapshots."""
+    world = synced_world()
+    
+    first = world.expand(state_message(10, []))["coins"]
+    world.apply(state_message(11, [create_score_event("p1", 5)]))
+    second = world.expand(state_message(11, []))["coins"]
+    world.apply(state_message(12, [create_coin_collected_event("c1", "p1")]))
+    third = world.expand(state_message(12, []))["coins"]
+    
+    assert first is second
+    assert third == []
+
+
+def test_ghosts_are_merged():
+    """Test that ghosts from neighbouring nodes appear in the state."""
+    world = synced_world()
+    message = state_message(10, [])
+    message["ghosts"] = {"players": [{"id": "g1"}], "coins": [{"id": "gc1"}]}
+    
+    state = world.expand(message)
+    
+    assert [p["id"] for p in state["players"]] == ["g1"]
+    assert [c["id"] for c in state["coins"]] == ["c1", "gc1"]
+    assert [c["id"] for c in world.coin_list()] == ["c1"]
+
+
+def test_ghost_manifests_fill_in_ghost_positions():
+    """Test that ghost positions are expanded from the cached manifests."""
+    world = synced_world()
+    gp1 = {"id": "g1", "color": [9, 9, 9], "radius": 30.0, "score": 7}
+    gc1 = {"id": "gc1", "x": 1, "y": 2, "value": 1, "radius": 10}
+    world.apply(state_message(11, [create_ghost_manifest_event([gp1], [gc1], [], [])]))
+    message = state_message(11, [])
+    message["ghosts"] = {"players": [{"id": "g1", "x": 50, "y": 60, "vx": 0, "vy": 0}], "coins": []}
+    
+    state = world.expand(message)
+    
+    assert state["players"] == [dict(gp1, x=50, y=60, vx=0, vy=0)]
+    assert [c["id"] for c in state["coins"]] == ["c1", "gc1"]
+    assert world.expand(message)["coins"] is state["coins"]
+    
+    # A relayed sync carries the manifests to the next client
+    relayed = WorldModel()
+    relayed.load_sync(world.sync_message())
+    assert relayed.expand(message)["players"] == state["players"]
+    
+    world.apply(state_message(12, [create_ghost_manifest_event([], [], ["g1"], ["gc1"])]))
+    assert world.ghost_players == {} and world.ghost_coins == {}
+    assert [c["id"] for c in world.expand(state_message(12, []))["coins"]] == ["c1"]
\ No newline at end of file